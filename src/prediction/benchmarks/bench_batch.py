@@ -0,0 +1,41 @@
+"""
+Measures the throughput of the batch prediction mode in rows per second.
+
+Run from src/prediction:
+    python -m benchmarks.bench_batch --rows 1e7
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from estimate_price import estimate_prices_batch, load_coefficients_from_file, file_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e7, help='Number of kilometer values to price.')
+    args = parser.parse_args()
+
+    n_rows = int(args.rows)
+    w_final, b_final = load_coefficients_from_file(file_path)
+    rng = np.random.default_rng(42)
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'kms.txt')
+        output_path = os.path.join(directory, 'prices.txt')
+        with open(input_path, 'w') as file:
+            np.savetxt(file, rng.uniform(1, 250000, n_rows), fmt='%.1f')
+
+        start = time.perf_counter()
+        with open(input_path, 'r') as input_stream, open(output_path, 'w') as output_stream:
+            priced = estimate_prices_batch(w_final, b_final, input_stream, output_stream)
+        elapsed = time.perf_counter() - start
+
+    print(f"{priced} rows in {elapsed:.3f} s: {priced / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Load test of the prediction server: latency percentiles and requests per second.
+
+Start the server first (python server.py), then from src/prediction:
+    python -m benchmarks.load_test --requests 20000 --connections 32
+    python -m benchmarks.load_test --batch-size 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+
+async def client(host: str, port: int, unix_path: str, n_requests: int, batch_size: int, latencies: list) -> None:
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    if batch_size:
+        body = json.dumps({'km': list(range(1, batch_size + 1))}).encode()
+        request = (f"POST /predict HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+    else:
+        request = b"GET /predict?km=50000 HTTP/1.1\r\nHost: localhost\r\n\r\n"
+
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b'\r\n\r\n')
+        content_length = int(head.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+        await reader.readexactly(content_length)
+        latencies.append(time.perf_counter() - start)
+        if not head.startswith(b'HTTP/1.1 200'):
+            raise RuntimeError(head.decode())
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args) -> None:
+    latencies: list = []
+    per_connection = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, args.unix, per_connection, args.batch_size, latencies)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1e3
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.3f} s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} requests/s"
+          + (f" ({len(latencies) * args.batch_size / elapsed:,.0f} prices/s)" if args.batch_size else ""))
+    print(f"latency p50: {np.percentile(latencies_ms, 50):.3f} ms, p99: {np.percentile(latencies_ms, 99):.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', metavar='PATH', help="Connect to a Unix socket instead of a TCP port.")
+    parser.add_argument('--requests', type=int, default=20000, help="Total number of requests.")
+    parser.add_argument('--connections', type=int, default=32, help="Concurrent keep-alive connections.")
+    parser.add_argument('--batch-size', type=int, default=0, help="Prices per POST request (0 for single GET queries).")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
-from typing import Tuple
+from typing import Iterator, List, TextIO, Tuple
+import argparse
+import os
 import sys
 import signal
 import time
+import warnings
+import numpy as np
+
+from model_store import Model, is_model_file, load_model, model_path
+from feature_expansion import is_expanded_model, expand_features
+from segments import SegmentTable, load_segment_table, estimate_segment_prices, SEGMENTS_PATH
+from intervals import interval_levels, prediction_intervals
+
+# Number of characters read from the input at once in batch mode
+DEFAULT_BLOCK_SIZE: int = 1 << 22
 
 def signal_handler(sig, frame):
     print("\nYou have pressed CTRL+C")
@@ -42,9 +54,98 @@ def load_coefficients_from_file(file_path: str) -> Tuple[float, float]:
         print(f"An error occurred while trying to read the file: {e}")
         raise
 
+def load_coefficient_vector_from_file(file_path: str) -> Tuple[List[str], np.ndarray, float]:
+    """
+    Loads the coefficients of a model with any number of features from a specified file.
+
+    Reads both the two-line format of a single-feature model (`w_final`, `b_final`) and the
+    multivariate format with one `w_final[<feature>]` line per feature.
+
+    Args:
+        file_path (str): Path to the file where the coefficients are stored.
+
+    Returns:
+        Tuple[List[str], np.ndarray, float]: The feature names, the slope of each feature and the intercept.
+
+    Raises:
+        ValueError: If the file does not contain valid float values or has an unexpected format.
+    """
+    try:
+        feature_names: List[str] = []
+        weights: List[float] = []
+        b_final: float = None
+        with open(file_path, 'r') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                name, _, value = line.partition(':')
+                name = name.strip()
+                if name == 'b_final':
+                    b_final = float(value.strip())
+                elif name == 'w_final':
+                    feature_names.append('km')
+                    weights.append(float(value.strip()))
+                elif name.startswith('w_final[') and name.endswith(']'):
+                    feature_names.append(name[len('w_final['):-1])
+                    weights.append(float(value.strip()))
+                else:
+                    raise ValueError(f"Unexpected line '{line.strip()}'.")
+
+        if b_final is None or not weights:
+            raise ValueError("The file does not contain a slope and an intercept.")
+        return feature_names, np.array(weights), b_final
+
+    except (IOError, ValueError) as e:
+        print(f"An error occurred while trying to read the file: {e}")
+        raise
+
+def load_model_coefficients(file_path: str) -> Tuple[List[str], np.ndarray, float]:
+    """
+    Loads the coefficients of a model file, or of a legacy coefficients file.
+
+    Args:
+        file_path (str): Path to a model file or to a text coefficients file.
+
+    Returns:
+        Tuple[List[str], np.ndarray, float]: The feature names, the slope of each feature and the intercept.
+
+    Raises:
+        ValueError: If the file is invalid (including a checksum mismatch of a model file).
+    """
+    try:
+        if is_model_file(file_path):
+            model = load_model(file_path)
+            return list(model.feature_names), model.weights, model.b
+    except (IOError, ValueError) as e:
+        print(f"An error occurred while trying to read the file: {e}")
+        raise
+    return load_coefficient_vector_from_file(file_path)
+
+def load_interval_model(file_path: str) -> Model:
+    """
+    Loads the model of a file if it can price with prediction intervals.
+
+    Args:
+        file_path (str): Path to a model file or to a text coefficients file.
+
+    Returns:
+        Model: The model, or None if the file is a legacy coefficients file or a model
+               without bootstrap quantiles.
+    """
+    if not is_model_file(file_path):
+        return None
+    model = load_model(file_path)
+    return model if model.quantiles is not None and model.feature_names == ('km',) else None
+
+def default_coefficients_path() -> str:
+    """
+    Returns the model file written by the training program, or the legacy coefficients file if there is none.
+    """
+    return model_path if os.path.exists(model_path) else file_path
+
 file_path = 'coefficients.txt'
 
-def estimate_price(w_final: float, b_final: float):
+def estimate_price(w_final: float, b_final: float, interval_model: Model = None, level: float = 0.95):
 
     kms_to_predict : float = 0.0
     while True:
@@ -61,14 +162,408 @@ def estimate_price(w_final: float, b_final: float):
     price : float = w_final * kms_to_predict + b_final
 
     print(f"A car with {kms_to_predict} has a price of {price:.4f}")
+    if interval_model is not None:
+        lower, upper = prediction_intervals(interval_model, np.array([kms_to_predict]), level)
+        print(f"{level:.0%} prediction interval: [{lower[0]:.4f}, {upper[0]:.4f}]")
+
+def estimate_price_expanded(feature_names: List[str], weights: np.ndarray, b_final: float):
+
+    kms_to_predict : float = 0.0
+    while True:
+        try:
+            kms_to_predict: float = float(input("Enter the value of kms to predict: "))
+            if not (kms_to_predict > 0):
+                print("The value of kilometers must be positive.Please try again.")
+                continue
+            break
+
+        except ValueError:
+            print("Invalid input. Please enter numerical values.")
+
+    # Same expansion of the kilometers as at training time
+    price : float = expand_features(np.array([kms_to_predict]), feature_names)[0] @ weights + b_final
+
+    print(f"A car with {kms_to_predict} has a price of {price:.4f}")
+
+def estimate_price_multivariate(feature_names: List[str], weights: np.ndarray, b_final: float):
+
+    features: np.ndarray = np.empty(len(feature_names))
+    for i, name in enumerate(feature_names):
+        while True:
+            try:
+                features[i] = float(input(f"Enter the value of {name} to predict: "))
+                break
+
+            except ValueError:
+                print("Invalid input. Please enter numerical values.")
+
+    price : float = np.dot(weights, features) + b_final
+
+    print(f"A car with {', '.join(f'{name} = {value}' for name, value in zip(feature_names, features))} has a price of {price:.4f}")
+
+def parse_numbers(text: str) -> np.ndarray:
+    """
+    Parses whitespace or comma separated numbers in a single vectorized call.
+
+    Args:
+        text (str): Numbers, typically one row per line.
+
+    Returns:
+        np.ndarray: The numbers as a flat float64 array.
+
+    Raises:
+        ValueError: If a value is not a number.
+    """
+    with warnings.catch_warnings():
+        # Depending on its version, numpy raises or only warns when it stops parsing early on an invalid value
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(text.replace(',', ' '), dtype=np.float64, sep=' ')
+        except (DeprecationWarning, ValueError):
+            raise ValueError("The input contains a value that is not a number.") from None
+
+def count_fields(text: str) -> np.ndarray:
+    """
+    Counts the values of every non-blank line of a text, vectorized over its bytes.
+
+    Args:
+        text (str): Rows of values separated by commas or whitespace, one row per line.
+
+    Returns:
+        np.ndarray: The number of values of each non-blank line, in order.
+    """
+    characters: np.ndarray = np.frombuffer(text.encode(), dtype=np.uint8)
+    newlines: np.ndarray = characters == ord('\n')
+    separators: np.ndarray = newlines | np.isin(characters, np.frombuffer(b' \t\r,', dtype=np.uint8))
+    # A value starts at a non-separator that follows a separator or the start of the text
+    starts: np.ndarray = ~separators
+    starts[1:] &= separators[:-1]
+    counts: np.ndarray = np.bincount(np.cumsum(newlines)[starts], minlength=1)
+    return counts[counts > 0]
+
+def parse_kms(text: str) -> np.ndarray:
+    """
+    Parses whitespace-separated kilometer values in a single vectorized call.
+
+    Args:
+        text (str): Kilometer values, typically one per line.
+
+    Returns:
+        np.ndarray: The kilometers as a float64 array.
+
+    Raises:
+        ValueError: If a value is not a number or is not positive.
+    """
+    kms: np.ndarray = parse_numbers(text)
+    if not np.all(kms > 0):
+        raise ValueError("The value of kilometers must be positive.")
+    return kms
+
+def iter_line_blocks(stream: TextIO, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Reads a text input one block of whole lines at a time.
+
+    Args:
+        stream (TextIO): Input to read.
+        block_size (int, optional): Number of characters read at once.
+
+    Yields:
+        str: A block of whole lines. The last line of the input may lack its newline.
+    """
+    remainder: str = ''
+    while True:
+        block: str = stream.read(block_size)
+        text: str = remainder + block
+        if block:
+            # Keep the last, possibly incomplete, line for the next block
+            cut: int = text.rfind('\n') + 1
+            text, remainder = text[:cut], text[cut:]
+            if not text:
+                continue
+
+        if text:
+            yield text
+
+        if not block:
+            break
+
+def iter_input_chunks(stream: TextIO, block_size: int = DEFAULT_BLOCK_SIZE, n_features: int = 1) -> Iterator[np.ndarray]:
+    """
+    Streams feature values from a text input, one block of whole lines at a time.
+
+    A leading header line that is not made of numbers (e.g. 'km') is skipped.
+
+    Args:
+        stream (TextIO): Input with one row per line: a kilometer value, or `n_features`
+                         values separated by commas or whitespace.
+        block_size (int, optional): Number of characters read at once.
+        n_features (int, optional): Number of values per row.
+
+    Yields:
+        np.ndarray: The kilometers of a block, or its rows as an (rows, n_features) matrix.
+
+    Raises:
+        ValueError: If a value is invalid or a row does not have exactly `n_features` values.
+    """
+    first_block: bool = True
+    for text in iter_line_blocks(stream, block_size):
+        if first_block:
+            first_block = False
+            first_line, _, rest = text.lstrip().partition('\n')
+            try:
+                [float(value) for value in first_line.replace(',', ' ').split()]
+            except ValueError:
+                text = rest
+
+        if not text.strip():
+            continue
+        # Rows must not be split or merged, or the prices would no longer line up with them. A block of
+        # single values without any separator but line breaks (the usual input) needs no counting.
+        single_values: bool = n_features == 1 and not any(separator in text for separator in ' ,\t\r')
+        if not single_values and np.any(count_fields(text) != n_features):
+            raise ValueError("Every row must contain a single kilometer value." if n_features == 1 else
+                             f"Every row must contain {n_features} values.")
+        if n_features == 1:
+            yield parse_kms(text)
+        else:
+            yield parse_numbers(text).reshape(-1, n_features)
+
+def iter_segment_chunks(stream: TextIO, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """
+    Streams segment keys and kilometers from a text input, one block of whole lines at a time.
+
+    Each line is `<segment>,<km>`; the key is everything before the last comma.
+    A leading header line whose last value is not a number (e.g. 'model,km') is skipped.
+
+    Args:
+        stream (TextIO): Input with one car per line.
+        block_size (int, optional): Number of characters read at once.
+
+    Yields:
+        Tuple[List[str], np.ndarray]: The keys and kilometers of a block.
+
+    Raises:
+        ValueError: If a line has no key or a kilometer value is invalid or not positive.
+    """
+    first_block: bool = True
+    for text in iter_line_blocks(stream, block_size):
+        rows = [line.rpartition(',') for line in text.splitlines() if line.strip()]
+        if first_block and rows:
+            first_block = False
+            try:
+                float(rows[0][2])
+            except ValueError:
+                rows = rows[1:]
+        if not rows:
+            continue
+        if not all(row[1] for row in rows):
+            raise ValueError("Every row must contain a segment and a kilometer value.")
+
+        keys: List[str] = [row[0].strip() for row in rows]
+        try:
+            kms: np.ndarray = np.array([row[2] for row in rows], dtype=np.float64)
+        except ValueError:
+            raise ValueError("The input contains a value that is not a number.") from None
+        if not np.all(kms > 0):
+            raise ValueError("The value of kilometers must be positive.")
+        yield keys, kms
+
+def estimate_prices_batch(w_final, b_final: float, input_stream: TextIO, output_stream: TextIO, \
+                          block_size: int = DEFAULT_BLOCK_SIZE, feature_names: List[str] = None) -> int:
+    """
+    Prices every row of an input stream and writes one price per line.
+
+    Args:
+        w_final (float | np.ndarray): Slope of the regression line, or slopes of a multivariate model.
+        b_final (float): Intercept of the regression line.
+        input_stream (TextIO): Input with one kilometer value (or one row of features) per line.
+        output_stream (TextIO): Output receiving one price per line.
+        block_size (int, optional): Number of characters read at once.
+        feature_names (List[str], optional): Feature names of the model. The input of a polynomial
+                                             or spline model is one kilometer value per line.
+
+    Returns:
+        int: The number of rows priced.
+    """
+    weights: np.ndarray = np.atleast_1d(w_final)
+    expanded: bool = feature_names is not None and is_expanded_model(feature_names)
+    n_rows: int = 0
+    for features in iter_input_chunks(input_stream, block_size, 1 if expanded else weights.shape[0]):
+        if expanded:
+            # Same expansion of the kilometers as at training time
+            prices: np.ndarray = expand_features(features, feature_names) @ weights + b_final
+        elif weights.shape[0] == 1:
+            prices: np.ndarray = weights[0] * features + b_final
+        else:
+            prices: np.ndarray = features @ weights + b_final
+        # A single formatting call for the whole block
+        output_stream.write(('%.4f\n' * prices.shape[0]) % tuple(prices.tolist()))
+        n_rows += prices.shape[0]
+    return n_rows
+
+def estimate_prices_intervals_batch(model: Model, level: float, input_stream: TextIO, output_stream: TextIO, \
+                                    block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Prices every kilometer value of an input stream with its prediction interval.
+
+    Args:
+        model (Model): A single-feature model with bootstrap quantiles.
+        level (float): Coverage of the intervals, e.g. 0.95.
+        input_stream (TextIO): Input with one kilometer value per line.
+        output_stream (TextIO): Output receiving one 'price,lower,upper' line per row.
+        block_size (int, optional): Number of characters read at once.
+
+    Returns:
+        int: The number of rows priced.
+    """
+    n_rows: int = 0
+    for kms in iter_input_chunks(input_stream, block_size):
+        lower, upper = prediction_intervals(model, kms, level)
+        rows: np.ndarray = np.column_stack((model.weights[0] * kms + model.b, lower, upper))
+        # A single formatting call for the whole block
+        output_stream.write(('%.4f,%.4f,%.4f\n' * rows.shape[0]) % tuple(rows.ravel().tolist()))
+        n_rows += rows.shape[0]
+    return n_rows
+
+def estimate_prices_segments_batch(table: SegmentTable, input_stream: TextIO, output_stream: TextIO, \
+                                   block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Prices every `<segment>,<km>` row of an input stream with the line of its segment.
+
+    Args:
+        table (SegmentTable): Coefficients of every segment.
+        input_stream (TextIO): Input with one car per line.
+        output_stream (TextIO): Output receiving one price per line.
+        block_size (int, optional): Number of characters read at once.
+
+    Returns:
+        int: The number of rows priced.
+    """
+    n_rows: int = 0
+    for keys, kms in iter_segment_chunks(input_stream, block_size):
+        prices: np.ndarray = estimate_segment_prices(table, keys, kms)
+        # A single formatting call for the whole block
+        output_stream.write(('%.4f\n' * prices.shape[0]) % tuple(prices.tolist()))
+        n_rows += prices.shape[0]
+    return n_rows
+
+def estimate_price_segment(table: SegmentTable):
+
+    while True:
+        try:
+            key: str = input("Enter the segment of the car: ").strip()
+            kms_to_predict: float = float(input("Enter the value of kms to predict: "))
+            if not (kms_to_predict > 0):
+                print("The value of kilometers must be positive.Please try again.")
+                continue
+            price: float = estimate_segment_prices(table, [key], np.array([kms_to_predict]))[0]
+            break
+
+        except ValueError as e:
+            print(f"Invalid input: {e}")
+
+    print(f"A {key} car with {kms_to_predict} has a price of {price:.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimates the price of a car from its kilometers.")
+    parser.add_argument('--batch', metavar='FILE', nargs='?', const='-',
+                        help="Price every row of FILE (one kilometer value, or one comma-separated row of "
+                             "features per line, '-' or nothing for stdin).")
+    parser.add_argument('--output', metavar='FILE', default='-',
+                        help="Where batch prices are written ('-' for stdout, the default).")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="Number of characters read at once in batch mode.")
+    parser.add_argument('--segments', metavar='FILE', nargs='?', const=SEGMENTS_PATH,
+                        help="Price with the line of each car's segment, from the coefficient table FILE "
+                             f"('{SEGMENTS_PATH}' by default). Batch rows are then '<segment>,<km>'.")
+    parser.add_argument('--interval', metavar='LEVEL', type=float, default=None,
+                        help="Coverage of the prediction intervals of a model trained with the bootstrap "
+                             "(0.95 by default in interactive mode). Batch lines are then 'price,lower,upper'.")
+    args = parser.parse_args()
 
-try:
     # Setting signal
     signal.signal(signal.SIGINT, signal_handler)
-    # Getting coefficients from file
-    w_final, b_final = load_coefficients_from_file(file_path)
-    print(f"Loaded coefficients: w_final = {w_final:.4f}, b_final = {b_final:.4f}")
-    # Making prediction
-    estimate_price(w_final, b_final)
-except ValueError as e:
-    print(f"Failed to load coefficients: {e}")
+    if args.segments is not None:
+        main_segments(args)
+        return
+
+    try:
+        # Getting coefficients from the model file, or the legacy coefficients file
+        feature_names, weights, b_final = load_model_coefficients(default_coefficients_path())
+    except ValueError as e:
+        print(f"Failed to load coefficients: {e}")
+        return
+
+    try:
+        interval_model = load_interval_model(default_coefficients_path())
+        level = 0.95 if args.interval is None else args.interval
+        if interval_model is not None:
+            interval_levels(interval_model, level)
+        elif args.interval is not None:
+            raise ValueError("The model has no bootstrap quantiles, train it with the bootstrap option.")
+    except ValueError as e:
+        print(f"Failed to load prediction intervals: {e}")
+        return
+
+    w_final = weights[0] if weights.shape[0] == 1 else weights
+    if args.batch is None:
+        if weights.shape[0] == 1:
+            print(f"Loaded coefficients: w_final = {w_final:.4f}, b_final = {b_final:.4f}")
+            # Making prediction
+            estimate_price(w_final, b_final, interval_model, level)
+        elif is_expanded_model(feature_names):
+            print(f"Loaded coefficients for {', '.join(feature_names)}: b_final = {b_final:.4f}")
+            # Making prediction
+            estimate_price_expanded(feature_names, weights, b_final)
+        else:
+            print(f"Loaded coefficients for {', '.join(feature_names)}: b_final = {b_final:.4f}")
+            # Making prediction
+            estimate_price_multivariate(feature_names, weights, b_final)
+        return
+
+    input_stream = sys.stdin if args.batch == '-' else open(args.batch, 'r')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.interval is not None:
+            n_rows = estimate_prices_intervals_batch(interval_model, level, input_stream, output_stream, args.block_size)
+        else:
+            n_rows = estimate_prices_batch(w_final, b_final, input_stream, output_stream, args.block_size, feature_names)
+        print(f"{n_rows} prices estimated.", file=sys.stderr)
+    except ValueError as e:
+        print(f"Failed to estimate prices: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+def main_segments(args):
+    try:
+        table = load_segment_table(args.segments)
+    except (IOError, ValueError) as e:
+        print(f"Failed to load segment coefficients: {e}")
+        return
+
+    if args.batch is None:
+        print(f"Loaded coefficients of {table.keys.shape[0]} segments.")
+        # Making prediction
+        estimate_price_segment(table)
+        return
+
+    input_stream = sys.stdin if args.batch == '-' else open(args.batch, 'r')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        n_rows = estimate_prices_segments_batch(table, input_stream, output_stream, args.block_size)
+        print(f"{n_rows} prices estimated.", file=sys.stderr)
+    except ValueError as e:
+        print(f"Failed to estimate prices: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+if __name__ == "__main__":
+    main()
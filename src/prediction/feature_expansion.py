@@ -0,0 +1,61 @@
+"""
+Expansion of the kilometers into the features of a polynomial or spline model.
+
+Same feature names as src/training/modules/feature_expansion.py, keep both in sync:
+    km^p                 power p of the kilometers ("km" for p = 1)
+    max(km-K,0)^p        truncated power of a knot K ("max(km-K,0)" for p = 1)
+"""
+from typing import List, Sequence, Tuple
+import re
+import numpy as np
+
+FEATURE_PATTERN = re.compile(r'^(?:km|max\(km-(?P<knot>[0-9.e+]+),0\))(?:\^(?P<power>[0-9]+))?$')
+
+
+def is_expanded_model(feature_names: Sequence[str]) -> bool:
+    """
+    Tells whether every feature of a model is a function of km, other than km itself.
+
+    Args:
+        feature_names (Sequence[str]): Feature names of the model.
+
+    Returns:
+        bool: True if the kilometers must be expanded before pricing.
+    """
+    return list(feature_names) != ['km'] and all(FEATURE_PATTERN.match(name) for name in feature_names)
+
+
+def parse_feature_names(feature_names: Sequence[str]) -> List[Tuple[float, int]]:
+    """
+    Parses expanded feature names into (knot, power) pairs, with no knot (NaN) for powers of km.
+
+    Raises:
+        ValueError: If a name does not describe an expansion of km.
+    """
+    terms: List[Tuple[float, int]] = []
+    for name in feature_names:
+        match = FEATURE_PATTERN.match(name)
+        if match is None:
+            raise ValueError(f"'{name}' is not an expansion of km.")
+        knot: float = float(match.group('knot')) if match.group('knot') else float('nan')
+        terms.append((knot, int(match.group('power') or 1)))
+    return terms
+
+
+def expand_features(kms: np.ndarray, feature_names: Sequence[str]) -> np.ndarray:
+    """
+    Computes the expanded features of kilometers.
+
+    Args:
+        kms (np.ndarray): Kilometers.
+        feature_names (Sequence[str]): Feature names of the model.
+
+    Returns:
+        np.ndarray: The features, shape (len(kms), k).
+    """
+    features: np.ndarray = np.empty((kms.shape[0], len(feature_names)), dtype=np.float64)
+    for j, (knot, power) in enumerate(parse_feature_names(feature_names)):
+        # Truncated terms are zero before their knot
+        column: np.ndarray = kms if np.isnan(knot) else np.maximum(kms - knot, 0)
+        features[:, j] = column if power == 1 else column ** power
+    return features
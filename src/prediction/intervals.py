@@ -0,0 +1,72 @@
+"""
+Prediction intervals from the bootstrap quantiles stored in a model file.
+
+The price of a car is uncertain twice: the line is only estimated (the spread of the
+bootstrap coefficients), and cars deviate from the line (the spread of the residuals).
+On the centered kilometers the price at the mean and the slope are (nearly)
+uncorrelated, so the deviation of the line at km is combined from both in quadrature,
+then with the residual quantile of the same side:
+
+    line(km)   = sqrt(d_mean_price ** 2 + (d_w * (km - mean)) ** 2)
+    bound(km)  = price(km) -/+ sqrt(line(km) ** 2 + residual ** 2)
+"""
+from typing import Tuple
+import numpy as np
+
+from model_store import Model
+
+
+def interval_levels(model: Model, level: float) -> Tuple[int, int]:
+    """
+    Finds the stored quantiles of the bounds of a central interval.
+
+    Args:
+        model (Model): A model with bootstrap quantiles.
+        level (float): Coverage of the interval, e.g. 0.95.
+
+    Returns:
+        Tuple[int, int]: The rows of the lower and upper quantiles.
+
+    Raises:
+        ValueError: If the model has no quantiles or not the ones of this level.
+    """
+    if model.quantiles is None:
+        raise ValueError("The model has no bootstrap quantiles, train it with the bootstrap option.")
+    levels: np.ndarray = model.quantiles.levels
+    lower: np.ndarray = np.flatnonzero(np.isclose(levels, (1 - level) / 2))
+    upper: np.ndarray = np.flatnonzero(np.isclose(levels, (1 + level) / 2))
+    if not lower.shape[0] or not upper.shape[0]:
+        available = sorted({round(float(high - low), 6) for low in levels for high in levels
+                            if np.isclose(low + high, 1) and high > low})
+        raise ValueError(f"No {level:g} interval in the model, available: {', '.join(f'{a:g}' for a in available)}.")
+    return int(lower[0]), int(upper[0])
+
+
+def prediction_intervals(model: Model, kms: np.ndarray, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the prediction interval of the price of cars of a single-feature (km) model.
+
+    Args:
+        model (Model): A model with bootstrap quantiles.
+        kms (np.ndarray): Kilometers.
+        level (float, optional): Coverage of the intervals.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The lower and upper bounds of the prices.
+
+    Raises:
+        ValueError: If the model has no quantiles of this level.
+    """
+    lower, upper = interval_levels(model, level)
+    quantiles = model.quantiles
+    w: float = model.weights[0]
+    mean_km: float = model.means[0]
+    prices: np.ndarray = w * kms + model.b
+    mean_price: float = w * mean_km + model.b
+
+    # The slope is spread over the whole interval, on both sides of the mean km
+    slope_deviation: np.ndarray = (quantiles.weights[upper, 0] - quantiles.weights[lower, 0]) / 2 * (kms - mean_km)
+    line_lower: np.ndarray = np.hypot(mean_price - quantiles.mean_prices[lower], slope_deviation)
+    line_upper: np.ndarray = np.hypot(quantiles.mean_prices[upper] - mean_price, slope_deviation)
+    return prices - np.hypot(line_lower, quantiles.residuals[lower]), \
+           prices + np.hypot(line_upper, quantiles.residuals[upper])
@@ -0,0 +1,149 @@
+"""
+Layout and reader of the versioned model files written by the training program.
+
+This is the only reader of the format: the training program imports the layout, Model,
+BootstrapQuantiles and load_model from here (src/training/modules/model_store.py only
+adds the writers). All little-endian:
+    header:   magic (8 bytes) | version (uint32) | number of features k (uint32) | number of rows (uint64)
+              | trained at, Unix time (float64) | training cost (float64) | SHA-256 of the data (32 bytes)
+              | length of the feature names (uint32)
+    names:    the k feature names, UTF-8, separated by '\n'
+    payload:  3k + 1 float64: weights (k) | intercept | feature means (k) | feature standard deviations (k)
+    quantiles (version 2 only): number of levels L (uint32) | number of bootstrap replicates (uint32)
+              | L (k + 3) float64: levels (L) | weights (L x k) | price at the feature means (L) | residuals (L)
+    trailer:  CRC-32 of everything before it (uint32)
+"""
+from typing import NamedTuple, Tuple
+import struct
+import zlib
+import numpy as np
+
+MODEL_MAGIC: bytes = b'FTLRMODL'
+MODEL_VERSION: int = 1
+MODEL_QUANTILES_VERSION: int = 2
+MODEL_HEADER = struct.Struct('<8sIIQdd32sI')
+MODEL_QUANTILES_HEADER = struct.Struct('<II')
+MODEL_TRAILER = struct.Struct('<I')
+
+model_path = 'model.bin'
+
+
+class BootstrapQuantiles(NamedTuple):
+    """
+    Quantiles of the coefficients of a model over bootstrap replicates of its training data.
+
+    The intercept is replaced by the price at the feature means, b + weights . means: on the
+    centered features it is (nearly) uncorrelated with the weights, so the quantiles of
+    each can be combined into intervals of the price anywhere.
+
+    Attributes:
+        levels (np.ndarray): Quantile levels, increasing, e.g. [0.025, ..., 0.975].
+        weights (np.ndarray): Quantiles of the weights, shape (L, k).
+        mean_prices (np.ndarray): Quantiles of the price at the feature means.
+        residuals (np.ndarray): Quantiles of the residuals y - prediction of the model on its training data.
+        n_replicates (int): Number of bootstrap replicates.
+    """
+    levels: np.ndarray
+    weights: np.ndarray
+    mean_prices: np.ndarray
+    residuals: np.ndarray
+    n_replicates: int
+
+
+class Model(NamedTuple):
+    """
+    A trained linear model and what is known about its training.
+
+    Attributes:
+        feature_names (Tuple[str, ...]): Names of the features, in the order of the weights.
+        weights (np.ndarray): Slope of each feature, on the original scale.
+        b (float): Intercept, on the original scale.
+        means (np.ndarray): Means of the training features.
+        standard_deviations (np.ndarray): Standard deviations of the training features.
+        cost (float): Squared error cost of the model on its training data, NaN if unknown.
+        n_rows (int): Number of training rows.
+        data_hash (bytes): SHA-256 of the training data, zeros if unknown.
+        trained_at (float): Unix time of the training.
+        quantiles (BootstrapQuantiles): Bootstrap quantiles of the coefficients, None if not computed.
+    """
+    feature_names: Tuple[str, ...]
+    weights: np.ndarray
+    b: float
+    means: np.ndarray
+    standard_deviations: np.ndarray
+    cost: float
+    n_rows: int
+    data_hash: bytes
+    trained_at: float
+    quantiles: BootstrapQuantiles = None
+
+
+def is_model_file(file_path: str) -> bool:
+    """
+    Tells whether a file is a model file rather than a legacy coefficients file.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        bool: True if the file starts with the model magic.
+    """
+    with open(file_path, 'rb') as file:
+        return file.read(len(MODEL_MAGIC)) == MODEL_MAGIC
+
+
+def load_model(file_path: str) -> Model:
+    """
+    Reads a model file and checks its integrity.
+
+    The file is read in a single call and parsed in place: the header with struct,
+    the payload with np.frombuffer.
+
+    Args:
+        file_path (str): Path to the model file.
+
+    Returns:
+        Model: The model.
+
+    Raises:
+        ValueError: If the file is not a model file, has an unknown version, is truncated
+                    or its checksum does not match.
+    """
+    with open(file_path, 'rb') as file:
+        content: bytes = file.read()
+
+    if content[:len(MODEL_MAGIC)] != MODEL_MAGIC:
+        raise ValueError(f"{file_path} is not a model file.")
+    if len(content) < MODEL_HEADER.size + MODEL_TRAILER.size:
+        raise ValueError(f"{file_path} is truncated.")
+    magic, version, n_features, n_rows, trained_at, cost, data_hash, names_length = MODEL_HEADER.unpack_from(content)
+    if version not in (MODEL_VERSION, MODEL_QUANTILES_VERSION):
+        raise ValueError(f"Unsupported model version {version} in {file_path}.")
+    payload_offset: int = MODEL_HEADER.size + names_length
+    quantiles_offset: int = payload_offset + 8 * (3 * n_features + 1)
+    n_levels: int = 0
+    n_replicates: int = 0
+    if version == MODEL_QUANTILES_VERSION:
+        if len(content) < quantiles_offset + MODEL_QUANTILES_HEADER.size + MODEL_TRAILER.size:
+            raise ValueError(f"{file_path} is truncated.")
+        n_levels, n_replicates = MODEL_QUANTILES_HEADER.unpack_from(content, quantiles_offset)
+        quantiles_offset += MODEL_QUANTILES_HEADER.size
+    if len(content) != quantiles_offset + 8 * n_levels * (n_features + 3) + MODEL_TRAILER.size:
+        raise ValueError(f"{file_path} is truncated.")
+    (checksum,) = MODEL_TRAILER.unpack_from(content, len(content) - MODEL_TRAILER.size)
+    if checksum != zlib.crc32(memoryview(content)[:-MODEL_TRAILER.size]):
+        raise ValueError(f"Checksum mismatch in {file_path}.")
+
+    feature_names: Tuple[str, ...] = tuple(content[MODEL_HEADER.size:payload_offset].decode('utf-8').split('\n'))
+    payload: np.ndarray = np.frombuffer(content, dtype='<f8', count=3 * n_features + 1, offset=payload_offset)
+    quantiles: BootstrapQuantiles = None
+    if version == MODEL_QUANTILES_VERSION:
+        values: np.ndarray = np.frombuffer(content, dtype='<f8', count=n_levels * (n_features + 3), offset=quantiles_offset)
+        weights_end: int = n_levels * (n_features + 1)
+        quantiles = BootstrapQuantiles(values[:n_levels].copy(),
+                                       values[n_levels:weights_end].reshape(n_levels, n_features).copy(),
+                                       values[weights_end:weights_end + n_levels].copy(),
+                                       values[weights_end + n_levels:].copy(), n_replicates)
+    return Model(feature_names, payload[:n_features].copy(), float(payload[n_features]),
+                 payload[n_features + 1:2 * n_features + 1].copy(), payload[2 * n_features + 1:].copy(),
+                 cost, n_rows, data_hash, trained_at, quantiles)
@@ -0,0 +1,101 @@
+"""
+Reader of the coefficient table of a segmented model: one price line per segment
+(car model, region, ...), written by src/training/modules/segments.py.
+
+    segment,w_final,b_final,n_rows,cost      header
+    <key>,<w>,<b>,<rows>,<cost>              one row per segment, sorted by key
+"""
+from typing import Dict, NamedTuple, Sequence
+import csv
+import numpy as np
+
+SEGMENTS_PATH = 'segments.csv'
+
+
+class SegmentTable(NamedTuple):
+    """
+    The coefficients of every segment, in key order.
+
+    Attributes:
+        keys (np.ndarray): Sorted segment keys, as strings.
+        weights (np.ndarray): Slope of each segment.
+        intercepts (np.ndarray): Intercept of each segment.
+        rows (Dict[str, int]): Row of each key, for lookups.
+    """
+    keys: np.ndarray
+    weights: np.ndarray
+    intercepts: np.ndarray
+    rows: Dict[str, int]
+
+
+def load_segment_table(file_path: str = SEGMENTS_PATH) -> SegmentTable:
+    """
+    Loads the coefficient table of a segmented model.
+
+    Args:
+        file_path (str, optional): Path to the CSV table.
+
+    Returns:
+        SegmentTable: The coefficients, sorted by key.
+
+    Raises:
+        ValueError: If the file is not a segment table or a value is invalid.
+    """
+    with open(file_path, 'r', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None or header[:3] != ['segment', 'w_final', 'b_final']:
+            raise ValueError(f"{file_path} is not a segment coefficient table.")
+        rows = list(reader)
+
+    keys: np.ndarray = np.array([row[0] for row in rows], dtype=str)
+    weights: np.ndarray = np.array([row[1] for row in rows], dtype=np.float64)
+    intercepts: np.ndarray = np.array([row[2] for row in rows], dtype=np.float64)
+    order: np.ndarray = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    rows_of_keys: Dict[str, int] = {key: row for row, key in enumerate(keys.tolist())}
+    if len(rows_of_keys) != keys.shape[0]:
+        raise ValueError(f"{file_path} has duplicated segments.")
+    return SegmentTable(keys, weights[order], intercepts[order], rows_of_keys)
+
+
+def lookup_segments(table: SegmentTable, keys: Sequence[str]) -> np.ndarray:
+    """
+    Finds the rows of the table of many keys at once.
+
+    The keys are looked up in a dict, which on the strings the predictor parses is
+    faster than a binary search over a numpy array of strings.
+
+    Args:
+        table (SegmentTable): The coefficient table.
+        keys (Sequence[str]): Segment keys.
+
+    Returns:
+        np.ndarray: The row of each key in the table.
+
+    Raises:
+        ValueError: If a key is not in the table.
+    """
+    try:
+        return np.fromiter(map(table.rows.__getitem__, keys), dtype=np.intp, count=len(keys))
+    except KeyError as e:
+        raise ValueError(f"Unknown segment {e}.") from None
+
+
+def estimate_segment_prices(table: SegmentTable, keys: Sequence[str], kms: np.ndarray) -> np.ndarray:
+    """
+    Prices kilometers with the line of their segment.
+
+    Args:
+        table (SegmentTable): The coefficient table.
+        keys (Sequence[str]): Segment of each car.
+        kms (np.ndarray): Kilometers of each car.
+
+    Returns:
+        np.ndarray: The prices.
+
+    Raises:
+        ValueError: If a key is not in the table.
+    """
+    indices: np.ndarray = lookup_segments(table, keys)
+    return table.weights[indices] * kms + table.intercepts[indices]
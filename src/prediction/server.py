@@ -0,0 +1,260 @@
+"""
+Long-lived local prediction server.
+
+Loads the coefficients once and answers price queries over HTTP, on a TCP port
+or a Unix socket. The model file (or the legacy coefficients file) is watched and
+reloaded when it changes, without interrupting the requests being served.
+
+    GET  /predict?km=50000          -> {"km": 50000.0, "price": 7427.15}
+    POST /predict {"km": [1, 2]}    -> {"prices": [8499.57, 8499.55]}
+    GET  /health                    -> {"w_final": ..., "b_final": ..., "loaded_at": ...}
+"""
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+import numpy as np
+
+from estimate_price import load_model_coefficients, default_coefficients_path
+
+# Seconds between two checks of the coefficients file
+DEFAULT_RELOAD_INTERVAL: float = 1.0
+
+HTTP_REASONS: Dict[int, str] = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+def check_single_feature(feature_names: List[str]) -> None:
+    """
+    Checks that a model only uses the km feature, the only one the queries give.
+
+    Raises:
+        ValueError: If the model has other features.
+    """
+    if feature_names != ['km']:
+        raise ValueError(f"The server only serves single-feature (km) models, not {', '.join(feature_names)}.")
+
+
+class CoefficientStore:
+    """
+    Holds the current coefficients and reloads them when their file changes.
+
+    The coefficients are swapped as a single tuple, so a request always sees a
+    consistent (w, b) pair, either the old one or the new one.
+    """
+
+    def __init__(self, coefficients_path: str) -> None:
+        self.coefficients_path: str = coefficients_path
+        self.coefficients: Tuple[float, float] = self.load()
+        self.mtime: float = os.stat(coefficients_path).st_mtime
+        self.loaded_at: float = time.time()
+
+    def load(self) -> Tuple[float, float]:
+        """
+        Reads the (w, b) pair of the model file or of the legacy coefficients file.
+
+        Raises:
+            ValueError: If the file is invalid or the model has more than the km feature.
+        """
+        feature_names, weights, b_final = load_model_coefficients(self.coefficients_path)
+        check_single_feature(feature_names)
+        return float(weights[0]), b_final
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the coefficients if the modification time of their file changed.
+
+        A file that cannot be parsed (e.g. caught while being written) is ignored and
+        the previous coefficients stay in use until the next check. A valid model the
+        server cannot serve is reported once, and the previous coefficients stay in use
+        until the file changes again.
+
+        Returns:
+            bool: True if new coefficients were loaded.
+        """
+        try:
+            mtime: float = os.stat(self.coefficients_path).st_mtime
+            if mtime == self.mtime:
+                return False
+            feature_names, weights, b_final = load_model_coefficients(self.coefficients_path)
+        except (OSError, ValueError, IndexError):
+            return False
+        self.mtime = mtime
+        try:
+            check_single_feature(feature_names)
+        except ValueError as e:
+            print(f"Warning: not reloading {self.coefficients_path}: {e} Keeping w_final = {self.coefficients[0]}, b_final = {self.coefficients[1]}.")
+            return False
+        self.coefficients = float(weights[0]), b_final
+        self.loaded_at = time.time()
+        print(f"Reloaded coefficients: w_final = {self.coefficients[0]}, b_final = {self.coefficients[1]}")
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Checks the coefficients file every `interval` seconds, forever."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+
+def handle_predict(store: CoefficientStore, method: str, query: Dict[str, list], body: bytes) -> Tuple[int, dict]:
+    """
+    Computes the prices of a single (GET) or batched (POST) query.
+
+    Args:
+        store (CoefficientStore): Current coefficients.
+        method (str): HTTP method of the request.
+        query (Dict[str, list]): Parsed query string.
+        body (bytes): Request body.
+
+    Returns:
+        Tuple[int, dict]: The HTTP status and the JSON payload of the response.
+    """
+    w_final, b_final = store.coefficients
+    try:
+        if method == 'GET':
+            km: float = float(query['km'][0])
+            # JSON has no NaN or infinity
+            if not math.isfinite(km):
+                raise ValueError("'km' must be a finite number.")
+            return 200, {'km': km, 'price': w_final * km + b_final}
+        if method == 'POST':
+            kms: np.ndarray = np.asarray(json.loads(body)['km'], dtype=np.float64)
+            if kms.ndim != 1:
+                raise ValueError("'km' must be a list of numbers.")
+            if not np.isfinite(kms).all():
+                raise ValueError("'km' must only hold finite numbers.")
+            return 200, {'prices': (w_final * kms + b_final).tolist()}
+    except (KeyError, ValueError, TypeError) as e:
+        return 400, {'error': f"Invalid query: {e}"}
+    return 405, {'error': f"Method {method} is not allowed."}
+
+
+def route(store: CoefficientStore, method: str, target: str, body: bytes) -> Tuple[int, dict]:
+    url = urlsplit(target)
+    if url.path == '/predict':
+        return handle_predict(store, method, parse_qs(url.query), body)
+    if url.path == '/health':
+        w_final, b_final = store.coefficients
+        return 200, {'w_final': w_final, 'b_final': b_final, 'loaded_at': store.loaded_at}
+    return 404, {'error': f"Unknown path {url.path}."}
+
+
+def parse_content_length(headers: Dict[str, str]) -> int:
+    """
+    Reads the length of the body of a request.
+
+    Raises:
+        ValueError: If the Content-Length header is not a non-negative integer.
+    """
+    value: str = headers.get('content-length', '0')
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"Invalid Content-Length '{value}'.")
+    return int(value)
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+    """
+    Writes a JSON response.
+    """
+    content: bytes = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(content)}\r\n"
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content)
+
+
+async def serve_connection(store: CoefficientStore, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serves the HTTP/1.1 requests of one connection, keeping it alive between requests.
+    """
+    try:
+        while True:
+            try:
+                head: bytes = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                break
+
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = request_line.split(' ')
+            except ValueError:
+                break
+            headers: Dict[str, str] = {}
+            for line in header_lines:
+                if line:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+            try:
+                content_length: int = parse_content_length(headers)
+            except ValueError as e:
+                # The end of the body is unknown, so the connection cannot be reused
+                write_response(writer, 400, {'error': f"Invalid request: {e}"}, keep_alive=False)
+                await writer.drain()
+                break
+            body: bytes = b''
+            if content_length:
+                body = await reader.readexactly(content_length)
+
+            status, payload = route(store, method, target, body)
+            keep_alive: bool = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_server(coefficients_path: str, host: str, port: int, unix_path: Optional[str], reload_interval: float) -> None:
+    store = CoefficientStore(coefficients_path)
+    print(f"Loaded coefficients: w_final = {store.coefficients[0]:.4f}, b_final = {store.coefficients[1]:.4f}")
+
+    handler = lambda reader, writer: serve_connection(store, reader, writer)
+    if unix_path:
+        server = await asyncio.start_unix_server(handler, path=unix_path)
+        print(f"Serving predictions on unix socket {unix_path}")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"Serving predictions on http://{host}:{port}")
+
+    watcher = asyncio.create_task(store.watch(reload_interval))
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set_result, None)
+
+    async with server:
+        await stop
+    watcher.cancel()
+    if unix_path and os.path.exists(unix_path):
+        os.remove(unix_path)
+    print("Goodbye. See you around!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', metavar='PATH', help="Listen on a Unix socket instead of a TCP port.")
+    parser.add_argument('--coefficients', default=default_coefficients_path(),
+                        help="Path to the model file, or to a legacy coefficients file.")
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help="Seconds between two checks of the coefficients file.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(args.coefficients, args.host, args.port, args.unix, args.reload_interval))
+    except (IOError, ValueError) as e:
+        print(f"Failed to start the server: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares cold-start time and peak memory of loading the dataset from CSV with
+pandas against memory-mapping its binary copy.
+
+Each load runs in a fresh process and ends by reducing both columns, so the
+timings include actually reading the data. Note that touched pages of a memory
+map count in the RSS while staying shared with the page cache.
+
+Run from src/training:
+    python -m benchmarks.bench_binary_dataset --sizes 1e6 1e7 1e8
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .bench_streaming import write_synthetic_csv
+
+
+def run_child(file_path: str, loader: str) -> None:
+    # Imports are left out of the timing, they are the same for both paths in main.py
+    import pandas as pd
+    from modules.binary_dataset import load_binary_dataset
+
+    start = time.perf_counter()
+    if loader == 'csv':
+        df = pd.read_csv(file_path)
+        data_km = df['km'].to_numpy()
+        data_price = df['price'].to_numpy()
+    else:
+        data_km, data_price = load_binary_dataset(file_path)
+    data_km.sum()
+    data_price.sum()
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RESULT {elapsed} {peak_kib}")
+
+
+def measure(file_path: str, loader: str):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_binary_dataset', '--child', file_path, '--loader', loader],
+                            capture_output=True, text=True, check=True).stdout
+    _, elapsed, peak_kib = output.split()
+    return float(elapsed), int(peak_kib) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7], help='Number of rows of each file.')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--loader', choices=['csv', 'binary'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.loader)
+        return
+
+    from modules.binary_dataset import convert_csv_to_binary
+
+    print(f"{'rows':>12} {'loader':>8} {'file MiB':>10} {'seconds':>10} {'peak RSS MiB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            n_rows = int(size)
+            csv_path = os.path.join(directory, f"data_{n_rows}.csv")
+            binary_path = os.path.join(directory, f"data_{n_rows}.bin")
+            write_synthetic_csv(csv_path, n_rows)
+            convert_csv_to_binary(csv_path, binary_path)
+
+            for loader, file_path in (('csv', csv_path), ('binary', binary_path)):
+                elapsed, peak_mib = measure(file_path, loader)
+                file_mib = os.path.getsize(file_path) / 2**20
+                print(f"{n_rows:>12} {loader:>8} {file_mib:>10.1f} {elapsed:>10.3f} {peak_mib:>14.1f}")
+
+            os.remove(csv_path)
+            os.remove(binary_path)
+
+
+if __name__ == "__main__":
+    main()
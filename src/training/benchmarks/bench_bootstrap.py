@@ -0,0 +1,61 @@
+"""
+Bootstrap replicates per second against the number of worker processes, and against
+fitting each replicate by gathering its rows and running gradient descent.
+
+The slopes of every pool size are compared with those of the first one: the replicates
+are seeded per task, so they must be identical.
+
+Run from src/training:
+    python -m benchmarks.bench_bootstrap --sizes 1e3 1e5 --replicates 2000 --workers 1 2 4
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from modules.bootstrap import bootstrap_coefficients
+from modules.feature_scaling import standardization
+from modules.gradient_descent import run_gradient_descent
+
+from .synthetic import make_synthetic_dataset
+
+
+def gradient_descent_replicates(data_km: np.ndarray, data_price: np.ndarray, n_replicates: int) -> float:
+    """
+    Fits a few replicates the slow way, gathered rows and gradient descent; returns the seconds per replicate.
+    """
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(n_replicates):
+        indices = rng.integers(0, data_km.shape[0], data_km.shape[0])
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_gradient_descent(standardization(data_km[indices]), data_price[indices], 0.0, 0.0)
+    return (time.perf_counter() - start) / n_replicates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5], help='Number of rows of each run.')
+    parser.add_argument('--replicates', type=int, default=2000, help='Number of bootstrap replicates.')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='Pool sizes.')
+    parser.add_argument('--gd-replicates', type=int, default=5, help='Replicates fitted by gradient descent.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'workers':>8} {'seconds':>9} {'replicates/s':>13} {'gd replicates/s':>16} {'identical':>10}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        gd_rate = 1 / gradient_descent_replicates(data_km, data_price, args.gd_replicates)
+        reference = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            slopes, _ = bootstrap_coefficients(data_km, data_price, args.replicates, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            reference = slopes if reference is None else reference
+            print(f"{int(size):>10} {workers:>8} {elapsed:>9.3f} {args.replicates / elapsed:>13.0f} "
+                  f"{gd_rate:>16.1f} {str(np.array_equal(slopes, reference)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Times the evaluation of the cost function over a (w, b) grid: one compute_cost_ft
+call per grid point versus the closed-form grid evaluator.
+
+The per-point loop is timed on a sample of the grid and extrapolated.
+
+Run from src/training:
+    python -m benchmarks.bench_cost_surface --rows 1e6 --grid 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules.cost_function import compute_cost_ft, compute_cost_grid
+
+from .synthetic import make_synthetic_dataset
+
+# Grid points actually evaluated by the per-point loop
+LOOP_SAMPLE: int = 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e6, help='Number of synthetic rows.')
+    parser.add_argument('--grid', type=int, default=1000, help='Number of values of w and of b.')
+    args = parser.parse_args()
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    w_values = np.linspace(-0.03, 0.03, args.grid)
+    b_values = np.linspace(0, 10000, args.grid)
+    points = args.grid * args.grid
+
+    start = time.perf_counter()
+    for w, b in zip(w_values[:LOOP_SAMPLE], b_values[:LOOP_SAMPLE]):
+        compute_cost_ft(data_km, data_price, w, b)
+    loop_seconds = (time.perf_counter() - start) / LOOP_SAMPLE * points
+
+    start = time.perf_counter()
+    costs = compute_cost_grid(data_km, data_price, w_values, b_values)
+    grid_seconds = time.perf_counter() - start
+
+    # Check a few points of the grid against the direct computation
+    error = max(abs(costs[i, j] - compute_cost_ft(data_km, data_price, w_values[i], b_values[j])) / costs[i, j]
+                for i, j in ((0, 0), (args.grid // 2, args.grid // 3), (args.grid - 1, args.grid - 1)))
+
+    print(f"{points} grid points over {int(args.rows)} rows")
+    print(f"per-point loop (extrapolated): {loop_seconds:10.2f} s")
+    print(f"grid evaluator:                {grid_seconds:10.3f} s")
+    print(f"max relative error on samples: {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
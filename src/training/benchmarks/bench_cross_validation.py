@@ -0,0 +1,37 @@
+"""
+Time of a k-fold cross-validation trained by gradient descent in a process pool,
+against folds fitted from their sufficient statistics.
+
+Run from src/training:
+    python -m benchmarks.bench_cross_validation --sizes 1e5 1e6 --folds 5 --workers 1 4
+"""
+import argparse
+import time
+
+from modules.cross_validation import cross_validate, summarize_folds
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e5, 1e6], help='Number of rows of each run.')
+    parser.add_argument('--folds', type=int, default=5, help='Number of folds.')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='Pool sizes of gradient descent.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'solver':>16} {'workers':>8} {'seconds':>10} {'mean mse':>14} {'mean r2':>10}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        runs = [('gradient_descent', workers) for workers in args.workers] + [('normal_equation', 0)]
+        for solver, workers in runs:
+            start = time.perf_counter()
+            rows = cross_validate(data_km, data_price, args.folds, solver=solver, max_workers=workers or None)
+            elapsed = time.perf_counter() - start
+            summary = summarize_folds(rows)
+            print(f"{int(size):>10} {solver:>16} {workers or '-':>8} {elapsed:>10.3f} "
+                  f"{summary['mse'][0]:>14.2f} {summary['r2'][0]:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
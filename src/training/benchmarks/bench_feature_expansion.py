@@ -0,0 +1,54 @@
+"""
+Time and memory of building a cached design matrix, against loading it from the cache,
+in float64 and float32.
+
+The peak is the memory allocated by numpy during the build, traced with tracemalloc:
+it stays around one chunk of rows whatever the size of the dataset, while the matrix
+itself lives in a memory-mapped file.
+
+Run from src/training:
+    python -m benchmarks.bench_feature_expansion --sizes 1e6 1e7 --degree 3 --knots 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from modules.feature_expansion import build_design_matrix, make_feature_names, quantile_knots
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6], help='Number of rows of each run.')
+    parser.add_argument('--degree', type=int, default=3, help='Degree of the expansion.')
+    parser.add_argument('--knots', type=int, default=4, help='Number of knots.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'dtype':>8} {'build s':>9} {'cached s':>9} {'file MB':>9} {'peak MB':>9}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        feature_names = make_feature_names(args.degree, quantile_knots(data_km, args.knots))
+        for dtype in ('float64', 'float32'):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                tracemalloc.start()
+                start = time.perf_counter()
+                design = build_design_matrix(data_km, data_price, feature_names, dtype, cache_dir)
+                build_seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del design
+
+                start = time.perf_counter()
+                design = build_design_matrix(data_km, data_price, feature_names, dtype, cache_dir)
+                cached_seconds = time.perf_counter() - start
+                file_size = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+                del design
+            print(f"{int(size):>10} {dtype:>8} {build_seconds:>9.3f} {cached_seconds:>9.3f} "
+                  f"{file_size / 1e6:>9.1f} {peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark of one gradient descent iteration: separate derivative and cost
+functions versus the fused residual kernel.
+
+For each kernel it reports the wall time per iteration and the peak of temporary
+memory per iteration, expressed in array-sized allocations (peak bytes divided by
+the size of the feature array).
+
+Run from src/training:
+    python -m benchmarks.bench_gradient_kernel --rows 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from modules.cost_function import compute_cost_ft
+from modules.feature_scaling import standardization
+from modules.gradient_descent import partial_derivative_cost_function_of_w, \
+                                     partial_derivative_cost_function_of_b, \
+                                     compute_gradients_and_cost
+
+from .synthetic import make_synthetic_dataset
+
+
+def separate_kernel(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float, residual: np.ndarray):
+    dj_dw = partial_derivative_cost_function_of_w(data_x, data_y, w, b)
+    dj_db = partial_derivative_cost_function_of_b(data_x, data_y, w, b)
+    cost = compute_cost_ft(data_x, data_y, w, b)
+    return dj_dw, dj_db, cost
+
+
+def measure(kernel, data_x: np.ndarray, data_y: np.ndarray, repeats: int):
+    residual = np.empty(data_x.shape[0], dtype=np.float64)
+
+    # Wall time per iteration
+    kernel(data_x, data_y, 0.5, 100.0, residual)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        kernel(data_x, data_y, 0.5, 100.0, residual)
+    seconds = (time.perf_counter() - start) / repeats
+
+    # Peak temporary memory of a single iteration
+    tracemalloc.start()
+    kernel(data_x, data_y, 0.5, 100.0, residual)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e6, help='Number of synthetic rows.')
+    parser.add_argument('--repeats', type=int, default=50, help='Iterations timed per kernel.')
+    args = parser.parse_args()
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    data_x = standardization(data_km)
+
+    print(f"{'kernel':>10} {'ms/iter':>10} {'peak MiB':>10} {'arrays':>8}")
+    for name, kernel in (('separate', separate_kernel), ('fused', compute_gradients_and_cost)):
+        seconds, peak = measure(kernel, data_x, data_price, args.repeats)
+        print(f"{name:>10} {seconds * 1e3:>10.3f} {peak / 2**20:>10.2f} {peak / data_x.nbytes:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
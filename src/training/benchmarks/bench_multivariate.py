@@ -0,0 +1,63 @@
+"""
+Cost of the multivariate engine as the number of features grows: time per
+gradient evaluation (two BLAS matrix-vector products) and time to fit.
+
+Run from src/training:
+    python -m benchmarks.bench_multivariate --rows 1e6 --features 1 10 50 100
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from modules.multivariate import LinearObjective, multivariate_gradient_descent, standardize_columns
+
+# Gradient evaluations timed per feature count
+REPEATS: int = 10
+
+
+def make_features(n_rows: int, n_features: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    data_X = rng.uniform(0, 1, (n_rows, n_features))
+    data_X[:, 0] *= 250000
+    true_weights = rng.normal(0, 1000, n_features)
+    true_weights[0] = -0.0214
+    data_y = data_X @ true_weights + 8500 + rng.normal(0, 500, n_rows)
+    return data_X, data_y, true_weights
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e6, help='Number of synthetic rows.')
+    parser.add_argument('--features', nargs='+', type=int, default=[1, 10, 50, 100])
+    parser.add_argument('--optimizer', default='exact')
+    args = parser.parse_args()
+
+    print(f"{'features':>8} {'ms/gradient':>12} {'GFLOP/s':>8} {'fit s':>8} {'iterations':>10} {'max |w - w_true|':>17}")
+    for n_features in args.features:
+        data_X, data_y, true_weights = make_features(int(args.rows), n_features)
+
+        standardized_X, _, _ = standardize_columns(data_X)
+        objective = LinearObjective(standardized_X, data_y)
+        params = np.zeros(n_features + 1)
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            objective.value_and_gradient(params)
+        per_gradient = (time.perf_counter() - start) / REPEATS
+        # Two matrix-vector products of 2 * m * k floating point operations each
+        gflops = 4 * data_X.size / per_gradient / 1e9
+        del standardized_X, objective
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            params, iterations = multivariate_gradient_descent(data_X, data_y, optimizer=args.optimizer)
+        fit_seconds = time.perf_counter() - start
+        error = np.max(np.abs(params[:-1] - true_weights))
+
+        print(f"{n_features:>8} {per_gradient * 1e3:>12.2f} {gflops:>8.2f} {fit_seconds:>8.2f} {iterations:>10} {error:>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
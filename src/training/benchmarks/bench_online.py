@@ -0,0 +1,56 @@
+"""
+Cost of an online update against a full retrain, and agreement of their coefficients.
+
+The model state is first built from the existing rows, then a batch of new rows is
+folded in online and compared with a retrain (normal equation) on all the rows.
+
+Run from src/training:
+    python -m benchmarks.bench_online --rows 1e7 --new-rows 1e4
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from modules.online import update_model
+from modules.sufficient_statistics import normal_equation
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e7, help='Number of existing rows.')
+    parser.add_argument('--new-rows', type=float, default=1e4, help='Number of rows of the update.')
+    args = parser.parse_args()
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    new_km, new_price = make_synthetic_dataset(int(args.new_rows), seed=7)
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        state_path = os.path.join(directory, 'model_state.json')
+        coefficients_path = os.path.join(directory, 'coefficients.txt')
+        model_path = os.path.join(directory, 'model.bin')
+        update_model(data_km, data_price, state_path=state_path, coefficients_path=coefficients_path,
+                     model_path=model_path)
+
+        start = time.perf_counter()
+        w_online, b_online = update_model(new_km, new_price, state_path=state_path, coefficients_path=coefficients_path,
+                                          model_path=model_path)
+        online_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    w_full, b_full = normal_equation(np.concatenate((data_km, new_km)), np.concatenate((data_price, new_price)))
+    retrain_seconds = time.perf_counter() - start
+
+    print(f"online update of {int(args.new_rows)} rows: {online_seconds * 1e3:10.3f} ms")
+    print(f"full retrain on {int(args.rows + args.new_rows)} rows: {retrain_seconds * 1e3:10.3f} ms")
+    print(f"relative difference: w {abs(w_online - w_full) / abs(w_full):.2e}, b {abs(b_online - b_full) / abs(b_full):.2e}")
+
+
+if __name__ == "__main__":
+    main()
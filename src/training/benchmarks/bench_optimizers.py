@@ -0,0 +1,52 @@
+"""
+Iterations to convergence and wall time of every optimizer, on the shipped dataset
+and on synthetic datasets.
+
+Run from src/training:
+    python -m benchmarks.bench_optimizers --sizes 1e6 1e7
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from modules.feature_scaling import standardization, denormalize_coefficients
+from modules.gradient_descent import run_gradient_descent
+from modules.optimizers import OPTIMIZERS
+
+from .synthetic import make_synthetic_dataset
+
+
+def benchmark(label: str, data_km, data_price, max_iterations: int) -> None:
+    standardized_km = standardization(data_km)
+    for optimizer in OPTIMIZERS:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_gradient_descent(standardized_km, data_price, 0, 0, optimizer=optimizer, max_iterations=max_iterations)
+        elapsed = time.perf_counter() - start
+        w, b = denormalize_coefficients(data_km, result.w, result.b)
+        print(f"{label:>12} {optimizer:>16} {result.iterations:>10} {str(result.converged):>9} "
+              f"{elapsed:>10.3f} {result.cost:>16.4f} {w:>12.8f} {b:>12.4f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6], help='Number of rows of the synthetic runs.')
+    parser.add_argument('--max-iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'dataset':>12} {'optimizer':>16} {'iterations':>10} {'converged':>9} "
+          f"{'seconds':>10} {'cost':>16} {'w':>12} {'b':>12}")
+
+    df = pd.read_csv('../../data/data.csv')
+    benchmark('data.csv', df['km'].to_numpy(), df['price'].to_numpy(), args.max_iterations)
+
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        benchmark(str(int(size)), data_km, data_price, args.max_iterations)
+
+
+if __name__ == "__main__":
+    main()
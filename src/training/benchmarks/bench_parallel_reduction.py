@@ -0,0 +1,94 @@
+"""
+Speedup of the multithreaded chunked reductions against the thread count, and their
+reproducibility.
+
+For each size, the fused gradient kernel and the cost are timed with numpy's own
+reductions (the "numpy" rows) and with a ParallelReducer of each thread count. The
+speedup is relative to the numpy kernel. The sums of every run are compared bit for
+bit with those of the first reducer: with fixed chunks they must be identical across
+repeated runs and across thread counts. The last lines fit a line by gradient descent
+twice per thread count and compare the parameters bit for bit.
+
+Run from src/training:
+    python -m benchmarks.bench_parallel_reduction --sizes 1e6 1e7 1e8 --threads 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from modules.cost_function import compute_cost_ft
+from modules.feature_scaling import standardization
+from modules.gradient_descent import compute_gradients_and_cost, run_gradient_descent
+from modules.parallel_reduction import ParallelReducer
+
+from .synthetic import make_synthetic_dataset
+
+
+def time_kernel(data_x: np.ndarray, data_y: np.ndarray, residual: np.ndarray, reducer: ParallelReducer,
+                runs: int):
+    """
+    Times the gradient kernel and the cost; returns their seconds per call and the kernel result of every run.
+    """
+    outcomes = []
+    start = time.perf_counter()
+    for _ in range(runs):
+        outcomes.append(compute_gradients_and_cost(data_x, data_y, 0.5, 1.5, residual, reducer=reducer))
+    kernel_seconds = (time.perf_counter() - start) / runs
+    start = time.perf_counter()
+    for _ in range(runs):
+        compute_cost_ft(data_x, data_y, 0.5, 1.5, reducer=reducer)
+    cost_seconds = (time.perf_counter() - start) / runs
+    return kernel_seconds, cost_seconds, outcomes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7], help='Number of rows of each run.')
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 2, 4, 8], help='Thread counts.')
+    parser.add_argument('--runs', type=int, default=10, help='Timed calls per thread count.')
+    parser.add_argument('--fit-rows', type=float, default=1e6, help='Rows of the reproducibility fit.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'threads':>8} {'kernel ms':>10} {'speedup':>8} {'cost ms':>9} {'speedup':>8} "
+          f"{'identical':>10}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        data_x = standardization(data_km)
+        residual = np.empty_like(data_x)
+        del data_km
+        numpy_kernel, numpy_cost, _ = time_kernel(data_x, data_price, residual, None, args.runs)
+        print(f"{int(size):>10} {'numpy':>8} {numpy_kernel * 1e3:>10.2f} {1.0:>8.2f} {numpy_cost * 1e3:>9.2f} "
+              f"{1.0:>8.2f} {'-':>10}")
+        reference = None
+        for threads in args.threads:
+            with ParallelReducer(threads) as reducer:
+                kernel_seconds, cost_seconds, outcomes = time_kernel(data_x, data_price, residual, reducer, args.runs)
+            reference = outcomes[0] if reference is None else reference
+            identical = all(outcome == reference for outcome in outcomes)
+            print(f"{int(size):>10} {threads:>8} {kernel_seconds * 1e3:>10.2f} {numpy_kernel / kernel_seconds:>8.2f} "
+                  f"{cost_seconds * 1e3:>9.2f} {numpy_cost / cost_seconds:>8.2f} {str(identical):>10}")
+        del data_x, data_price, residual
+
+    # Whole fits: the parameters of every run and thread count must be the same bits
+    data_km, data_price = make_synthetic_dataset(int(args.fit_rows))
+    data_x = standardization(data_km)
+    fits = []
+    for threads in args.threads:
+        if threads == 1:
+            # threads=1 is numpy's own reductions in run_gradient_descent
+            continue
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_gradient_descent(data_x, data_price, 0.0, 0.0, threads=threads)
+            fits.append((threads, result.w, result.b, result.iterations))
+    if fits:
+        identical = all(fit[1:] == fits[0][1:] for fit in fits)
+        print(f"\nFits of {int(args.fit_rows)} rows with {sorted({fit[0] for fit in fits})} threads, twice each: "
+              f"w={fits[0][1]!r} b={fits[0][2]!r} after {fits[0][3]} iterations, identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
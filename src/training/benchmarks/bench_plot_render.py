@@ -0,0 +1,63 @@
+"""
+Render time and image size of the data plots as the number of points grows.
+
+Every plot is rendered with the default point budget (sample or density above
+MAX_PLOTTED_POINTS) and, up to --full-up-to points, with every point drawn.
+
+Run from src/training:
+    python -m benchmarks.bench_plot_render --sizes 1e3 1e4 1e5 1e6
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from modules import plotting
+
+from .synthetic import make_synthetic_dataset, SYNTHETIC_W, SYNTHETIC_B
+
+# Plots measured, with the regression line arguments they take
+PLOTS = {
+    'plot_data': (plotting.plot_data, ()),
+    'plot_with_regression_line': (plotting.plot_with_regression_line, (SYNTHETIC_W, SYNTHETIC_B)),
+    'plot_deviation': (plotting.plot_deviation, (SYNTHETIC_W, SYNTHETIC_B)),
+}
+
+
+def render(plot_function, arguments, plot_path: str, max_points) -> float:
+    """
+    Renders a plot to a file and returns the time it took.
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        plot_function(*arguments, plot_path=plot_path, max_points=max_points)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6], help='Number of points of each run.')
+    parser.add_argument('--full-up-to', type=float, default=1e5, help='Largest size also rendered with every point.')
+    args = parser.parse_args()
+
+    print(f"{'plot':>26} {'points':>10} {'budget s':>10} {'budget kB':>10} {'all s':>10} {'all kB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        plot_path = os.path.join(directory, 'plot.png')
+        # Import matplotlib before timing
+        render(plotting.plot_data, make_synthetic_dataset(10), plot_path, None)
+        for size in args.sizes:
+            data_km, data_price = make_synthetic_dataset(int(size))
+            for name, (plot_function, line) in PLOTS.items():
+                budget = render(plot_function, (data_km, data_price, *line), plot_path, plotting.MAX_PLOTTED_POINTS)
+                budget_kb = os.path.getsize(plot_path) / 1e3
+                full = full_kb = float('nan')
+                if size <= args.full_up_to:
+                    full = render(plot_function, (data_km, data_price, *line), plot_path, None)
+                    full_kb = os.path.getsize(plot_path) / 1e3
+                print(f"{name:>26} {int(size):>10} {budget:>10.3f} {budget_kb:>10.1f} {full:>10.3f} {full_kb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
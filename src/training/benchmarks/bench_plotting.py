@@ -0,0 +1,68 @@
+"""
+Start-up and training time with inline, background and no plots.
+
+Import times are measured in fresh interpreters, the training time is the time
+lauch_gradient_descent takes to return (background plots keep rendering after it).
+
+Run from src/training:
+    python -m benchmarks.bench_plotting --rows 1e5
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .synthetic import make_synthetic_dataset
+
+# Modules whose start-up time is measured
+IMPORTED_MODULES = ('numpy', 'modules.gradient_descent', 'main')
+
+
+def import_seconds(module: str, repeat: int) -> float:
+    """
+    Measures the fastest import of a module in a fresh interpreter.
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return min(float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e5, help='Number of rows of the training runs.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measure, the fastest is kept.')
+    args = parser.parse_args()
+
+    for module in IMPORTED_MODULES:
+        print(f"import {module:<26} {import_seconds(module, args.repeat) * 1e3:10.1f} ms")
+
+    from modules.gradient_descent import lauch_gradient_descent
+    from modules.plot_worker import wait_for_plots
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    with tempfile.TemporaryDirectory() as directory:
+        coefficients_path = os.path.join(directory, 'coefficients.txt')
+        model_path = os.path.join(directory, 'model.bin')
+        for label, options in (('no plots', {'plots': False}),
+                               ('inline plots', {'background_plots': False}),
+                               ('background plots', {})):
+            best = best_with_plots = float('inf')
+            for _ in range(args.repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    lauch_gradient_descent(data_km, data_price, coefficients_path=coefficients_path,
+                                           model_path=model_path, **options)
+                    returned = time.perf_counter() - start
+                    wait_for_plots()
+                    finished = time.perf_counter() - start
+                best = min(best, returned)
+                best_with_plots = min(best_with_plots, finished)
+            print(f"training, {label:<17} {best:10.3f} s (plots done after {best_with_plots:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
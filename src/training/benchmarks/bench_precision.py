@@ -0,0 +1,98 @@
+"""
+Throughput and memory of gradient descent in float64 and in float32 mode.
+
+Each run standardizes the data in its precision, then times a fixed number of
+iterations. The working set is the memory read by every iteration: standardized x,
+y and the residual buffer. The peak is the memory allocated by numpy from the
+standardization on, traced with tracemalloc. The last column is the largest relative
+difference between the float32 and float64 parameters after the same iterations,
+and the accuracy line compares converged float32 coefficients with the float64
+closed-form solution.
+
+Run from src/training:
+    python -m benchmarks.bench_precision --sizes 1e6 1e7 1e8 --iterations 20
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import numpy as np
+
+from modules.feature_scaling import standardization
+from modules.gradient_descent import run_gradient_descent
+from modules.precision import reference_coefficients, relative_difference, resolution_tolerance, to_precision
+from modules.sufficient_statistics import RunningStatistics
+
+from .synthetic import make_synthetic_dataset
+
+
+def run(data_km: np.ndarray, data_price: np.ndarray, precision: str, iterations: int):
+    """
+    Standardizes the data in a precision and runs a fixed number of iterations.
+
+    Returns:
+        The seconds of the standardization and of the iterations, the working set and
+        the peak of allocated bytes, and the parameters reached.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    if precision == "float64":
+        standardized_x = standardization(data_km)
+        data_y = data_price
+    else:
+        standardized_x = standardization(data_km, dtype=np.float32)
+        data_y = to_precision(data_price, np.float32)
+    prepare_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_gradient_descent(standardized_x, data_y, 0.0, 0.0, tolerance=0.0, max_iterations=iterations,
+                                      cost_tolerance=0.0)
+    iterate_seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # x, y and the residual buffer, of the same dtype as y
+    working_set = standardized_x.nbytes + 2 * data_y.nbytes
+    return prepare_seconds, iterate_seconds, working_set, peak, (result.w, result.b)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7], help='Number of rows of each run.')
+    parser.add_argument('--iterations', type=int, default=20, help='Iterations timed per run.')
+    parser.add_argument('--accuracy-rows', type=float, default=1e6, help='Rows of the converged accuracy check.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'precision':>9} {'prepare s':>10} {'ms/iter':>9} {'Mrows/s':>9} "
+          f"{'working MB':>11} {'peak MB':>9} {'vs float64':>11}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        reference = None
+        for precision in ("float64", "float32"):
+            prepare_seconds, iterate_seconds, working_set, peak, params = run(data_km, data_price, precision,
+                                                                              args.iterations)
+            difference = 0.0 if reference is None else relative_difference(params, reference)
+            reference = params if reference is None else reference
+            print(f"{int(size):>10} {precision:>9} {prepare_seconds:>10.3f} "
+                  f"{iterate_seconds / args.iterations * 1e3:>9.2f} "
+                  f"{size * args.iterations / iterate_seconds / 1e6:>9.1f} {working_set / 1e6:>11.1f} "
+                  f"{peak / 1e6:>9.1f} {difference:>11.2e}")
+        del data_km, data_price
+
+    # Converged float32 coefficients against the float64 optimum
+    data_km, data_price = make_synthetic_dataset(int(args.accuracy_rows))
+    data_y = to_precision(data_price, np.float32)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_gradient_descent(standardization(data_km, dtype=np.float32), data_y, 0.0, 0.0,
+                                      tolerance=resolution_tolerance(data_y, np.float32))
+    difference = relative_difference((result.w, result.b),
+                                     reference_coefficients(RunningStatistics.from_arrays(data_km, data_price)))
+    print(f"\nfloat32 on {int(args.accuracy_rows)} rows: converged={result.converged} after {result.iterations} "
+          f"iterations, {difference:.2e} from the float64 solution")
+
+
+if __name__ == "__main__":
+    main()
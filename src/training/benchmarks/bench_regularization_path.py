@@ -0,0 +1,48 @@
+"""
+Total iterations and time of a regularization path fitted with warm starts, against
+the same strengths fitted independently from zero.
+
+Run from src/training:
+    python -m benchmarks.bench_regularization_path --sizes 1e5 --alphas 20 --l1-ratios 1 0.5 0
+"""
+import argparse
+import time
+
+from modules.regularization import lauch_regularization_path
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e5], help='Number of rows of each run.')
+    parser.add_argument('--alphas', type=int, default=20, help='Number of strengths of the path.')
+    parser.add_argument('--l1-ratios', nargs='+', type=float, default=[1.0, 0.5, 0.0],
+                        help='Shares of the L1 penalty: 1 for lasso, 0 for ridge.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'l1_ratio':>9} {'start':>6} {'iterations':>11} {'converged':>10} {'seconds':>9} "
+          f"{'max |dw|':>10}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        for l1_ratio in args.l1_ratios:
+            paths = {}
+            for warm_start in (True, False):
+                start = time.perf_counter()
+                rows = lauch_regularization_path(data_km, data_price, n_alphas=args.alphas, l1_ratio=l1_ratio,
+                                                 warm_start=warm_start)
+                paths[warm_start] = (rows, time.perf_counter() - start)
+
+            warm_rows = paths[True][0]
+            for warm_start, (rows, elapsed) in paths.items():
+                # Distance of the slopes to the warm path, on the strengths both runs converged on
+                difference = max((abs(row['w_final'] - warm_row['w_final'])
+                                  for row, warm_row in zip(rows, warm_rows) if row['converged'] and warm_row['converged']),
+                                 default=float('nan'))
+                print(f"{int(size):>10} {l1_ratio:>9g} {'warm' if warm_start else 'cold':>6} "
+                      f"{sum(row['iterations'] for row in rows):>11} "
+                      f"{sum(row['converged'] for row in rows):>6}/{len(rows):<3} {elapsed:>9.3f} {difference:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Convergence speed and cost per pass of the robust losses against the squared loss,
+on synthetic listings with a fraction of mis-entered prices.
+
+Each loss is minimized by the gradient descent loop on standardized kilometers, the
+robust ones also by IRLS on the original scale. The error columns are the distance of
+the fitted line to the one the prices were drawn around.
+
+Run from src/training:
+    python -m benchmarks.bench_robust --sizes 1e5 1e6 --outliers 0.05
+"""
+import argparse
+import time
+
+from modules.feature_scaling import standardization, denormalize_coefficients
+from modules.gradient_descent import run_gradient_descent
+from modules.robust import irls
+
+from .synthetic import make_synthetic_dataset, SYNTHETIC_W, SYNTHETIC_B
+
+# Loss and optimizer of each gradient descent run: the gradients of the absolute and
+# quantile losses are bounded by 1, plain gradient descent barely moves on prices
+GRADIENT_RUNS = [('squared', 'gradient_descent'), ('huber', 'gradient_descent'), ('huber', 'backtracking'),
+                 ('absolute', 'adam'), ('quantile', 'adam')]
+IRLS_LOSSES = ['huber', 'absolute', 'quantile']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e5, 1e6], help='Number of rows of each run.')
+    parser.add_argument('--outliers', type=float, default=0.05, help='Fraction of mis-entered prices.')
+    parser.add_argument('--max-iterations', type=int, default=5000, help='Iteration budget of gradient descent.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'loss':>9} {'solver':>16} {'passes':>7} {'seconds':>9} {'ms/pass':>8} "
+          f"{'w error':>10} {'b error':>10}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size), outliers=args.outliers)
+        standardized_km = standardization(data_km)
+
+        runs = []
+        for loss, optimizer in GRADIENT_RUNS:
+            start = time.perf_counter()
+            result = run_gradient_descent(standardized_km, data_price, 0, 0, optimizer=optimizer,
+                                          max_iterations=args.max_iterations, loss=loss)
+            elapsed = time.perf_counter() - start
+            w, b = denormalize_coefficients(data_km, result.w, result.b)
+            runs.append((loss, optimizer, max(result.iterations, 1), elapsed, w, b))
+        for loss in IRLS_LOSSES:
+            start = time.perf_counter()
+            w, b, passes = irls(data_km, data_price, loss)
+            elapsed = time.perf_counter() - start
+            runs.append((loss, 'irls', passes, elapsed, w, b))
+
+        for loss, solver, passes, elapsed, w, b in runs:
+            print(f"{int(size):>10} {loss:>9} {solver:>16} {passes:>7} {elapsed:>9.3f} {1000 * elapsed / passes:>8.3f} "
+                  f"{abs(w - SYNTHETIC_W):>10.2e} {abs(b - SYNTHETIC_B):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time of fitting one price line per segment in a single grouped pass, against a loop
+fitting the segments one by one, and throughput of pricing with the segment table.
+
+The loop selects the rows of each segment with a mask over the whole dataset, then folds
+them into a RunningStatistics. It is only run on a sample of segments and its time is
+extrapolated to all of them; its lines are checked against the grouped ones.
+
+Run from src/training:
+    python -m benchmarks.bench_segments --rows 1e7 --segments 1e5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from modules.segments import fit_segments, save_segment_table
+from modules.sufficient_statistics import RunningStatistics
+
+from .synthetic import make_synthetic_dataset
+
+# The predictor lives next to the training program
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'prediction'))
+from segments import load_segment_table, estimate_segment_prices  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e7, help='Number of rows.')
+    parser.add_argument('--segments', nargs='+', type=float, default=[1e3, 1e5], help='Number of segments of each run.')
+    parser.add_argument('--sample', type=int, default=20, help='Number of segments fitted by the loop.')
+    args = parser.parse_args()
+
+    n_rows = int(args.rows)
+    data_km, data_price = make_synthetic_dataset(n_rows)
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>10} {'segments':>9} {'grouped s':>10} {'loop s':>10} {'speedup':>9} "
+          f"{'max |dw|':>10} {'table s':>8} {'Mrows/s':>8}")
+    for size in args.segments:
+        n_segments = int(size)
+        codes = rng.integers(0, n_segments, n_rows)
+        # Every segment has its own slope, so that a wrong lane shows up
+        segment_price = data_price + rng.normal(0, 1000, n_segments)[codes] \
+                        + rng.normal(0, 0.005, n_segments)[codes] * data_km
+
+        start = time.perf_counter()
+        w, b, statistics = fit_segments(codes, data_km, segment_price, n_segments)
+        grouped_seconds = time.perf_counter() - start
+
+        sample = rng.choice(n_segments, min(args.sample, n_segments), replace=False)
+        start = time.perf_counter()
+        loop_w = []
+        for segment in sample:
+            mask = codes == segment
+            loop_w.append(RunningStatistics.from_arrays(data_km[mask], segment_price[mask]).fit()[0])
+        loop_seconds = (time.perf_counter() - start) * n_segments / sample.shape[0]
+        max_error = float(np.max(np.abs(np.array(loop_w) - w[sample])))
+
+        keys = np.char.add('segment-', np.arange(n_segments).astype(str))
+        with tempfile.TemporaryDirectory() as directory:
+            table_path = os.path.join(directory, 'segments.csv')
+            start = time.perf_counter()
+            save_segment_table(keys, w, b, statistics.n, statistics.cost(w, b), table_path)
+            table = load_segment_table(table_path)
+            table_seconds = time.perf_counter() - start
+
+        # Pricing a block of one million cars, keys as the strings the predictor parses
+        block = rng.integers(0, n_segments, 1 << 20)
+        block_keys = keys[block].tolist()
+        start = time.perf_counter()
+        estimate_segment_prices(table, block_keys, data_km[:block.shape[0]])
+        throughput = block.shape[0] / (time.perf_counter() - start) / 1e6
+
+        print(f"{n_rows:>10} {n_segments:>9} {grouped_seconds:>10.3f} {loop_seconds:>10.1f} "
+              f"{loop_seconds / grouped_seconds:>9.0f} {max_error:>10.2e} {table_seconds:>8.3f} {throughput:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compares the iterative gradient descent with the single-pass normal equation.
+
+Run from src/training:
+    python -m benchmarks.bench_solvers --sizes 1e6 1e7 1e8
+"""
+import argparse
+import time
+
+from modules.feature_scaling import standardization, denormalize_coefficients
+from modules.gradient_descent import gradient_descent
+from modules.sufficient_statistics import normal_equation
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7], help='Number of rows of each run.')
+    parser.add_argument('--max-iterations', type=int, default=5000, help='Iteration cap of gradient descent.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'solver':>18} {'seconds':>10} {'w':>14} {'b':>14}")
+    for size in args.sizes:
+        n_rows = int(size)
+        data_km, data_price = make_synthetic_dataset(n_rows)
+
+        start = time.perf_counter()
+        standardized_km = standardization(data_km)
+        w, b = gradient_descent(standardized_km, data_price, 0, 0, 0.01,
+                                max_iterations=args.max_iterations, plot_costs=False)
+        w, b = denormalize_coefficients(data_km, w, b)
+        elapsed = time.perf_counter() - start
+        print(f"{n_rows:>12} {'gradient_descent':>18} {elapsed:>10.3f} {w:>14.8f} {b:>14.6f}")
+
+        start = time.perf_counter()
+        w, b = normal_equation(data_km, data_price)
+        elapsed = time.perf_counter() - start
+        print(f"{n_rows:>12} {'normal_equation':>18} {elapsed:>10.3f} {w:>14.8f} {b:>14.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time to reach a target cost: full-batch gradient descent versus mini-batch and
+stochastic gradient descent.
+
+The target is the optimal cost (from the normal equation) plus a relative margin.
+Mini-batch runs check the mean mini-batch cost of each epoch, which overestimates
+the cost at the end of the epoch, so their times are conservative.
+
+Run from src/training:
+    python -m benchmarks.bench_stochastic --rows 1e7 --batch-sizes 256 4096 65536
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from modules.cost_function import compute_cost_ft
+from modules.feature_scaling import standardization
+from modules.gradient_descent import run_gradient_descent, stochastic_gradient_descent
+from modules.sufficient_statistics import normal_equation
+
+from .synthetic import make_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e7, help='Number of synthetic rows.')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[256, 4096, 65536])
+    parser.add_argument('--margin', type=float, default=1e-3, help='Relative margin above the optimal cost.')
+    parser.add_argument('--learning-rate', type=float, default=0.01, help='Learning rate of every run.')
+    args = parser.parse_args()
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    standardized_km = standardization(data_km)
+    w, b = normal_equation(standardized_km, data_price)
+    target_cost = compute_cost_ft(standardized_km, data_price, w, b) * (1 + args.margin)
+    print(f"target cost: {target_cost:.4f}")
+    print(f"{'mode':>22} {'seconds':>10} {'steps':>10} {'reached':>8}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_gradient_descent(standardized_km, data_price, 0, 0, args.learning_rate,
+                                      max_iterations=100000, target_cost=target_cost)
+    elapsed = time.perf_counter() - start
+    print(f"{'full batch':>22} {elapsed:>10.3f} {result.iterations:>10} {str(result.converged):>8}")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = stochastic_gradient_descent(standardized_km, data_price, 0, 0, args.learning_rate, batch_size,
+                                                 max_epochs=100, target_cost=target_cost)
+        elapsed = time.perf_counter() - start
+        epochs = result.iterations + 1 if result.converged else result.iterations
+        steps = epochs * -(-int(args.rows) // batch_size)
+        print(f"{f'mini-batch {batch_size}':>22} {elapsed:>10.3f} {steps:>10} {str(result.converged):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures the peak resident memory of streaming training as the CSV file grows.
+
+Each size is written to a temporary CSV file and trained on in a fresh process,
+so the reported peak RSS belongs to that run alone.
+
+Run from src/training:
+    python -m benchmarks.bench_streaming --sizes 1e5 1e6 1e7
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .synthetic import make_synthetic_dataset
+
+# Rows generated and written at once when building the CSV files
+WRITE_CHUNK_SIZE: int = 1_000_000
+
+
+def write_synthetic_csv(file_path: str, n_rows: int) -> None:
+    with open(file_path, 'w') as file:
+        file.write("km,price\n")
+        for start in range(0, n_rows, WRITE_CHUNK_SIZE):
+            rows = min(WRITE_CHUNK_SIZE, n_rows - start)
+            data_km, data_price = make_synthetic_dataset(rows, seed=start)
+            np.savetxt(file, np.column_stack((data_km, data_price)), fmt='%.2f', delimiter=',')
+
+
+def run_child(file_path: str, mode: str, chunk_size: int, epochs: int) -> None:
+    from modules.streaming import streaming_statistics, streaming_gradient_descent
+
+    start = time.perf_counter()
+    statistics = streaming_statistics(file_path, chunk_size)
+    streaming_gradient_descent(file_path, statistics, 0, 0, 0.1, mode, chunk_size, max_epochs=epochs)
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RESULT {elapsed} {peak_kib}", file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e5, 1e6, 1e7], help='Number of rows of each file.')
+    parser.add_argument('--mode', default='mini_batch', choices=['mini_batch', 'full_batch'])
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--epochs', type=int, default=2)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.stdout = open(os.devnull, 'w')
+        run_child(args.child, args.mode, args.chunk_size, args.epochs)
+        return
+
+    print(f"{'rows':>12} {'file MiB':>10} {'seconds':>10} {'peak RSS MiB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            n_rows = int(size)
+            file_path = os.path.join(directory, f"data_{n_rows}.csv")
+            write_synthetic_csv(file_path, n_rows)
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_streaming', '--child', file_path,
+                                     '--mode', args.mode, '--chunk-size', str(args.chunk_size),
+                                     '--epochs', str(args.epochs)],
+                                    capture_output=True, text=True, check=True).stdout
+            _, elapsed, peak_kib = output.split()
+            file_mib = os.path.getsize(file_path) / 2**20
+            print(f"{n_rows:>12} {file_mib:>10.1f} {float(elapsed):>10.3f} {int(peak_kib) / 1024:>14.1f}")
+            os.remove(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Scaling of the parallel hyperparameter sweep with the number of worker processes.
+
+Every run trains the same configurations on the same shared dataset; iterations are
+capped so that the time per configuration is fixed.
+
+A regression check runs first: on standardized data, a learning rate above 2 makes
+gradient descent diverge, and its row must say converged=False (an infinite cost used
+to pass the relative cost test). The benchmark exits with an error otherwise.
+
+Run from src/training:
+    python -m benchmarks.bench_sweep --rows 1e7 --workers 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import time
+
+from modules.sweep import make_sweep_grid, run_sweep
+
+from .synthetic import make_synthetic_dataset
+
+
+def check_divergence(data_km, data_price) -> None:
+    """
+    Checks that a diverging learning rate is reported as not converged.
+
+    Raises:
+        SystemExit: If a diverged row claims convergence.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = run_sweep(data_km, data_price, make_sweep_grid([0.5, 2.5]), max_workers=1)
+    converging, diverging = rows
+    if not converging['converged'] or diverging['converged'] or math.isfinite(diverging['final_cost']):
+        raise SystemExit(f"Divergence check failed: learning rate 0.5 converged={converging['converged']}, "
+                         f"learning rate 2.5 converged={diverging['converged']} "
+                         f"final_cost={diverging['final_cost']}.")
+    print(f"Divergence check: learning rate 2.5 stopped after {diverging['iterations']} iterations, "
+          f"converged=False.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e7, help='Number of synthetic rows.')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument('--configurations', type=int, default=16)
+    parser.add_argument('--max-iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    check_divergence(*make_synthetic_dataset(10_000))
+
+    data_km, data_price = make_synthetic_dataset(int(args.rows))
+    learning_rates = [0.001 * (i + 1) for i in range(args.configurations)]
+    configurations = make_sweep_grid(learning_rates, tolerances=(0,), max_iterations=args.max_iterations)
+
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        run_sweep(data_km, data_price, configurations, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Overhead of the training telemetry on the gradient descent loop.
+
+Runs the same number of iterations without telemetry, with telemetry, and with
+telemetry tracing allocations.
+
+Run from src/training:
+    python -m benchmarks.bench_telemetry --sizes 1e3 1e5 1e6
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from modules.feature_scaling import standardization
+from modules.gradient_descent import run_gradient_descent
+from modules.telemetry import Telemetry
+
+from .synthetic import make_synthetic_dataset
+
+
+def time_run(data_x, data_y, iterations: int, telemetry: Telemetry = None) -> float:
+    """
+    Times a gradient descent run of exactly `iterations` iterations.
+    """
+    phase = contextlib.nullcontext() if telemetry is None else telemetry.phase('optimization')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), phase:
+        run_gradient_descent(data_x, data_y, 0, 0, 0.01, tolerance=0, max_iterations=iterations,
+                             cost_tolerance=0, telemetry=telemetry)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e5, 1e6], help='Number of rows of each run.')
+    parser.add_argument('--iterations', type=int, default=2000, help='Iterations of each run.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant, the fastest is kept.')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'disabled s':>12} {'enabled s':>12} {'overhead':>9} {'traced s':>12}")
+    for size in args.sizes:
+        data_km, data_price = make_synthetic_dataset(int(size))
+        standardized_km = standardization(data_km)
+
+        disabled = min(time_run(standardized_km, data_price, args.iterations) for _ in range(args.repeat))
+        enabled = min(time_run(standardized_km, data_price, args.iterations, Telemetry()) for _ in range(args.repeat))
+        traced = time_run(standardized_km, data_price, args.iterations, Telemetry(trace_allocations=True))
+        print(f"{int(size):>10} {disabled:>12.4f} {enabled:>12.4f} {100 * (enabled / disabled - 1):>8.1f}% {traced:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
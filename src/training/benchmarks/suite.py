@@ -0,0 +1,329 @@
+"""
+Reproducible benchmark suite of the training and prediction hot paths.
+
+Every case runs on the same synthetic dataset for a given size (fixed seed, noise and
+outliers), so two runs of the suite on the same machine measure the same work:
+
+    standardization          z-score of the kilometers
+    compute_cost_ft          cost of a line, with its temporaries
+    partial_derivatives      both partial derivatives, one pass each
+    gradients_and_cost       fused residual kernel of an iteration
+    run_gradient_descent     gradient descent on standardized data, until convergence
+    normal_equation          closed-form fit, one pass of running sums
+    train_end_to_end         lauch_gradient_descent without plots: standardization,
+                             gradient descent, denormalization and saved model files
+    estimate_prices_batch    batch pricing of a kilometers file into a prices file
+    predict_end_to_end       estimate_price.py --batch in a new interpreter
+
+A case is timed without tracing: the best of --repeats runs, each looping the case for
+at least --min-seconds, or a single run if it takes over --single-run-seconds. It is then
+called once more with tracemalloc on, for its peak of allocated bytes; the peak of
+predict_end_to_end is the peak RSS of the child process.
+
+Results are written as JSON with the configuration and the environment. Given a
+--baseline (a previous output), each case is compared with the same case and size of
+the baseline: a case is a regression when its time, peak memory or iterations exceed
+the baseline by more than --threshold (and by more than --noise-floor seconds for times,
+so that microsecond cases do not flap). The exit code is 1 on any regression.
+
+Everything is generated locally, no network access is needed. Sizes up to 1e8 rows are
+supported; 1e7 and above take minutes, mostly in the two gradient descent cases
+(--cases and --max-iterations narrow a run down).
+
+Run from src/training:
+    python -m benchmarks.suite --sizes 1e2 1e4 1e6 --output ../../results/baseline.json
+    python -m benchmarks.suite --sizes 1e2 1e4 1e6 --baseline ../../results/baseline.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from modules.cost_function import compute_cost_ft
+from modules.feature_scaling import standardization
+from modules.gradient_descent import compute_gradients_and_cost, lauch_gradient_descent, \
+                                     partial_derivative_cost_function_of_b, partial_derivative_cost_function_of_w, \
+                                     run_gradient_descent
+from modules.parallel_reduction import ParallelReducer
+from modules.sufficient_statistics import normal_equation
+from modules.telemetry import Telemetry
+
+from .synthetic import make_synthetic_dataset
+
+PREDICTION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'prediction')
+sys.path.insert(0, PREDICTION_DIR)
+from estimate_price import estimate_prices_batch  # noqa: E402
+
+# Version of the JSON layout of the results
+SUITE_VERSION: int = 1
+CASES: Tuple[str, ...] = ('standardization', 'compute_cost_ft', 'partial_derivatives', 'gradients_and_cost',
+                          'run_gradient_descent', 'normal_equation', 'train_end_to_end', 'estimate_prices_batch',
+                          'predict_end_to_end')
+# Rows formatted at once when writing the kilometers file
+WRITE_CHUNK_SIZE: int = 1 << 20
+
+
+def write_kms_file(data_km: np.ndarray, file_path: str) -> None:
+    """
+    Writes one kilometer value per line, a chunk at a time. The predictor only prices
+    positive kilometers, so values that would round to 0.0 are written as 0.1.
+    """
+    with open(file_path, 'w') as file:
+        for start in range(0, data_km.shape[0], WRITE_CHUNK_SIZE):
+            chunk = np.maximum(data_km[start:start + WRITE_CHUNK_SIZE], 0.1)
+            file.write(('%.1f\n' * chunk.shape[0]) % tuple(chunk.tolist()))
+
+
+def call(function: Callable, *args, **kwargs) -> Callable[[], Dict]:
+    """
+    Makes a case of a function whose result is not a metric.
+    """
+    def case() -> Dict:
+        function(*args, **kwargs)
+        return {}
+    return case
+
+
+def make_cases(data_km: np.ndarray, data_price: np.ndarray, workdir: str, max_iterations: int,
+               reducer: ParallelReducer = None) -> Dict[str, Callable[[], Dict]]:
+    """
+    Builds the cases of a dataset. Each case returns its extra metrics, e.g. iterations.
+    With a reducer, the reductions of the cost and of gradient descent run across its threads.
+    """
+    threads = 1 if reducer is None else reducer.n_threads
+    standardized_x = standardization(data_km)
+    residual = np.empty_like(standardized_x)
+    # Coefficients of the pricing cases, written as the training would
+    w_final, b_final = normal_equation(data_km, data_price)
+    kms_path = os.path.join(workdir, 'kms.txt')
+    prices_path = os.path.join(workdir, 'prices.txt')
+    write_kms_file(data_km, kms_path)
+    with open(os.path.join(workdir, 'coefficients.txt'), 'w') as file:
+        file.write(f"w_final: {w_final}\nb_final: {b_final}\n")
+
+    def gradient_descent_case() -> Dict:
+        result = run_gradient_descent(standardized_x, data_price, 0.0, 0.0, max_iterations=max_iterations,
+                                      threads=threads)
+        return {'iterations': result.iterations}
+
+    def partial_derivatives_case() -> Dict:
+        partial_derivative_cost_function_of_w(standardized_x, data_price, 1.0, 1.0, reducer=reducer)
+        partial_derivative_cost_function_of_b(standardized_x, data_price, 1.0, 1.0, reducer=reducer)
+        return {}
+
+    def train_case() -> Dict:
+        telemetry = Telemetry()
+        lauch_gradient_descent(data_km, data_price, telemetry=telemetry, plots=False, threads=threads,
+                               coefficients_path=os.path.join(workdir, 'trained_coefficients.txt'),
+                               model_path=os.path.join(workdir, 'model.bin'))
+        return {'iterations': telemetry.counters.get('iterations')}
+
+    def batch_case() -> Dict:
+        with open(kms_path) as input_stream, open(prices_path, 'w') as output_stream:
+            estimate_prices_batch(w_final, b_final, input_stream, output_stream)
+        return {}
+
+    def predict_case() -> Dict:
+        # The predictor reads coefficients.txt from its working directory
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen([sys.executable, os.path.join(PREDICTION_DIR, 'estimate_price.py'),
+                                        '--batch', kms_path, '--output', prices_path],
+                                       cwd=workdir, stdout=subprocess.DEVNULL, stderr=stderr)
+            # wait4 also returns the resource usage of this child alone
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if process.returncode:
+                stderr.seek(0)
+                raise RuntimeError(f"estimate_price.py failed: {stderr.read().decode()}")
+        # ru_maxrss is in KiB on Linux
+        return {'peak_bytes': usage.ru_maxrss * 1024, 'memory': 'rss'}
+
+    return {
+        'standardization': call(standardization, data_km),
+        'compute_cost_ft': call(compute_cost_ft, standardized_x, data_price, 1.0, 1.0, reducer=reducer),
+        'partial_derivatives': partial_derivatives_case,
+        'gradients_and_cost': call(compute_gradients_and_cost, standardized_x, data_price, 1.0, 1.0, residual,
+                                   reducer=reducer),
+        'run_gradient_descent': gradient_descent_case,
+        'normal_equation': call(normal_equation, data_km, data_price),
+        'train_end_to_end': train_case,
+        'estimate_prices_batch': batch_case,
+        'predict_end_to_end': predict_case,
+    }
+
+
+def measure(case: Callable[[], Dict], repeats: int, min_seconds: float, single_run_seconds: float) -> Dict:
+    """
+    Measures the time of a case in untraced runs, then its peak memory in a traced run.
+
+    Returns:
+        Dict: seconds (best run), median_seconds, runs, loops, peak_bytes and the metrics of the case.
+    """
+    start = time.perf_counter()
+    metrics = dict(case())
+    samples: List[float] = [time.perf_counter() - start]
+    loops: int = 1
+    if samples[0] < single_run_seconds:
+        # Short cases are looped, so that a run is long enough for the clock
+        loops = max(1, math.ceil(min_seconds / max(samples[0], 1e-9)))
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(loops):
+                case()
+            samples.append((time.perf_counter() - start) / loops)
+
+    # tracemalloc slows down every allocation, so the traced run is not timed
+    tracemalloc.start()
+    case()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    record = {'seconds': min(samples), 'median_seconds': float(np.median(samples)), 'runs': len(samples),
+              'loops': loops, 'peak_bytes': peak, 'memory': 'traced', 'iterations': None}
+    record.update(metrics)
+    return record
+
+
+def environment() -> Dict:
+    """
+    Describes the machine and the versions the suite ran on.
+    """
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float, noise_floor: float) -> List[str]:
+    """
+    Compares results with a baseline run and prints the ratios.
+
+    Returns:
+        List[str]: One description per regression.
+    """
+    reference = {(record['case'], record['rows']): record for record in baseline['results']}
+    regressions: List[str] = []
+    print(f"\n{'case':>22} {'rows':>10} {'time ratio':>11} {'memory ratio':>13} {'iterations':>12} {'status':>11}")
+    for record in results:
+        base = reference.get((record['case'], record['rows']))
+        if base is None:
+            print(f"{record['case']:>22} {record['rows']:>10} {'-':>11} {'-':>13} {'-':>12} {'new':>11}")
+            continue
+        time_ratio = record['seconds'] / max(base['seconds'], 1e-12)
+        memory_ratio = record['peak_bytes'] / max(base['peak_bytes'], 1)
+        problems: List[str] = []
+        if time_ratio > 1 + threshold and record['seconds'] - base['seconds'] > noise_floor:
+            problems.append(f"time x{time_ratio:.2f}")
+        # Allocations below a MiB are interpreter noise
+        if memory_ratio > 1 + threshold and record['peak_bytes'] - base['peak_bytes'] > 1 << 20:
+            problems.append(f"memory x{memory_ratio:.2f}")
+        if record['iterations'] is not None and base['iterations'] is not None \
+                and record['iterations'] > base['iterations'] * (1 + threshold):
+            problems.append(f"iterations {base['iterations']} -> {record['iterations']}")
+        iterations = '-' if record['iterations'] is None else f"{base['iterations']}->{record['iterations']}"
+        print(f"{record['case']:>22} {record['rows']:>10} {time_ratio:>11.2f} {memory_ratio:>13.2f} "
+              f"{iterations:>12} {'REGRESSION' if problems else 'ok':>11}")
+        if problems:
+            regressions.append(f"{record['case']} on {record['rows']} rows: {', '.join(problems)}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e2, 1e4, 1e6], help='Number of rows of each run.')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES), help='Cases to run.')
+    parser.add_argument('--noise', type=float, default=500.0, help='Standard deviation of the price noise.')
+    parser.add_argument('--outliers', type=float, default=0.0, help='Fraction of prices divided by 10.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic dataset.')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs of each case; the best one is kept.')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Minimum duration of a timed run.')
+    parser.add_argument('--single-run-seconds', type=float, default=1.0,
+                        help='Cases slower than this are only run once.')
+    parser.add_argument('--max-iterations', type=int, default=5000, help='Iteration cap of gradient descent.')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads of the reductions of the cost and gradient descent, 0 for every CPU.')
+    parser.add_argument('--output', default='../../results/benchmark_suite.json', help='JSON file of the results.')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative slowdown counted as a regression, above the noise of a shared machine.')
+    parser.add_argument('--noise-floor', type=float, default=1e-3,
+                        help='Absolute slowdown, in seconds, below which a case is never a regression.')
+    args = parser.parse_args()
+
+    reducer = ParallelReducer(args.threads or None) if args.threads != 1 else None
+    results: List[Dict] = []
+    print(f"{'case':>22} {'rows':>10} {'seconds':>11} {'Mrows/s':>9} {'peak MB':>9} {'iterations':>10}")
+    for size in args.sizes:
+        rows = int(size)
+        data_km, data_price = make_synthetic_dataset(rows, args.noise, args.seed, args.outliers)
+        with tempfile.TemporaryDirectory() as workdir:
+            cases = make_cases(data_km, data_price, workdir, args.max_iterations, reducer)
+            for name in args.cases:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    record = measure(cases[name], args.repeats, args.min_seconds, args.single_run_seconds)
+                record = {'case': name, 'rows': rows, **record}
+                results.append(record)
+                iterations = '-' if record['iterations'] is None else record['iterations']
+                print(f"{name:>22} {rows:>10} {record['seconds']:>11.6f} {rows / record['seconds'] / 1e6:>9.1f} "
+                      f"{record['peak_bytes'] / 1e6:>9.1f} {iterations:>10}")
+        del data_km, data_price
+    if reducer is not None:
+        reducer.close()
+
+    report = {
+        'version': SUITE_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': {key: getattr(args, key) for key in ('sizes', 'cases', 'noise', 'outliers', 'seed', 'repeats',
+                                                        'min_seconds', 'single_run_seconds', 'max_iterations',
+                                                        'threads')},
+        'results': results,
+    }
+    try:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+        print(f"\nResults have been saved to {args.output}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
+
+    if not args.baseline:
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline['environment'] != report['environment']:
+        print("Note: the baseline was recorded in another environment, times may not be comparable.")
+    # Settings that change the work of a case, unlike the sizes and cases selected
+    changed = [key for key in ('noise', 'outliers', 'seed', 'max_iterations', 'threads')
+               if baseline['config'].get(key, 1 if key == 'threads' else None) != report['config'][key]]
+    if changed:
+        print(f"Note: the baseline was run with other settings ({', '.join(changed)}).")
+    regressions = compare(results, baseline, args.threshold, args.noise_floor)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nNo regression above {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import numpy as np
+from typing import Tuple
+
+# Parameters of the line the synthetic prices are drawn around, close to the ones
+# found on data/data.csv so that the solvers behave as on real listings.
+SYNTHETIC_W: float = -0.0214
+SYNTHETIC_B: float = 8500.0
+MAX_KM: float = 250000.0
+
+
+def make_synthetic_dataset(n_rows: int, noise: float = 500.0, seed: int = 42, \
+                           outliers: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generates a synthetic km/price dataset shaped like data/data.csv.
+
+    Args:
+        n_rows (int): Number of rows to generate.
+        noise (float, optional): Standard deviation of the gaussian noise added to the prices.
+        seed (int, optional): Seed of the random generator, for reproducible runs.
+        outliers (float, optional): Fraction of the listings whose price was mis-entered
+                                    with a missing digit, i.e. divided by 10.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The kilometers and prices (float64 arrays).
+    """
+    rng = np.random.default_rng(seed)
+    data_km: np.ndarray = rng.uniform(0, MAX_KM, n_rows)
+    data_price: np.ndarray = SYNTHETIC_W * data_km + SYNTHETIC_B
+    data_price += rng.normal(0, noise, n_rows)
+    if outliers:
+        data_price[rng.random(n_rows) < outliers] /= 10
+    return data_km, data_price
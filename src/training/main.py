@@ -1,10 +1,9 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import cursor
 import signal
 import os
 import time
+from functools import lru_cache
 
 # Signal
 from modules.signal_handler import signal_handler
@@ -12,37 +11,301 @@ from modules.signal_handler import signal_handler
 from modules.plotting import plot_data,plot_with_regression_line, \
                             plot_deviation, \
                             plot_cost_function_only_w, \
-                            plot_cost_function_only_b
+                            plot_cost_function_only_b, \
+                            plot_cost_function_surface
 
 # Gradient descent
 from modules.gradient_descent import lauch_gradient_descent
+# Background plots
+from modules.plot_worker import wait_for_plots
 # Get params
 from modules.get_regression_params import get_regression_params
+# Optimizers
+from modules.optimizers import OPTIMIZERS
+# Robust losses
+from modules.robust import LOSSES
+# Float32 mode
+from modules.precision import PRECISIONS
+# Instrumentation
+from modules.telemetry import Telemetry, NO_TELEMETRY
+# Hyperparameter sweep
+from modules.sweep import make_sweep_grid, run_sweep
+# Cross-validation
+from modules.cross_validation import cross_validate, summarize_folds
+# Regularization path
+from modules.regularization import lauch_regularization_path
+# Polynomial and spline models
+from modules.feature_expansion import lauch_expanded_gradient_descent
+# Segmented training
+from modules.segments import lauch_segmented_training
+# Bootstrap confidence intervals
+from modules.bootstrap import lauch_bootstrap
+# Multivariate training
+from modules.multivariate import lauch_multivariate_gradient_descent
+# Online updates
+from modules.online import model_state_is_current, update_model_from_csv, MODEL_STATE_PATH
+# Streaming training
+from modules.streaming import lauch_streaming_gradient_descent
+# Binary dataset
+from modules.binary_dataset import convert_csv_to_binary, load_binary_dataset, is_binary_dataset_fresh
 
 # Setting signal
 signal.signal(signal.SIGINT, signal_handler)
 
-def main_menu():
+DATA_PATH = '../../data/data.csv'
+DATA_BINARY_PATH = '../../data/data.bin'
+SWEEP_RESULTS_PATH = '../../results/sweep_results.csv'
+CROSS_VALIDATION_RESULTS_PATH = '../../results/cross_validation.csv'
+REGULARIZATION_PATH_RESULTS_PATH = '../../results/regularization_path.csv'
+TELEMETRY_REPORT_PATH = '../../results/telemetry.json'
+
+@lru_cache(maxsize=None)
+def load_data():
     """
-    Displays the main menu for user interaction and processes user choices.
+    Loads the km and price columns of the dataset, once.
+
+    The binary copy of the dataset is memory-mapped when it is up to date and valid,
+    otherwise the CSV file is parsed.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The kilometers and prices.
     """
-    # Reading the file
-    df = pd.read_csv('../../data/data.csv')
-    # Transform dataframe to numpy array
-    # data_frame = df.to_numpy()
+    if is_binary_dataset_fresh(DATA_PATH, DATA_BINARY_PATH):
+        try:
+            return load_binary_dataset(DATA_BINARY_PATH)
+        except ValueError as e:
+            print(f"Ignoring the binary dataset, reading the CSV file instead: {e}")
+
+    # Reading the file, pandas is only imported when the CSV file is parsed
+    import pandas as pd
+    df = pd.read_csv(DATA_PATH)
     # Getting km data from dataframe
     original_data_km = df['km'].to_numpy()
     # Getting price data from dataframe
     original_data_price = df['price'].to_numpy()
-    
+    return original_data_km, original_data_price
+
+def launch_training():
+    """
+    Prompts for the loss, the optimizer, its learning rate, the mini-batch size, the precision and the threads of
+    the reductions, then launches gradient descent.
+
+    Robust losses are fitted by iteratively reweighted least squares unless gradient descent is asked for.
+    On request, every phase of the training is timed and a telemetry report is saved.
+    """
+    loss = input(f"Loss [{'/'.join(LOSSES)}] (default squared): ").strip() or "squared"
+    try:
+        solver, optimizer, learning_rate, batch_size, quantile = "gradient_descent", "gradient_descent", None, "", 0.5
+        alpha, l1_ratio, precision, threads = 0.0, 0.0, "float64", 1
+        if loss != "squared":
+            solver = input("Solver [irls/gradient_descent] (default irls): ").strip() or "irls"
+            if loss == "quantile":
+                quantile = float(input("Quantile (default 0.5): ").strip() or 0.5)
+        if solver == "gradient_descent":
+            optimizer = input(f"Optimizer [{'/'.join(OPTIMIZERS)}] (default gradient_descent): ").strip() or "gradient_descent"
+            learning_rate = input("Learning rate (default depends on the optimizer): ").strip()
+            learning_rate = float(learning_rate) if learning_rate else None
+        if loss == "squared":
+            batch_size = input("Mini-batch size, 1 for stochastic gradient descent (default: full batch): ").strip()
+        if loss == "squared" and not batch_size:
+            alpha = float(input("Regularization strength alpha (default 0, none): ").strip() or 0)
+            if alpha:
+                l1_ratio = float(input("L1 ratio, 0 for ridge and 1 for lasso (default 0): ").strip() or 0)
+            precision = input(f"Precision [{'/'.join(PRECISIONS)}] (default float64): ").strip() or "float64"
+            threads = input("Threads of the reductions, 0 for every CPU (default 1): ").strip()
+            threads = (int(threads) or None) if threads else 1
+        report = input("Telemetry report [no/yes/memory] (default no): ").strip() or "no"
+        if report not in ("no", "yes", "memory"):
+            raise ValueError(f"Unknown telemetry option '{report}'.")
+        telemetry = NO_TELEMETRY if report == "no" else Telemetry(trace_allocations=report == "memory")
+
+        with telemetry.phase('load_data'):
+            data = load_data()
+        if batch_size:
+            lauch_gradient_descent(*data, solver="stochastic", learning_rate=learning_rate,
+                                   batch_size=int(batch_size), telemetry=telemetry)
+        else:
+            lauch_gradient_descent(*data, solver=solver, optimizer=optimizer, learning_rate=learning_rate,
+                                   telemetry=telemetry, loss=loss, quantile=quantile, alpha=alpha, l1_ratio=l1_ratio,
+                                   precision=precision, threads=threads)
+    except ValueError as e:
+        print(f"Invalid training options: {e}")
+        return
+
+    telemetry.print_summary()
+    telemetry.save_report(TELEMETRY_REPORT_PATH)
+
+def launch_multivariate_training():
+    """
+    Prompts for the optimizer, then trains on every numeric column of the dataset but the price.
+    """
+    optimizer = input(f"Optimizer [{'/'.join(OPTIMIZERS)}] (default gradient_descent): ").strip() or "gradient_descent"
+    try:
+        lauch_multivariate_gradient_descent(DATA_PATH, optimizer=optimizer)
+    except (KeyError, ValueError) as e:
+        print(f"Invalid training options: {e}")
+
+def launch_streaming_training():
+    """
+    Prompts for the streaming options and trains from the CSV file chunk by chunk.
+    """
+    mode = input("Mode [full_batch/mini_batch] (default full_batch): ").strip() or "full_batch"
+    try:
+        chunk_size = int(input("Chunk size in rows (default 100000): ").strip() or 100000)
+        lauch_streaming_gradient_descent(DATA_PATH, mode=mode, chunk_size=chunk_size)
+    except ValueError as e:
+        print(f"Invalid streaming options: {e}")
+
+def launch_sweep():
+    """
+    Prompts for the hyperparameter values to try and runs them in parallel.
+    """
+    try:
+        learning_rates = [float(value) for value in
+                          (input("Learning rates, comma-separated (default 0.001,0.01,0.1,1): ").strip()
+                           or "0.001,0.01,0.1,1").split(',')]
+        tolerances = [float(value) for value in
+                      (input("Tolerances, comma-separated (default 1e-6): ").strip() or "1e-6").split(',')]
+        optimizers = [value.strip() for value in
+                      (input("Optimizers, comma-separated (default gradient_descent): ").strip()
+                       or "gradient_descent").split(',')]
+        workers = input("Worker processes (default: number of CPUs): ").strip()
+        configurations = make_sweep_grid(learning_rates, tolerances, optimizers=optimizers)
+        rows = run_sweep(*load_data(), configurations, int(workers) if workers else None, SWEEP_RESULTS_PATH)
+    except ValueError as e:
+        print(f"Invalid sweep options: {e}")
+        return
+
+    for row in sorted(rows, key=lambda row: row['final_cost']):
+        print(f"{row['optimizer']:>16} lr={row['learning_rate']:<8g} tol={row['tolerance']:<8g} "
+              f"cost={row['final_cost']:.4f} iterations={row['iterations']} seconds={row['seconds']:.3f}")
+
+def launch_cross_validation():
+    """
+    Prompts for the number of folds and the solver, then cross-validates the model.
+    """
+    try:
+        k = int(input("Number of folds (default 5): ").strip() or 5)
+        solver = input("Solver [gradient_descent/normal_equation] (default gradient_descent): ").strip() \
+                 or "gradient_descent"
+        workers = input("Worker processes (default: number of CPUs): ").strip()
+        rows = cross_validate(*load_data(), k, solver=solver, max_workers=int(workers) if workers else None,
+                              results_path=CROSS_VALIDATION_RESULTS_PATH)
+    except ValueError as e:
+        print(f"Invalid cross-validation options: {e}")
+        return
+
+    for row in rows:
+        print(f"fold {row['fold']}: train={row['train_rows']} test={row['test_rows']} "
+              f"mse={row['mse']:.4f} mae={row['mae']:.4f} r2={row['r2']:.4f}")
+    for metric, (mean, std) in summarize_folds(rows).items():
+        print(f"{metric}: {mean:.4f} +/- {std:.4f}")
+
+def launch_regularization_path():
+    """
+    Prompts for the kind of regularization, then fits a warm-started path of strengths.
+    """
+    try:
+        l1_ratio = float(input("L1 ratio, 0 for ridge, 1 for lasso, in between for elastic-net (default 1): ").strip() or 1)
+        n_alphas = int(input("Number of strengths (default 20): ").strip() or 20)
+        rows = lauch_regularization_path(*load_data(), n_alphas=n_alphas, l1_ratio=l1_ratio,
+                                         results_path=REGULARIZATION_PATH_RESULTS_PATH)
+    except ValueError as e:
+        print(f"Invalid regularization options: {e}")
+        return
+
+    for row in rows:
+        print(f"alpha={row['alpha']:<12.6g} w={row['w_final']:<12.6g} b={row['b_final']:<12.6g} "
+              f"iterations={row['iterations']}")
+
+def launch_expanded_training():
+    """
+    Prompts for a polynomial or spline expansion of the kilometers, then trains on it.
+    """
+    try:
+        degree = int(input("Degree, 1 with knots for piecewise-linear, 3 for cubic splines (default 2): ").strip() or 2)
+        n_knots = int(input("Number of knots, 0 for a polynomial (default 0): ").strip() or 0)
+        dtype = input("Design matrix type [float64/float32] (default float64): ").strip() or "float64"
+        solver = input("Solver [normal_equation/gradient_descent] (default normal_equation): ").strip() \
+                 or "normal_equation"
+        lauch_expanded_gradient_descent(*load_data(), degree=degree, n_knots=n_knots, dtype=dtype, solver=solver)
+    except ValueError as e:
+        print(f"Invalid expansion options: {e}")
+
+def launch_segmented_training():
+    """
+    Prompts for a segment column, then fits one price line per segment in a single pass.
+    """
+    key = input("Segment column (default model): ").strip() or "model"
+    try:
+        lauch_segmented_training(DATA_PATH, key)
+    except ValueError as e:
+        print(f"Invalid segment options: {e}")
+
+def launch_bootstrap():
+    """
+    Prompts for the number of replicates, then fits the model with bootstrap confidence intervals.
+    """
+    try:
+        n_replicates = int(input("Number of replicates (default 2000): ").strip() or 2000)
+        workers = input("Worker processes (default: number of CPUs): ").strip()
+        lauch_bootstrap(*load_data(), n_replicates, max_workers=int(workers) if workers else None)
+    except ValueError as e:
+        print(f"Invalid bootstrap options: {e}")
+
+def launch_online_update():
+    """
+    Prompts for a CSV file of new sales and folds it into the model without retraining.
+
+    The first update, and the first one after a retraining, builds the model state from the
+    dataset before folding in the new sales.
+    """
+    csv_path = input("CSV file with the new sales (km,price): ").strip()
+    try:
+        forgetting = float(input("Forgetting factor, 1 keeps every past sale (default 1): ").strip() or 1)
+        if not os.path.exists(MODEL_STATE_PATH):
+            print(f"No model state yet, building it from {DATA_PATH}.")
+            update_model_from_csv(DATA_PATH, reset=True)
+        elif not model_state_is_current():
+            print(f"The model has been retrained since the last online update, rebuilding its state from {DATA_PATH}.")
+            update_model_from_csv(DATA_PATH, reset=True)
+        update_model_from_csv(csv_path, forgetting)
+    except (IOError, ValueError, KeyError) as e:
+        print(f"Failed to update the model: {e}")
+
+def convert_dataset():
+    """
+    Converts the CSV dataset to the binary format used by the next loads.
+    """
+    convert_csv_to_binary(DATA_PATH, DATA_BINARY_PATH)
+    load_data.cache_clear()
+
+def main_menu():
+    """
+    Displays the main menu for user interaction and processes user choices.
+
+    The dataset is only loaded into memory by the options that need it whole.
+    """
     actions = {
-        '1': lambda: plot_data(original_data_km, original_data_price),
-        '2': lambda: plot_with_regression_line(original_data_km, original_data_price, *get_regression_params()),
-        '3': lambda: plot_deviation(original_data_km, original_data_price, *get_regression_params()),
-        '4': lambda: plot_cost_function_only_w(original_data_km, original_data_price),
-        '5': lambda: plot_cost_function_only_b(original_data_km, original_data_price),
-        '6': lambda: lauch_gradient_descent(original_data_km, original_data_price),
-        '7': exit_program
+        '1': lambda: plot_data(*load_data()),
+        '2': lambda: plot_with_regression_line(*load_data(), *get_regression_params()),
+        '3': lambda: plot_deviation(*load_data(), *get_regression_params()),
+        '4': lambda: plot_cost_function_only_w(*load_data()),
+        '5': lambda: plot_cost_function_only_b(*load_data()),
+        '6': launch_training,
+        '7': lambda: lauch_gradient_descent(*load_data(), solver="normal_equation"),
+        '8': launch_streaming_training,
+        '9': convert_dataset,
+        '10': lambda: plot_cost_function_surface(*load_data()),
+        '11': launch_sweep,
+        '12': launch_multivariate_training,
+        '13': launch_online_update,
+        '14': launch_cross_validation,
+        '15': launch_regularization_path,
+        '16': launch_expanded_training,
+        '17': launch_segmented_training,
+        '18': launch_bootstrap,
+        '19': exit_program
     }
 
     while True:
@@ -53,12 +316,28 @@ def main_menu():
         print("4. Plot cost function only with 'w' parameter")
         print("5. Plot cost function only with 'b' parameter")
         print("6. Lauch gradient descent algorithm")
-        print("7. Exit")
+        print("7. Fit with the normal equation (single pass)")
+        print("8. Launch streaming gradient descent (CSV read in chunks)")
+        print("9. Convert the dataset to the binary format")
+        print("10. Plot cost function J(w, b) as contour lines")
+        print("11. Run a hyperparameter sweep in parallel")
+        print("12. Launch multivariate gradient descent (every numeric column but price)")
+        print("13. Update the model with new sales (online, no retraining)")
+        print("14. Cross-validate the model (k-fold)")
+        print("15. Fit a regularization path (ridge, lasso or elastic-net)")
+        print("16. Fit a polynomial or spline model of the kilometers")
+        print("17. Fit one price line per segment (model, region, ...)")
+        print("18. Fit with bootstrap confidence intervals (parallel)")
+        print("19. Exit")
         choice = input("Choose an option: ")
 
         action = actions.get(choice)
         if action:
-            action()
+            try:
+                action()
+            except IOError as e:
+                # e.g. the model file could not be written
+                print(f"An error occurred while trying to access a file: {e}")
         else:
             print("Invalid option. Please try again.")
         
@@ -66,6 +345,8 @@ def main_menu():
 
 def exit_program():
     print("Exiting the program.")
+    # Let the plots of the last training finish rendering
+    wait_for_plots()
     exit()
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+import os
+import shutil
+import struct
+import tempfile
+import numpy as np
+from typing import Tuple
+
+# CSV chunk reader
+from .streaming import read_csv_chunks, DEFAULT_CSV_CHUNK_SIZE
+
+# Layout of the file: a fixed-size little-endian header followed by the km column
+# and then the price column, both as contiguous float64 arrays.
+#   magic (8 bytes) | version (uint32) | number of columns (uint32) | number of rows (uint64)
+BINARY_MAGIC: bytes = b'FTLRDATA'
+BINARY_VERSION: int = 1
+BINARY_HEADER = struct.Struct('<8sIIQ')
+BINARY_COLUMNS: Tuple[str, str] = ('km', 'price')
+
+
+def convert_csv_to_binary(csv_path: str, binary_path: str, chunk_size: int = DEFAULT_CSV_CHUNK_SIZE) -> int:
+    """
+    Converts the km and price columns of a CSV file into the binary columnar format.
+
+    The CSV file is parsed once, in chunks: kilometers are appended to the output
+    file and prices to a temporary file that is concatenated at the end. The output
+    is written next to `binary_path` and only renamed into place once complete, so an
+    interrupted conversion never leaves a truncated dataset that looks up to date.
+
+    Args:
+        csv_path (str): Path to the CSV file with 'km' and 'price' columns.
+        binary_path (str): Path of the binary file to write.
+        chunk_size (int, optional): Number of CSV rows parsed at once.
+
+    Returns:
+        int: The number of rows written.
+    """
+    n_rows: int = 0
+    temporary_path: str = f"{binary_path}.tmp"
+    try:
+        with open(temporary_path, 'wb') as binary_file, tempfile.TemporaryFile() as price_file:
+            # Placeholder header, rewritten once the number of rows is known
+            binary_file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(BINARY_COLUMNS), 0))
+
+            for data_km, data_price in read_csv_chunks(csv_path, chunk_size):
+                data_km.astype('<f8', copy=False).tofile(binary_file)
+                data_price.astype('<f8', copy=False).tofile(price_file)
+                n_rows += data_km.shape[0]
+
+            price_file.seek(0)
+            shutil.copyfileobj(price_file, binary_file)
+
+            binary_file.seek(0)
+            binary_file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(BINARY_COLUMNS), n_rows))
+            binary_file.flush()
+            os.fsync(binary_file.fileno())
+        os.replace(temporary_path, binary_path)
+    finally:
+        # Left behind only when the conversion failed
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    print(f"{n_rows} rows converted from {csv_path} to {binary_path}.")
+    return n_rows
+
+
+def load_binary_dataset(binary_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Memory-maps the km and price columns of a binary dataset, without copying them.
+
+    Args:
+        binary_path (str): Path of the binary file.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Read-only float64 views of the kilometers and prices.
+
+    Raises:
+        ValueError: If the file is not a binary dataset of a supported version or is truncated.
+    """
+    with open(binary_path, 'rb') as file:
+        header: bytes = file.read(BINARY_HEADER.size)
+    if len(header) != BINARY_HEADER.size:
+        raise ValueError(f"{binary_path} is too short to be a binary dataset.")
+
+    magic, version, n_columns, n_rows = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or n_columns != len(BINARY_COLUMNS):
+        raise ValueError(f"{binary_path} is not a binary dataset of version {BINARY_VERSION}.")
+
+    expected_size: int = BINARY_HEADER.size + n_columns * n_rows * 8
+    if os.path.getsize(binary_path) != expected_size:
+        raise ValueError(f"{binary_path} is truncated or corrupted.")
+
+    if n_rows == 0:
+        empty: np.ndarray = np.empty(0, dtype=np.float64)
+        return empty, empty
+
+    columns: np.ndarray = np.memmap(binary_path, dtype='<f8', mode='r', offset=BINARY_HEADER.size, shape=(n_columns, n_rows))
+    return columns[0], columns[1]
+
+
+def is_binary_dataset_fresh(csv_path: str, binary_path: str) -> bool:
+    """
+    Checks that a binary dataset exists and is not older than its CSV source.
+
+    Args:
+        csv_path (str): Path to the CSV source.
+        binary_path (str): Path of the binary file.
+
+    Returns:
+        bool: True if the binary file can be used instead of the CSV file.
+    """
+    if not os.path.exists(binary_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(binary_path) >= os.path.getmtime(csv_path)
@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Sequence, Tuple
+
+# Model file
+from .model_store import BootstrapQuantiles, hash_dataset, save_linear_model, MODEL_PATH
+# Coefficients file
+from .gradient_descent import save_coefficients_to_file
+# Running statistics
+from .sufficient_statistics import RunningStatistics, DEFAULT_CHUNK_SIZE
+# Dataset shared with the worker processes
+from .sweep import SharedDataset, attach_shared_dataset
+
+# A replicate draws n row indices with replacement and only keeps how many times each
+# row was drawn: the fit of the replicate is the closed-form fit of the rows weighted by
+# these counts, from four dot products, without gathering the resampled rows.
+
+# Quantile levels stored with the model: 50 %, 90 % and 95 % intervals and the median
+BOOTSTRAP_LEVELS: Tuple[float, ...] = (0.025, 0.05, 0.25, 0.5, 0.75, 0.95, 0.975)
+# Number of replicates of a task. Tasks, not workers, own a random stream, so the
+# replicates do not depend on the number of workers.
+BOOTSTRAP_TASK_SIZE: int = 100
+
+# Views on the shared dataset, set in each worker by _attach_bootstrap_dataset
+_shared_block: shared_memory.SharedMemory = None
+_shared_x: np.ndarray = None
+_shared_y: np.ndarray = None
+
+
+def resample_counts(rng: np.random.Generator, n_rows: int, n_replicates: int) -> np.ndarray:
+    """
+    Draws bootstrap replicates as the number of times each row is drawn.
+
+    Args:
+        rng (np.random.Generator): Random generator.
+        n_rows (int): Number of rows.
+        n_replicates (int): Number of replicates.
+
+    Returns:
+        np.ndarray: The counts, shape (n_replicates, n_rows), float64.
+    """
+    indices: np.ndarray = rng.integers(0, n_rows, (n_replicates, n_rows))
+    # One bincount for every replicate: the rows of replicate i are offset by i * n_rows
+    indices += np.arange(n_replicates)[:, None] * n_rows
+    return np.bincount(indices.ravel(), minlength=n_replicates * n_rows).reshape(n_replicates, n_rows) \
+             .astype(np.float64)
+
+
+def fit_replicates(centered_x: np.ndarray, centered_y: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fits the regression line of each replicate in closed form, from its weighted sums.
+
+    Args:
+        centered_x (np.ndarray): Feature data, minus its mean.
+        centered_y (np.ndarray): Target values, minus their mean.
+        counts (np.ndarray): Number of draws of each row, shape (n_replicates, n_rows).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The slope of each replicate, and its prediction at the
+        mean of the feature data, both relative to the centered data.
+    """
+    n: np.ndarray = counts.sum(axis=1)
+    weighted_x: np.ndarray = counts * centered_x
+    # On centered data the raw sums do not cancel out
+    mean_x: np.ndarray = weighted_x.sum(axis=1) / n
+    mean_y: np.ndarray = counts @ centered_y / n
+    m2_x: np.ndarray = weighted_x @ centered_x - n * mean_x * mean_x
+    c_xy: np.ndarray = weighted_x @ centered_y - n * mean_x * mean_y
+    w: np.ndarray = np.divide(c_xy, m2_x, out=np.zeros_like(c_xy), where=m2_x > 0)
+    return w, mean_y - w * mean_x
+
+
+def bootstrap_replicates(centered_x: np.ndarray, centered_y: np.ndarray, n_replicates: int, \
+                         seed: np.random.SeedSequence, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draws and fits bootstrap replicates, a block of replicates at a time.
+
+    Args:
+        centered_x (np.ndarray): Feature data, minus its mean.
+        centered_y (np.ndarray): Target values, minus their mean.
+        n_replicates (int): Number of replicates.
+        seed (np.random.SeedSequence): Seed of the random stream of the replicates.
+        chunk_size (int, optional): Number of counts held at once, at least one replicate.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The slopes and the centered mean predictions, as fit_replicates.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows: int = centered_x.shape[0]
+    block: int = max(1, chunk_size // n_rows)
+    slopes: List[np.ndarray] = []
+    mean_prices: List[np.ndarray] = []
+    for start in range(0, n_replicates, block):
+        counts: np.ndarray = resample_counts(rng, n_rows, min(block, n_replicates - start))
+        w, mean_price = fit_replicates(centered_x, centered_y, counts)
+        slopes.append(w)
+        mean_prices.append(mean_price)
+    return np.concatenate(slopes), np.concatenate(mean_prices)
+
+
+def _attach_bootstrap_dataset(name: str, n_rows: int) -> None:
+    """
+    Worker initializer: maps the shared dataset once per process and silences training logs.
+    """
+    global _shared_block, _shared_x, _shared_y
+    _shared_block, _shared_x, _shared_y = attach_shared_dataset(name, n_rows)
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _run_replicates(task: Tuple[int, np.random.SeedSequence]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Worker task: draws and fits a block of replicates of the shared dataset.
+    """
+    n_replicates, seed = task
+    return bootstrap_replicates(_shared_x, _shared_y, n_replicates, seed)
+
+
+def bootstrap_coefficients(data_x: np.ndarray, data_y: np.ndarray, n_replicates: int = 2000, seed: int = 0, \
+                           max_workers: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fits bootstrap replicates of a dataset across a pool of processes.
+
+    The data is centered once and shared with the workers through shared memory. The
+    replicates are split into tasks of BOOTSTRAP_TASK_SIZE, each with its own child of
+    SeedSequence(seed): the result is the same whatever the number of workers.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        n_replicates (int, optional): Number of replicates.
+        seed (int, optional): Seed of the resampling, for reproducible intervals.
+        max_workers (int, optional): Number of worker processes. Default is the number of CPUs.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The slope of each replicate and its price at the mean of x.
+
+    Raises:
+        ValueError: If there are fewer than two rows or no replicate.
+    """
+    if data_x.shape[0] < 2:
+        raise ValueError("The bootstrap needs at least two rows.")
+    if n_replicates < 1:
+        raise ValueError("The number of replicates must be positive.")
+    mean_x: float = float(np.mean(data_x))
+    mean_y: float = float(np.mean(data_y))
+
+    sizes: List[int] = [min(BOOTSTRAP_TASK_SIZE, n_replicates - start) for start in range(0, n_replicates, BOOTSTRAP_TASK_SIZE)]
+    seeds: List[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(len(sizes))
+    with SharedDataset(data_x - mean_x, data_y - mean_y) as dataset:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_bootstrap_dataset,
+                                 initargs=(dataset.name, dataset.n_rows)) as executor:
+            outcomes = list(executor.map(_run_replicates, zip(sizes, seeds)))
+
+    slopes: np.ndarray = np.concatenate([w for w, _ in outcomes])
+    mean_prices: np.ndarray = np.concatenate([mean_price for _, mean_price in outcomes]) + mean_y
+    return slopes, mean_prices
+
+
+def bootstrap_quantiles(slopes: np.ndarray, mean_prices: np.ndarray, residuals: np.ndarray, \
+                        levels: Sequence[float] = BOOTSTRAP_LEVELS) -> BootstrapQuantiles:
+    """
+    Summarizes bootstrap replicates by the quantiles stored with the model.
+
+    Args:
+        slopes (np.ndarray): Slope of each replicate.
+        mean_prices (np.ndarray): Price at the mean of x of each replicate.
+        residuals (np.ndarray): Residuals of the model fitted on the whole data.
+        levels (Sequence[float], optional): Quantile levels.
+
+    Returns:
+        BootstrapQuantiles: The quantiles.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    return BootstrapQuantiles(levels, np.quantile(slopes, levels)[:, None], np.quantile(mean_prices, levels),
+                              np.quantile(residuals, levels), slopes.shape[0])
+
+
+def lauch_bootstrap(original_data_x: np.ndarray, original_data_y: np.ndarray, n_replicates: int = 2000, \
+                    seed: int = 0, max_workers: int = None, coefficients_path: str = '../prediction/coefficients.txt', \
+                    model_path: str = MODEL_PATH) -> BootstrapQuantiles:
+    """
+    Fits the model in closed form, estimates the uncertainty of its coefficients by
+    bootstrap and saves both: the predictor then prints intervals with its prices.
+
+    Args:
+        original_data_x (np.ndarray): The original feature data.
+        original_data_y (np.ndarray): The target values.
+        n_replicates (int, optional): Number of bootstrap replicates.
+        seed (int, optional): Seed of the resampling.
+        max_workers (int, optional): Number of worker processes. Default is the number of CPUs.
+        coefficients_path (str, optional): Path to the coefficients file.
+        model_path (str, optional): Path to the model file.
+
+    Returns:
+        BootstrapQuantiles: The quantiles saved with the model.
+
+    Raises:
+        ValueError: If there are fewer than two rows or no replicate.
+    """
+    statistics = RunningStatistics.from_arrays(original_data_x, original_data_y)
+    w_final, b_final = statistics.fit()
+
+    start: float = time.perf_counter()
+    slopes, mean_prices = bootstrap_coefficients(original_data_x, original_data_y, n_replicates, seed, max_workers)
+    seconds: float = time.perf_counter() - start
+    print(f"{n_replicates} replicates fitted in {seconds:.3f} s ({n_replicates / seconds:.0f} replicates/s).")
+
+    residuals: np.ndarray = original_data_y - (w_final * original_data_x + b_final)
+    quantiles: BootstrapQuantiles = bootstrap_quantiles(slopes, mean_prices, residuals)
+    for level, w, mean_price in zip(quantiles.levels, quantiles.weights[:, 0], quantiles.mean_prices):
+        print(f"q{level:<6g} w={w:<12.6g} price at {statistics.mean_x:.0f} km={mean_price:<12.6g}")
+
+    print(f"(w,b) found by the normal equation: ({w_final},{b_final})")
+    save_coefficients_to_file(w_final, b_final, coefficients_path)
+    save_linear_model(w_final, b_final, statistics, hash_dataset([(original_data_x, original_data_y)]), model_path,
+                      quantiles)
+    return quantiles
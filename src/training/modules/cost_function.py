@@ -1,6 +1,26 @@
 import numpy as np
+from .sufficient_statistics import RunningStatistics
+# Multithreaded reductions
+from .parallel_reduction import ParallelReducer
 
-def compute_cost_ft(data_x: np.ndarray, data_y: np.ndarray, w: float = 0.03, b: float = 5000) -> float:
+def regularization_penalty(w: float, alpha: float = 0.0, l1_ratio: float = 0.0) -> float:
+    """
+    Computes the elastic-net penalty of the slope: alpha * (l1_ratio * |w| + (1 - l1_ratio) * w ** 2 / 2).
+
+    l1_ratio = 0 is ridge (L2), l1_ratio = 1 is lasso (L1). The intercept is never penalized.
+
+    Args:
+        w (float): Slope of the regression line.
+        alpha (float, optional): Strength of the regularization.
+        l1_ratio (float, optional): Share of the L1 penalty, between 0 and 1.
+
+    Returns:
+        float: The penalty added to the cost.
+    """
+    return alpha * (l1_ratio * abs(w) + (1 - l1_ratio) * w * w / 2)
+
+def compute_cost_ft(data_x: np.ndarray, data_y: np.ndarray, w: float = 0.03, b: float = 5000, \
+                    alpha: float = 0.0, l1_ratio: float = 0.0, reducer: ParallelReducer = None) -> float:
     """
     Computes the cost function (Squared Error Cost Function) for linear regression.
 
@@ -9,6 +29,10 @@ def compute_cost_ft(data_x: np.ndarray, data_y: np.ndarray, w: float = 0.03, b:
         data_y (np.ndarray): Target values
         w (float, optional): Slope of the regression line. Default is 0.03.
         b (float, optional): Y-intercept of the regression line. Default is 5000.
+        alpha (float, optional): Strength of the regularization of w, none by default.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty in the regularization, the rest is L2 (ridge).
+        reducer (ParallelReducer, optional): Computes the squared errors chunk by chunk across threads,
+                                             without temporaries of the whole array.
 
     Returns:
         float: The cost of using `w` and `b` as parameters for linear regression to fit 
@@ -17,13 +41,57 @@ def compute_cost_ft(data_x: np.ndarray, data_y: np.ndarray, w: float = 0.03, b:
     # Number of training examples
     m: int = data_x.shape[0]
 
+    if reducer is not None:
+        _, _, sum_of_squares = reducer.residual_sums(data_x, data_y, w, b)
+        return sum_of_squares / (2 * m) + regularization_penalty(w, alpha, l1_ratio)
+
     # Computation of the predictions: f_wb = w * data_x + b
     f_wb: np.ndarray = w * data_x + b
     
     # Compute the squared errors
     errors: np.ndarray = (f_wb - data_y) ** 2
     
-    # Compute the cost (mean squared error)
-    total_cost: float = (1 / (2 * m)) * np.sum(errors)
+    # Compute the cost (mean squared error), accumulated in float64 even on float32 data
+    total_cost: float = (1 / (2 * m)) * np.sum(errors, dtype=np.float64)
+
+    # Add the penalty of the slope
+    total_cost += regularization_penalty(w, alpha, l1_ratio)
     
     return total_cost
+
+def compute_cost_grid(data_x: np.ndarray, data_y: np.ndarray, w_values: np.ndarray, b_values: np.ndarray) -> np.ndarray:
+    """
+    Computes the cost function over a whole grid of (w, b) values at once.
+
+    The squared error cost is a quadratic in w and b whose coefficients only depend on
+    the sufficient statistics of the data, so a single pass over the data is needed
+    whatever the size of the grid. With the residual r = w * x + b - y:
+
+        J(w, b) = (var(r) + mean(r) ** 2) / 2
+        var(r)  = w ** 2 * var(x) - 2 * w * cov(x, y) + var(y)
+        mean(r) = w * mean(x) + b - mean(y)
+
+    Args:
+        data_x (np.ndarray): Feature data
+        data_y (np.ndarray): Target values
+        w_values (np.ndarray): Values of the slope (w), one per row of the grid.
+        b_values (np.ndarray): Values of the intercept (b), one per column of the grid.
+
+    Returns:
+        np.ndarray: The costs, with shape (len(w_values), len(b_values)).
+    """
+    statistics = RunningStatistics.from_arrays(data_x, data_y)
+    n: int = statistics.n
+
+    # Column of slopes against row of intercepts, broadcast to the grid
+    w_column: np.ndarray = np.asarray(w_values, dtype=np.float64)[:, np.newaxis]
+    b_row: np.ndarray = np.asarray(b_values, dtype=np.float64)[np.newaxis, :]
+
+    # Variance of the residuals only depends on w
+    variance_residual: np.ndarray = (w_column * w_column * statistics.m2_x
+                                     - 2 * w_column * statistics.c_xy
+                                     + statistics.m2_y) / n
+    # Mean of the residuals, over the whole grid
+    mean_residual: np.ndarray = w_column * statistics.mean_x + b_row - statistics.mean_y
+
+    return (variance_residual + mean_residual * mean_residual) / 2
@@ -0,0 +1,319 @@
+import csv
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+# Feature scaling
+from .feature_scaling import denormalize_coefficients
+# Training engine
+from .gradient_descent import compute_gradients_and_cost, minimize
+# Running statistics
+from .sufficient_statistics import RunningStatistics
+# Dataset shared with the worker processes
+from .sweep import SharedDataset, attach_shared_dataset, attach_worker_dataset, worker_dataset
+
+# Folds are contiguous ranges of rows of the (optionally shuffled) shared dataset.
+# The test rows of a fold are a view of the dataset, its training rows the two views
+# before and after it, so no fold ever copies the data.
+
+# Columns of the results table, in order
+CROSS_VALIDATION_COLUMNS: Tuple[str, ...] = ('fold', 'train_rows', 'test_rows', 'w_final', 'b_final',
+                                             'mse', 'mae', 'r2', 'iterations', 'seconds')
+
+
+class SegmentsObjective:
+    """
+    Squared error cost over several segments of rows, as a function of the parameters
+    [w, b] of the model on standardized x: y = w * (x - mean) / std + b.
+
+    The data is standardized on the fly into a buffer, so the training rows of a fold
+    can be views of the raw dataset and the optimization still runs in the
+    well-conditioned standardized space of `gradient_descent`. Each segment is
+    evaluated by the fused kernel of the training engine, compute_gradients_and_cost.
+    """
+
+    def __init__(self, segments: Sequence[Tuple[np.ndarray, np.ndarray]], mean_x: float, std_x: float) -> None:
+        self.segments: List[Tuple[np.ndarray, np.ndarray]] = [(x, y) for x, y in segments if x.shape[0]]
+        self.mean_x: float = mean_x
+        self.std_x: float = std_x
+        self.m: int = sum(x.shape[0] for x, _ in self.segments)
+        # Buffers of the standardized x and of the residual, reused by every evaluation
+        largest: int = max(x.shape[0] for x, _ in self.segments)
+        self.standardized: np.ndarray = np.empty(largest, dtype=np.float64)
+        self.residual: np.ndarray = np.empty(largest, dtype=np.float64)
+
+        # The Hessian is constant: [[mean(s ** 2), mean(s)], [mean(s), 1]] of the standardized s
+        sum_s: float = 0.0
+        sum_ss: float = 0.0
+        for data_x, _ in self.segments:
+            standardized: np.ndarray = self._standardize(data_x)
+            sum_s += np.sum(standardized)
+            sum_ss += np.dot(standardized, standardized)
+        self.hessian: np.ndarray = np.array([[sum_ss, sum_s], [sum_s, self.m]]) / self.m
+
+    def _standardize(self, data_x: np.ndarray) -> np.ndarray:
+        standardized: np.ndarray = self.standardized[:data_x.shape[0]]
+        np.subtract(data_x, self.mean_x, out=standardized)
+        np.divide(standardized, self.std_x, out=standardized)
+        return standardized
+
+    def value_and_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Computes the cost and its gradient [dJ/dw, dJ/db] at params = [w, b].
+        """
+        cost: float = 0.0
+        gradient: np.ndarray = np.zeros(2)
+        for data_x, data_y in self.segments:
+            m: int = data_x.shape[0]
+            dj_dw, dj_db, segment_cost = compute_gradients_and_cost(self._standardize(data_x), data_y, params[0],
+                                                                    params[1], self.residual[:m])
+            # Means over a segment, weighted by its share of the rows
+            cost += segment_cost * m / self.m
+            gradient += np.array([dj_dw, dj_db]) * m / self.m
+        return cost, gradient
+
+    def value(self, params: np.ndarray) -> float:
+        """
+        Computes the cost at params = [w, b].
+        """
+        return self.value_and_gradient(params)[0]
+
+    def curvature(self, direction: np.ndarray) -> float:
+        """
+        Computes direction^T H direction from the constant Hessian.
+        """
+        return float(direction @ self.hessian @ direction)
+
+
+def fold_bounds(n_rows: int, k: int) -> np.ndarray:
+    """
+    Splits rows into k contiguous folds whose sizes differ by at most one row.
+
+    Args:
+        n_rows (int): Number of rows.
+        k (int): Number of folds.
+
+    Returns:
+        np.ndarray: The k + 1 boundaries: fold i holds the rows bounds[i] to bounds[i + 1].
+
+    Raises:
+        ValueError: If k is not between 2 and the number of rows.
+    """
+    if not 2 <= k <= n_rows:
+        raise ValueError(f"The number of folds must be between 2 and the number of rows ({n_rows}).")
+    return np.linspace(0, n_rows, k + 1).astype(np.int64)
+
+
+def fold_statistics(data_x: np.ndarray, data_y: np.ndarray, bounds: np.ndarray) -> List[RunningStatistics]:
+    """
+    Computes the sufficient statistics of every fold in a single pass over the data.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        bounds (np.ndarray): Fold boundaries from fold_bounds.
+
+    Returns:
+        List[RunningStatistics]: The statistics of each fold.
+    """
+    return [RunningStatistics.from_arrays(data_x[start:stop], data_y[start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def training_statistics(statistics: Sequence[RunningStatistics], fold: int) -> RunningStatistics:
+    """
+    Merges the statistics of every fold but one: the training rows of that fold, in O(k).
+    """
+    merged = RunningStatistics()
+    for i, other in enumerate(statistics):
+        if i != fold:
+            merged.merge(other)
+    return merged
+
+
+def evaluate_predictions(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float) -> Dict[str, float]:
+    """
+    Computes the mean squared error, the mean absolute error and the R² of a line on some rows.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        w (float): Slope of the line.
+        b (float): Intercept of the line.
+
+    Returns:
+        Dict[str, float]: The 'mse', 'mae' and 'r2' of the predictions.
+    """
+    residual: np.ndarray = np.multiply(data_x, w, dtype=np.float64)
+    np.add(residual, b, out=residual)
+    np.subtract(residual, data_y, out=residual)
+    sum_squares: float = np.dot(residual, residual)
+    mae: float = np.sum(np.abs(residual, out=residual)) / data_x.shape[0]
+
+    deviation: np.ndarray = np.subtract(data_y, np.mean(data_y), out=residual)
+    total_sum_squares: float = np.dot(deviation, deviation)
+    return {'mse': float(sum_squares / data_x.shape[0]), 'mae': float(mae),
+            'r2': float(1 - sum_squares / total_sum_squares) if total_sum_squares else float('nan')}
+
+
+def evaluate_statistics(statistics: RunningStatistics, data_x: np.ndarray, data_y: np.ndarray, \
+                        w: float, b: float) -> Dict[str, float]:
+    """
+    Computes the mean squared error and the R² of a line from the statistics of the rows, in O(1),
+    and its mean absolute error from one pass over the rows.
+
+    The mean absolute error needs the residuals themselves: they are computed in a single
+    vectorized pass, O(rows), with no other reduction.
+
+    Args:
+        statistics (RunningStatistics): Statistics of the rows.
+        data_x (np.ndarray): Feature data of the rows, e.g. a view of the test fold.
+        data_y (np.ndarray): Target values of the rows.
+        w (float): Slope of the line.
+        b (float): Intercept of the line.
+
+    Returns:
+        Dict[str, float]: The 'mse', 'mae' and 'r2' of the predictions.
+    """
+    residual: np.ndarray = np.multiply(data_x, w, dtype=np.float64)
+    np.add(residual, b, out=residual)
+    np.subtract(residual, data_y, out=residual)
+    mae: float = np.sum(np.abs(residual, out=residual)) / data_x.shape[0]
+
+    mse: float = 2 * statistics.cost(w, b)
+    return {'mse': mse, 'mae': float(mae),
+            'r2': 1 - mse * statistics.n / statistics.m2_y if statistics.m2_y else float('nan')}
+
+
+def _run_fold(task: Dict) -> Dict:
+    """
+    Worker task: trains on every row outside a fold and evaluates on the fold.
+    """
+    start, stop = task['start'], task['stop']
+    shared_x, shared_y = worker_dataset()
+    segments = [(shared_x[:start], shared_y[:start]), (shared_x[stop:], shared_y[stop:])]
+
+    began: float = time.perf_counter()
+    objective = SegmentsObjective(segments, task['mean_x'], task['std_x'])
+    result = minimize(objective, [0.0, 0.0], task['learning_rate'], task['tolerance'], task['max_iterations'],
+                      task['optimizer'])
+    w_final, b_final = denormalize_coefficients(None, result.params[0], result.params[1], task['mean_x'], task['std_x'])
+    metrics: Dict[str, float] = evaluate_predictions(shared_x[start:stop], shared_y[start:stop], w_final, b_final)
+    seconds: float = time.perf_counter() - began
+
+    return dict(fold=task['fold'], train_rows=objective.m, test_rows=stop - start, w_final=float(w_final), b_final=float(b_final),
+                iterations=result.iterations, seconds=seconds, **metrics)
+
+
+def cross_validate(data_x: np.ndarray, data_y: np.ndarray, k: int = 5, solver: str = "gradient_descent", \
+                   optimizer: str = "gradient_descent", learning_rate: float = None, tolerance: float = 1e-6, \
+                   max_iterations: int = 5000, shuffle: bool = True, seed: int = 0, max_workers: int = None, \
+                   results_path: str = None) -> List[Dict]:
+    """
+    Estimates how the model generalizes with k-fold cross-validation.
+
+    The rows are (optionally) shuffled once into a shared memory block, which is cut
+    into k contiguous folds. One pass computes the sufficient statistics of every fold:
+    the training statistics of a fold are the merge of the others. With the
+    "gradient_descent" solver the folds are trained concurrently by a pool of processes
+    with the training engine, and evaluated on their test rows. With the
+    "normal_equation" solver each fold is fitted from the statistics alone, in O(k),
+    and its MSE and R² come from the statistics too: only the MAE takes one pass over
+    the test rows of the fold.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        k (int, optional): Number of folds.
+        solver (str, optional): "gradient_descent" or "normal_equation".
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient.
+        max_iterations (int, optional): Maximum number of iterations of each fold.
+        shuffle (bool, optional): Whether to shuffle the rows before cutting the folds.
+        seed (int, optional): Seed of the shuffling, for reproducible folds.
+        max_workers (int, optional): Number of worker processes. Default is the number of CPUs.
+        results_path (str, optional): CSV file where the results table is written.
+
+    Returns:
+        List[Dict]: One row per fold with the columns of CROSS_VALIDATION_COLUMNS.
+
+    Raises:
+        ValueError: If the solver is unknown or k is out of range.
+    """
+    if solver not in ("gradient_descent", "normal_equation"):
+        raise ValueError(f"Unknown solver '{solver}'. Use 'gradient_descent' or 'normal_equation'.")
+    bounds: np.ndarray = fold_bounds(data_x.shape[0], k)
+    order: np.ndarray = np.random.default_rng(seed).permutation(data_x.shape[0]) if shuffle else None
+
+    with SharedDataset(data_x, data_y, order) as dataset:
+        block, shared_x, shared_y = attach_shared_dataset(dataset.name, dataset.n_rows)
+        statistics: List[RunningStatistics] = fold_statistics(shared_x, shared_y, bounds)
+
+        if solver == "normal_equation":
+            rows: List[Dict] = []
+            for fold in range(k):
+                began: float = time.perf_counter()
+                start, stop = int(bounds[fold]), int(bounds[fold + 1])
+                w_final, b_final = training_statistics(statistics, fold).fit()
+                metrics: Dict[str, float] = evaluate_statistics(statistics[fold], shared_x[start:stop],
+                                                                shared_y[start:stop], w_final, b_final)
+                rows.append(dict(fold=fold, train_rows=int(dataset.n_rows - statistics[fold].n),
+                                 test_rows=int(statistics[fold].n), w_final=w_final, b_final=b_final,
+                                 iterations=0, seconds=time.perf_counter() - began, **metrics))
+        else:
+            tasks: List[Dict] = []
+            for fold in range(k):
+                train = training_statistics(statistics, fold)
+                tasks.append(dict(fold=fold, start=int(bounds[fold]), stop=int(bounds[fold + 1]),
+                                  mean_x=train.mean_x, std_x=train.std_x, optimizer=optimizer,
+                                  learning_rate=learning_rate, tolerance=tolerance, max_iterations=max_iterations))
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=attach_worker_dataset,
+                                     initargs=(dataset.name, dataset.n_rows)) as executor:
+                rows = list(executor.map(_run_fold, tasks))
+        del shared_x, shared_y
+        block.close()
+
+    if results_path:
+        save_cross_validation_results(rows, results_path)
+    return rows
+
+
+def summarize_folds(rows: List[Dict]) -> Dict[str, Tuple[float, float]]:
+    """
+    Computes the mean and standard deviation of each metric across the folds.
+
+    Args:
+        rows (List[Dict]): Rows returned by cross_validate.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The (mean, standard deviation) of 'mse', 'mae' and 'r2'.
+    """
+    return {metric: (float(np.mean([row[metric] for row in rows])), float(np.std([row[metric] for row in rows])))
+            for metric in ('mse', 'mae', 'r2')}
+
+
+def save_cross_validation_results(rows: List[Dict], file_path: str) -> None:
+    """
+    Writes the per-fold results of a cross-validation as CSV.
+
+    Args:
+        rows (List[Dict]): Rows returned by cross_validate.
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        None
+    """
+    try:
+        directory: str = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=CROSS_VALIDATION_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Cross-validation results have been saved to {file_path}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
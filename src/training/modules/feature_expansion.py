@@ -0,0 +1,402 @@
+import hashlib
+import os
+import re
+import numpy as np
+from typing import List, NamedTuple, Sequence, Tuple
+
+# Fingerprint of the training data, versioned model file
+from .model_store import hash_dataset, save_multivariate_model, MODEL_PATH
+# Multivariate training engine
+from .gradient_descent import minimize
+from .multivariate import LinearObjective, destandardize_coefficients, save_coefficient_vector_to_file
+# Chunk size of the passes over the data
+from .sufficient_statistics import DEFAULT_CHUNK_SIZE
+
+# An expanded model is a multivariate model whose features are functions of km. Each
+# feature is described by its name alone, so the model file is enough to expand the
+# kilometers again at prediction time (src/prediction/feature_expansion.py parses the
+# same names, keep both in sync):
+#   km^p                 power p of the kilometers ("km" for p = 1)
+#   max(km-K,0)^p        truncated power of a knot K: piecewise-linear for p = 1,
+#                        a cubic spline basis for p = 3 ("max(km-K,0)" for p = 1)
+FEATURE_PATTERN = re.compile(r'^(?:km|max\(km-(?P<knot>[0-9.e+]+),0\))(?:\^(?P<power>[0-9]+))?$')
+
+# Cached design matrices, one .npy file per dataset and expansion
+DESIGN_CACHE_DIR: str = '../../data/cache'
+# Total size of the cached matrices, beyond which the least recently used are evicted
+DESIGN_CACHE_MAX_BYTES: int = 1 << 30
+# Data types the design matrix can be stored in
+DESIGN_DTYPES: Tuple[str, ...] = ('float64', 'float32')
+
+
+class DesignMatrix(NamedTuple):
+    """
+    A standardized design matrix and what is needed to undo the standardization.
+
+    Attributes:
+        matrix (np.ndarray): Standardized expanded features, shape (m, k), memory-mapped from the cache.
+        means (np.ndarray): Means of the expanded features.
+        standard_deviations (np.ndarray): Standard deviations of the expanded features.
+        feature_names (Tuple[str, ...]): Names of the k expanded features.
+        data_hash (bytes): Fingerprint of the training data (see model_store.hash_dataset).
+    """
+    matrix: np.ndarray
+    means: np.ndarray
+    standard_deviations: np.ndarray
+    feature_names: Tuple[str, ...]
+    data_hash: bytes
+
+
+def make_feature_names(degree: int = 1, knots: Sequence[float] = ()) -> List[str]:
+    """
+    Names the features of a polynomial or spline expansion of the kilometers.
+
+    Without knots this is a polynomial of the given degree. With knots, a truncated power
+    term of the same degree is added per knot: a piecewise-linear model for degree 1,
+    a cubic spline for degree 3.
+
+    Args:
+        degree (int, optional): Degree of the polynomial and of the spline pieces.
+        knots (Sequence[float], optional): Kilometers where the pieces join, rounded to integers.
+
+    Returns:
+        List[str]: The feature names.
+
+    Raises:
+        ValueError: If the degree is below 1 or a knot is negative.
+    """
+    if degree < 1:
+        raise ValueError("The degree of the expansion must be at least 1.")
+    if any(knot < 0 for knot in knots):
+        raise ValueError("The knots must be positive kilometers.")
+    suffix = lambda power: '' if power == 1 else f'^{power}'
+    names: List[str] = [f'km{suffix(power)}' for power in range(1, degree + 1)]
+    names += [f'max(km-{int(round(knot))},0){suffix(degree)}' for knot in sorted(set(knots))]
+    return names
+
+
+def quantile_knots(data_x: np.ndarray, n_knots: int) -> np.ndarray:
+    """
+    Places knots at evenly spaced quantiles of the kilometers, so each piece gets as many rows.
+
+    Args:
+        data_x (np.ndarray): Kilometers.
+        n_knots (int): Number of knots.
+
+    Returns:
+        np.ndarray: The knots, rounded to whole kilometers.
+    """
+    return np.round(np.quantile(data_x, np.arange(1, n_knots + 1) / (n_knots + 1)))
+
+
+def parse_feature_names(feature_names: Sequence[str]) -> List[Tuple[float, int]]:
+    """
+    Parses expanded feature names into (knot, power) pairs, with no knot (NaN) for powers of km.
+
+    Args:
+        feature_names (Sequence[str]): Names created by make_feature_names.
+
+    Returns:
+        List[Tuple[float, int]]: The knot and power of each feature.
+
+    Raises:
+        ValueError: If a name does not describe an expansion of km.
+    """
+    terms: List[Tuple[float, int]] = []
+    for name in feature_names:
+        match = FEATURE_PATTERN.match(name)
+        if match is None:
+            raise ValueError(f"'{name}' is not an expansion of km.")
+        knot: float = float(match.group('knot')) if match.group('knot') else float('nan')
+        terms.append((knot, int(match.group('power') or 1)))
+    return terms
+
+
+def expand_features(data_x: np.ndarray, feature_names: Sequence[str], out: np.ndarray = None) -> np.ndarray:
+    """
+    Computes the expanded features of kilometers, column by column.
+
+    Args:
+        data_x (np.ndarray): Kilometers.
+        feature_names (Sequence[str]): Names created by make_feature_names.
+        out (np.ndarray, optional): Matrix of shape (len(data_x), k) receiving the features, in any float type.
+
+    Returns:
+        np.ndarray: The features, shape (len(data_x), k).
+    """
+    if out is None:
+        out = np.empty((data_x.shape[0], len(feature_names)), dtype=np.float64)
+    column: np.ndarray = np.empty(data_x.shape[0], dtype=np.float64)
+    for j, (knot, power) in enumerate(parse_feature_names(feature_names)):
+        if np.isnan(knot):
+            np.copyto(column, data_x)
+        else:
+            # Truncated term: zero before the knot
+            np.subtract(data_x, knot, out=column)
+            np.maximum(column, 0, out=column)
+        if power != 1:
+            np.power(column, power, out=column)
+        out[:, j] = column
+    return out
+
+
+def column_statistics(data_x: np.ndarray, feature_names: Sequence[str], \
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the means and standard deviations of the expanded features chunk by chunk,
+    without building the whole matrix.
+
+    Chunks are merged with the same pairwise update as RunningStatistics, one column per lane.
+
+    Args:
+        data_x (np.ndarray): Kilometers.
+        feature_names (Sequence[str]): Names created by make_feature_names.
+        chunk_size (int, optional): Number of rows expanded at once.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The means and standard deviations of the columns.
+    """
+    k: int = len(feature_names)
+    n: int = 0
+    means: np.ndarray = np.zeros(k)
+    m2: np.ndarray = np.zeros(k)
+    block: np.ndarray = np.empty((min(chunk_size, data_x.shape[0]), k), dtype=np.float64)
+    for start in range(0, data_x.shape[0], chunk_size):
+        chunk: np.ndarray = expand_features(data_x[start:start + chunk_size], feature_names,
+                                            block[:min(chunk_size, data_x.shape[0] - start)])
+        chunk_n: int = chunk.shape[0]
+        chunk_means: np.ndarray = np.mean(chunk, axis=0)
+        chunk -= chunk_means
+        chunk_m2: np.ndarray = np.einsum('ij,ij->j', chunk, chunk)
+
+        # Pairwise merge of the chunk into the running statistics
+        delta: np.ndarray = chunk_means - means
+        m2 += chunk_m2 + delta * delta * (n * chunk_n / (n + chunk_n))
+        means += delta * chunk_n / (n + chunk_n)
+        n += chunk_n
+
+    standard_deviations: np.ndarray = np.sqrt(m2 / n)
+    # Constant columns are left centered rather than divided by zero
+    standard_deviations[standard_deviations == 0] = 1.0
+    return means, standard_deviations
+
+
+def design_cache_key(data_hash: bytes, feature_names: Sequence[str], dtype: str) -> str:
+    """
+    Names the cached design matrix of a dataset and an expansion.
+
+    Args:
+        data_hash (bytes): Fingerprint of the dataset.
+        feature_names (Sequence[str]): Names of the expanded features.
+        dtype (str): Data type of the matrix.
+
+    Returns:
+        str: The hexadecimal key.
+    """
+    return hashlib.sha256(data_hash + '\n'.join(feature_names).encode('utf-8') + dtype.encode('ascii')).hexdigest()
+
+
+def evict_design_cache(cache_dir: str, max_bytes: int, keep: str) -> None:
+    """
+    Deletes the least recently used design matrices until the cache fits in max_bytes.
+
+    A matrix and its statistics are deleted together. The matrix being used is never
+    deleted, even when it is larger than max_bytes on its own.
+
+    Args:
+        cache_dir (str): Directory of the cached matrices.
+        max_bytes (int): Largest total size of the cache.
+        keep (str): Key of the matrix being used.
+    """
+    entries: List[Tuple[float, int, str]] = []
+    total: int = 0
+    for file_name in os.listdir(cache_dir):
+        key, extension = os.path.splitext(file_name)
+        if extension != '.npy' or '.' in key:
+            # Only the matrices themselves, not their statistics or temporary files
+            continue
+        matrix_path: str = os.path.join(cache_dir, file_name)
+        statistics_path: str = os.path.join(cache_dir, f"{key}.statistics.npy")
+        size: int = os.path.getsize(matrix_path) + \
+                    (os.path.getsize(statistics_path) if os.path.exists(statistics_path) else 0)
+        total += size
+        if key != keep:
+            # The modification time is refreshed on every cache hit
+            entries.append((os.path.getmtime(matrix_path), size, key))
+
+    # Oldest first
+    for _, size, key in sorted(entries):
+        if total <= max_bytes:
+            break
+        # The statistics go first: a matrix without them is never used
+        for path in (os.path.join(cache_dir, f"{key}.statistics.npy"), os.path.join(cache_dir, f"{key}.npy")):
+            if os.path.exists(path):
+                os.remove(path)
+        total -= size
+        print(f"Design matrix {key} has been evicted from the cache.")
+
+
+def build_design_matrix(data_x: np.ndarray, data_y: np.ndarray, feature_names: Sequence[str], dtype: str = 'float64', \
+                        cache_dir: str = DESIGN_CACHE_DIR, chunk_size: int = DEFAULT_CHUNK_SIZE, \
+                        max_cache_bytes: int = DESIGN_CACHE_MAX_BYTES) -> DesignMatrix:
+    """
+    Builds the standardized design matrix of an expansion once, and caches it on disk.
+
+    The matrix is keyed by the fingerprint of the data and the expansion, so training
+    again with the same data and expansion memory-maps the cached file instead of
+    expanding again. It is written chunk by chunk into a memory-mapped file: only one
+    chunk is held in memory at a time, and float32 halves the size of the file. Once a
+    matrix is written, the least recently used ones are evicted beyond max_cache_bytes.
+
+    Args:
+        data_x (np.ndarray): Kilometers.
+        data_y (np.ndarray): Target values, part of the fingerprint.
+        feature_names (Sequence[str]): Names created by make_feature_names.
+        dtype (str, optional): Data type of the stored matrix, one of DESIGN_DTYPES.
+        cache_dir (str, optional): Directory of the cached matrices.
+        chunk_size (int, optional): Number of rows expanded at once.
+        max_cache_bytes (int, optional): Largest total size of the cache directory's matrices.
+
+    Returns:
+        DesignMatrix: The standardized matrix and its statistics.
+
+    Raises:
+        ValueError: If the data type is not supported.
+    """
+    if dtype not in DESIGN_DTYPES:
+        raise ValueError(f"Unsupported data type '{dtype}'. Use one of: {', '.join(DESIGN_DTYPES)}.")
+    feature_names = tuple(feature_names)
+    parse_feature_names(feature_names)
+    data_hash: bytes = hash_dataset([(data_x, data_y)])
+    key: str = design_cache_key(data_hash, feature_names, dtype)
+    matrix_path: str = os.path.join(cache_dir, f"{key}.npy")
+    statistics_path: str = os.path.join(cache_dir, f"{key}.statistics.npy")
+
+    if os.path.exists(matrix_path) and os.path.exists(statistics_path):
+        means, standard_deviations = np.load(statistics_path)
+        # Marks the matrix as recently used
+        os.utime(matrix_path)
+        print(f"Design matrix loaded from the cache {matrix_path}.")
+        return DesignMatrix(np.load(matrix_path, mmap_mode='r'), means, standard_deviations, feature_names, data_hash)
+
+    means, standard_deviations = column_statistics(data_x, feature_names, chunk_size)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary_path: str = f"{matrix_path}.tmp.npy"
+    matrix = np.lib.format.open_memmap(temporary_path, mode='w+', dtype=dtype,
+                                       shape=(data_x.shape[0], len(feature_names)))
+    block: np.ndarray = np.empty((min(chunk_size, data_x.shape[0]), len(feature_names)), dtype=np.float64)
+    for start in range(0, data_x.shape[0], chunk_size):
+        chunk: np.ndarray = expand_features(data_x[start:start + chunk_size], feature_names,
+                                            block[:min(chunk_size, data_x.shape[0] - start)])
+        # Standardize in float64, then store in the matrix type
+        chunk -= means
+        chunk /= standard_deviations
+        matrix[start:start + chunk.shape[0]] = chunk
+    matrix.flush()
+    del matrix
+
+    # The statistics are written last: a matrix without them is never used
+    os.replace(temporary_path, matrix_path)
+    np.save(statistics_path, np.stack((means, standard_deviations)))
+    print(f"Design matrix has been cached to {matrix_path}.")
+    evict_design_cache(cache_dir, max_cache_bytes, key)
+    return DesignMatrix(np.load(matrix_path, mmap_mode='r'), means, standard_deviations, feature_names, data_hash)
+
+
+def gram_normal_equation(design: DesignMatrix, data_y: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Solves the least squares problem of a standardized design matrix in closed form.
+
+    X^T X and X^T y are accumulated in float64 chunk by chunk. The columns are centered,
+    so the intercept is the mean of y and decouples from the slopes.
+
+    Args:
+        design (DesignMatrix): Standardized design matrix.
+        data_y (np.ndarray): Target values.
+        chunk_size (int, optional): Number of rows multiplied at once.
+
+    Returns:
+        np.ndarray: The parameters [w_1, ..., w_k, b] on the standardized scale.
+    """
+    k: int = design.matrix.shape[1]
+    gram: np.ndarray = np.zeros((k, k))
+    moment: np.ndarray = np.zeros(k)
+    for start in range(0, design.matrix.shape[0], chunk_size):
+        block: np.ndarray = np.asarray(design.matrix[start:start + chunk_size], dtype=np.float64)
+        gram += block.T @ block
+        moment += data_y[start:start + chunk_size] @ block
+
+    params: np.ndarray = np.empty(k + 1)
+    # Least squares solve, robust to the near-collinear columns of high degrees
+    params[:-1] = np.linalg.lstsq(gram, moment, rcond=None)[0]
+    params[-1] = np.mean(data_y)
+    return params
+
+
+def lauch_expanded_gradient_descent(original_data_x: np.ndarray, original_data_y: np.ndarray, degree: int = 2, \
+                                    n_knots: int = 0, dtype: str = 'float64', solver: str = "normal_equation", \
+                                    optimizer: str = "gradient_descent", learning_rate: float = None, \
+                                    max_iterations: int = 5000, cache_dir: str = DESIGN_CACHE_DIR, \
+                                    max_cache_bytes: int = DESIGN_CACHE_MAX_BYTES, \
+                                    coefficients_path: str = '../prediction/coefficients.txt', \
+                                    model_path: str = MODEL_PATH) -> np.ndarray:
+    """
+    Trains a polynomial or spline model of the kilometers and saves it.
+
+    The design matrix is built once per dataset and expansion (see build_design_matrix),
+    then fitted by the multivariate engine. The model file keeps the expanded feature
+    names, which estimate_price uses to expand the kilometers the same way.
+
+    Args:
+        original_data_x (np.ndarray): Kilometers.
+        original_data_y (np.ndarray): Target values.
+        degree (int, optional): Degree of the polynomial and of the spline pieces (1 for piecewise-linear).
+        n_knots (int, optional): Number of knots, placed at quantiles of the kilometers. 0 for a polynomial.
+        dtype (str, optional): Data type of the cached design matrix, 'float32' halves its memory.
+        solver (str, optional): "normal_equation", or "gradient_descent", which needs many iterations
+                                on the nearly collinear columns of polynomials (the engine warns
+                                when it stops at max_iterations without converging).
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        max_iterations (int, optional): Maximum number of iterations of gradient descent.
+        cache_dir (str, optional): Directory of the cached design matrices.
+        max_cache_bytes (int, optional): Largest total size of the cached design matrices.
+        coefficients_path (str, optional): Path to the file where the coefficients are saved.
+        model_path (str, optional): Path to the model file.
+
+    Returns:
+        np.ndarray: The parameters [w_1, ..., w_k, b] on the original scale.
+
+    Raises:
+        ValueError: If the expansion or the solver is invalid.
+    """
+    if solver not in ("gradient_descent", "normal_equation"):
+        raise ValueError(f"Unknown solver '{solver}'. Use 'gradient_descent' or 'normal_equation'.")
+    knots: np.ndarray = quantile_knots(original_data_x, n_knots) if n_knots else ()
+    feature_names: List[str] = make_feature_names(degree, knots)
+    design: DesignMatrix = build_design_matrix(original_data_x, original_data_y, feature_names, dtype, cache_dir,
+                                               max_cache_bytes=max_cache_bytes)
+
+    objective = LinearObjective(design.matrix, original_data_y)
+    if solver == "normal_equation":
+        params: np.ndarray = gram_normal_equation(design, original_data_y)
+        print(f"Features {', '.join(feature_names)} fitted by the normal equation.")
+    else:
+        result = minimize(objective, np.zeros(len(feature_names) + 1), learning_rate,
+                          max_iterations=max_iterations, optimizer=optimizer)
+        params = result.params
+        if not result.converged:
+            # minimize has reported where it stopped
+            print("The normal_equation solver fits expanded models exactly.")
+    cost: float = objective.value(params)
+    params = destandardize_coefficients(params, design.means, design.standard_deviations)
+
+    for name, w_final in zip(feature_names, params[:-1]):
+        print(f"w_final[{name}] = {w_final}")
+    print(f"b_final = {params[-1]}")
+
+    save_coefficient_vector_to_file(params, feature_names, coefficients_path)
+    save_multivariate_model(params, feature_names, design.means, design.standard_deviations, cost,
+                            original_data_x.shape[0], design.data_hash, model_path)
+    return params
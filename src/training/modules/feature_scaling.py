@@ -2,7 +2,8 @@ import numpy as np
 from typing import Union
 from typing import Tuple
 
-def standardization(data: np.ndarray) -> np.ndarray:
+def standardization(data: np.ndarray, mean_data: float = None, standard_deviation_data: float = None, \
+                    dtype: np.dtype = None, chunk_size: int = 1 << 20) -> np.ndarray:
     """
     Applies Z-score standardization to the input data.
 
@@ -10,17 +11,31 @@ def standardization(data: np.ndarray) -> np.ndarray:
 
     Args:
         data (np.ndarray): The input data to be standardized.
+        mean_data (float, optional): Precomputed mean of the data, e.g. from a streaming pass.
+        standard_deviation_data (float, optional): Precomputed standard deviation of the data.
+        dtype (np.dtype, optional): dtype of the standardized data, e.g. np.float32. The statistics are
+                                    still computed in float64, and the data is standardized chunk by chunk
+                                    without a float64 temporary of the whole array. Default keeps float64.
+        chunk_size (int, optional): Number of values standardized at once when a dtype is given.
 
     Returns:
         np.ndarray: The standardized data.
     """
-
-    mean_data: float = np.mean(data)
-    standard_deviation_data: float = np.std(data)
-    standardized_data: np.ndarray = (data - mean_data) / standard_deviation_data
+    if mean_data is None:
+        mean_data = np.mean(data, dtype=np.float64)
+    if standard_deviation_data is None:
+        standard_deviation_data = np.std(data, dtype=np.float64)
+    if dtype is None:
+        standardized_data: np.ndarray = (data - mean_data) / standard_deviation_data
+        return standardized_data
+
+    standardized_data = np.empty(data.shape[0], dtype=dtype)
+    for start in range(0, data.shape[0], chunk_size):
+        standardized_data[start:start + chunk_size] = (data[start:start + chunk_size] - mean_data) / standard_deviation_data
     return standardized_data
 
-def denormalize_coefficients(data: np.ndarray, w_normalized: float, b_normalized: float) -> Tuple[float, float]:
+def denormalize_coefficients(data: np.ndarray, w_normalized: float, b_normalized: float, \
+                             mean_data: float = None, standard_deviation_data: float = None) -> Tuple[float, float]:
     """
     Denormalizes the coefficients after applying Z-score standardization.
 
@@ -31,12 +46,17 @@ def denormalize_coefficients(data: np.ndarray, w_normalized: float, b_normalized
         data (np.ndarray): The original feature data used for standardization.
         w_normalized (float): The slope coefficient obtained after fitting the model on standardized data.
         b_normalized (float): The intercept obtained after fitting the model on standardized data.
+        mean_data (float, optional): Precomputed mean of the data. `data` may be None when both
+                                     statistics are given.
+        standard_deviation_data (float, optional): Precomputed standard deviation of the data.
 
     Returns:
         Tuple[float, float]: A tuple containing the denormalized slope and intercept (w_original, b_original).
     """
-    mean_data: float = np.mean(data)
-    standard_deviation_data: float = np.std(data)
+    if mean_data is None:
+        mean_data = np.mean(data)
+    if standard_deviation_data is None:
+        standard_deviation_data = np.std(data)
 
     w_original: float = w_normalized / standard_deviation_data
     b_original: float = b_normalized - (w_normalized * mean_data / standard_deviation_data)
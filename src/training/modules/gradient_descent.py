@@ -1,15 +1,32 @@
 import numpy as np
 import math
-from typing import Union, Tuple
+from typing import NamedTuple, Tuple
 
 # For plotting
 from .plotting import plot_with_regression_line
 # Feature scaling
 from modules.feature_scaling import standardization, denormalize_coefficients
 # Cost function
-from .cost_function import compute_cost_ft
+from .cost_function import regularization_penalty
+# Closed-form solver
+from .sufficient_statistics import normal_equation, RunningStatistics
+# Versioned model file
+from .model_store import save_linear_model, hash_dataset, MODEL_PATH
+# Optimizers
+from .optimizers import make_optimizer, scheduled_learning_rate, warn_diverged, warn_not_converged
+# Robust losses
+from .robust import RobustObjective, irls
+# Float32 mode
+from .precision import check_precision, dot_float64, sum_float64, to_precision, resolution_tolerance, \
+                       reference_coefficients, relative_difference, PRECISION_TOLERANCE
+# Multithreaded reductions
+from .parallel_reduction import ParallelReducer
+# Instrumentation
+from .telemetry import Telemetry, NO_TELEMETRY
 # Import plot of cost function
 from .plotting import plot_cost_function_scatter
+# Background rendering of the plots
+from .plot_worker import submit_plot
 
 
 # Derivatives (partial derivatives) are numbers (scalars) that indicate the slope of the cost function at a specific point.
@@ -17,35 +34,50 @@ from .plotting import plot_cost_function_scatter
 # If the derivative is negative, the cost function is decreasing, which means we need to increase the parameter value.
 # If the derivative is close to zero, it means we are close to a minimum point.
 
-def partial_derivative_cost_function_of_w(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float) -> float:
+def partial_derivative_cost_function_of_w(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float, \
+                                          alpha: float = 0.0, l1_ratio: float = 0.0, \
+                                          reducer: ParallelReducer = None) -> float:
     """
     Computes the partial derivative of the cost function with respect to the slope (w).
 
+    Only the smooth part of the regularization (L2) is derived, the L1 penalty is
+    handled by the proximal step of the optimization loop.
+
     Args:
         data_x (np.ndarray): Feature data
         data_y (np.ndarray): Target values
         w (float): Current value of the slope (w).
         b (float): Current value of the y-intercept (b).
+        alpha (float, optional): Strength of the regularization of w, none by default.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty in the regularization.
+        reducer (ParallelReducer, optional): Computes the sum chunk by chunk across threads.
 
     Returns:
         float: The partial derivative of the cost function with respect to w.
     """
     # Number of training examples
     m: int = data_x.shape[0]
-    
-    # Compute the linear function hypothesis: f_wb = w * data_x + b
-    f_wb: np.ndarray = w * data_x + b
-    
-    # Compute the deviation from the real value scaled by x
-    deviation: np.ndarray = (f_wb - data_y) * data_x
-    
-    # Compute the derivative of w
-    derivative_of_w: float = (1 / m) * np.sum(deviation)
+
+    if reducer is not None:
+        derivative_of_w: float = reducer.residual_sums(data_x, data_y, w, b)[0] / m
+    else:
+        # Compute the linear function hypothesis: f_wb = w * data_x + b
+        f_wb: np.ndarray = w * data_x + b
+
+        # Compute the deviation from the real value scaled by x
+        deviation: np.ndarray = (f_wb - data_y) * data_x
+
+        # Compute the derivative of w, accumulated in float64 even on float32 data
+        derivative_of_w = (1 / m) * np.sum(deviation, dtype=np.float64)
+
+    # Add the derivative of the L2 penalty
+    derivative_of_w += alpha * (1 - l1_ratio) * w
 
     return derivative_of_w
 
 
-def partial_derivative_cost_function_of_b(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float) -> float:
+def partial_derivative_cost_function_of_b(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float, \
+                                          reducer: ParallelReducer = None) -> float:
     """
     Computes the partial derivative of the cost function with respect to the intercept (b).
 
@@ -54,12 +86,16 @@ def partial_derivative_cost_function_of_b(data_x: np.ndarray, data_y: np.ndarray
         data_y (np.ndarray): Target values.
         w (float): Current value of the slope (w).
         b (float): Current value of the y-intercept (b).
+        reducer (ParallelReducer, optional): Computes the sum chunk by chunk across threads.
 
     Returns:
         float: The partial derivative of the cost function with respect to b.
     """
     # Number of training examples
     m: int = data_x.shape[0]
+
+    if reducer is not None:
+        return reducer.residual_sums(data_x, data_y, w, b)[1] / m
     
     # Compute the linear function hypothesis: f_wb = w * data_x + b
     f_wb: np.ndarray = w * data_x + b
@@ -67,14 +103,343 @@ def partial_derivative_cost_function_of_b(data_x: np.ndarray, data_y: np.ndarray
     # Compute the deviation from the real value
     deviation: np.ndarray = f_wb - data_y
     
-    # Compute the derivative of b
-    derivative_of_b: float = (1 / m) * np.sum(deviation)
+    # Compute the derivative of b, accumulated in float64 even on float32 data
+    derivative_of_b: float = (1 / m) * np.sum(deviation, dtype=np.float64)
     
     return derivative_of_b
 
+def compute_gradients_and_cost(data_x: np.ndarray, data_y: np.ndarray, w: float, b: float, residual: np.ndarray, \
+                               alpha: float = 0.0, l1_ratio: float = 0.0, \
+                               reducer: ParallelReducer = None) -> Tuple[float, float, float]:
+    """
+    Computes both partial derivatives and the cost from a single residual pass.
+
+    The residual f_wb - data_y is written into a preallocated buffer, so no
+    temporary array is created, and the three reductions are derived from it.
+    With a float32 buffer (float32 mode) the reductions still accumulate in float64.
+    The cost includes the whole elastic-net penalty of w, the derivative only its
+    smooth L2 part (see partial_derivative_cost_function_of_w).
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        w (float): Current value of the slope (w).
+        b (float): Current value of the y-intercept (b).
+        residual (np.ndarray): Float buffer with the shape of data_x, overwritten with the residual.
+        alpha (float, optional): Strength of the regularization of w, none by default.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty in the regularization.
+        reducer (ParallelReducer, optional): Computes the residual and its reductions chunk by chunk
+                                             across threads, with a deterministic combine order.
+
+    Returns:
+        Tuple[float, float, float]: The partial derivatives with respect to w and b, and the cost.
+    """
+    # Number of training examples
+    m: int = data_x.shape[0]
+
+    if reducer is not None:
+        # Residual and reductions of each chunk while it is in cache, across threads
+        sum_rx, sum_r, sum_rr = reducer.residual_sums(data_x, data_y, w, b, residual)
+        derivative_of_w: float = sum_rx / m
+        derivative_of_b: float = sum_r / m
+        total_cost: float = sum_rr / (2 * m)
+    else:
+        # Compute the residual in place: residual = w * data_x + b - data_y
+        np.multiply(data_x, w, out=residual)
+        np.add(residual, b, out=residual)
+        np.subtract(residual, data_y, out=residual)
+
+        # Reductions over the residual (dot products do not allocate temporaries)
+        if residual.dtype == np.float32:
+            derivative_of_w = dot_float64(residual, data_x) / m
+            derivative_of_b = sum_float64(residual) / m
+            total_cost = dot_float64(residual, residual) / (2 * m)
+        else:
+            derivative_of_w = np.dot(residual, data_x) / m
+            derivative_of_b = np.sum(residual) / m
+            total_cost = np.dot(residual, residual) / (2 * m)
+
+    if alpha:
+        # Regularization of the slope only
+        derivative_of_w += alpha * (1 - l1_ratio) * w
+        total_cost += regularization_penalty(w, alpha, l1_ratio)
+
+    return derivative_of_w, derivative_of_b, total_cost
+
+class SquaredErrorObjective:
+    """
+    Squared error cost of a linear regression, as a function of the parameters [w, b],
+    optionally with an elastic-net penalty of w.
+
+    Holds the data and a residual buffer so that optimizers can evaluate the cost,
+    its gradient and its curvature without allocating arrays. On float32 data the
+    residual is a float32 buffer too, and the reductions accumulate in float64. With a
+    reducer, the residual and its reductions are computed across threads.
+
+    Attributes:
+        l1_penalty (float): Weight of the L1 penalty, the non-smooth part of the cost. When
+                            it is not zero, minimize takes proximal steps (see gradient_mapping).
+    """
+
+    def __init__(self, data_x: np.ndarray, data_y: np.ndarray, alpha: float = 0.0, l1_ratio: float = 0.0, \
+                 reducer: ParallelReducer = None) -> None:
+        if alpha < 0 or not 0 <= l1_ratio <= 1:
+            raise ValueError("The regularization needs alpha >= 0 and l1_ratio in [0, 1].")
+        self.data_x: np.ndarray = data_x
+        self.data_y: np.ndarray = data_y
+        self.alpha: float = alpha
+        self.l1_ratio: float = l1_ratio
+        self.reducer: ParallelReducer = reducer
+        self.l1_penalty: float = alpha * l1_ratio
+        # Residual buffer reused by every evaluation
+        residual_dtype = np.float32 if data_x.dtype == np.float32 and data_y.dtype == np.float32 else np.float64
+        self.residual: np.ndarray = np.empty(data_x.shape[0], dtype=residual_dtype)
+
+    def value_and_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Computes the cost and the gradient [dJ/dw, dJ/db] of its smooth part at params = [w, b].
+        """
+        dj_dw, dj_db, cost = compute_gradients_and_cost(self.data_x, self.data_y, params[0], params[1], self.residual,
+                                                        self.alpha, self.l1_ratio, self.reducer)
+        return cost, np.array([dj_dw, dj_db])
+
+    def value(self, params: np.ndarray) -> float:
+        """
+        Computes the cost at params = [w, b].
+        """
+        return self.value_and_gradient(params)[0]
+
+    def curvature(self, direction: np.ndarray) -> float:
+        """
+        Computes direction^T H direction, with H the (constant) Hessian of the smooth part
+        of the cost: the mean of (d_w * x + d_b) ** 2, plus the L2 penalty of d_w.
+        """
+        if self.reducer is not None:
+            sum_of_squares: float = self.reducer.residual_sums(self.data_x, None, direction[0], direction[1],
+                                                               self.residual)[2]
+        else:
+            np.multiply(self.data_x, direction[0], out=self.residual)
+            np.add(self.residual, direction[1], out=self.residual)
+            sum_of_squares = dot_float64(self.residual, self.residual)
+        return sum_of_squares / self.data_x.shape[0] + self.alpha * (1 - self.l1_ratio) * direction[0] * direction[0]
+
+    def gradient_mapping(self, params: np.ndarray, gradient: np.ndarray, step_size: float) -> np.ndarray:
+        """
+        Turns the gradient of the smooth part into the gradient mapping of the whole cost.
+
+        The proximal step of the L1 penalty soft-thresholds w after the gradient step:
+            next = prox(params - step_size * gradient)
+        and the gradient mapping is (params - next) / step_size, so that a plain gradient
+        step along it is exactly the proximal step (ISTA). Its norm is zero at the minimum,
+        which keeps the convergence test on the gradient norm valid.
+
+        Args:
+            params (np.ndarray): Current parameters [w, b].
+            gradient (np.ndarray): Gradient of the smooth part of the cost at params.
+            step_size (float): Step size of the optimizer.
+
+        Returns:
+            np.ndarray: The gradient mapping.
+        """
+        w: float = params[0] - step_size * gradient[0]
+        # Soft-thresholding of w, b is not penalized
+        w = math.copysign(max(abs(w) - step_size * self.l1_penalty, 0.0), w)
+        return np.array([(params[0] - w) / step_size, gradient[1]])
+
+
+class OptimizationResult(NamedTuple):
+    """
+    Outcome of an optimizer run on an objective.
+
+    Attributes:
+        params (np.ndarray): Optimized parameters.
+        iterations (int): Number of iterations run.
+        cost (float): Cost at the optimized parameters.
+        converged (bool): Whether a convergence test was met before max_iterations.
+        costs (list): Costs sampled every 100 iterations, for the plot.
+        cost_iterations (list): Iterations at which the costs were sampled.
+    """
+    params: np.ndarray
+    iterations: int
+    cost: float
+    converged: bool
+    costs: list
+    cost_iterations: list
+
+
+class GradientDescentResult(NamedTuple):
+    """
+    Outcome of a gradient descent run.
+
+    Attributes:
+        w (float): Optimized slope.
+        b (float): Optimized intercept.
+        iterations (int): Number of iterations run.
+        cost (float): Cost at the optimized parameters.
+        converged (bool): Whether a convergence test was met before max_iterations.
+        costs (list): Costs sampled every 100 iterations, for the plot.
+        cost_iterations (list): Iterations at which the costs were sampled.
+    """
+    w: float
+    b: float
+    iterations: int
+    cost: float
+    converged: bool
+    costs: list
+    cost_iterations: list
+
+
+def minimize(objective, initial_params: np.ndarray, learning_rate: float = None, tolerance: float = 1e-6, \
+             max_iterations: int = 5000, optimizer: str = "gradient_descent", cost_tolerance: float = 1e-15, \
+             target_cost: float = None, telemetry: Telemetry = None) -> OptimizationResult:
+    """
+    Runs an optimizer on an objective until convergence.
+
+    Convergence is reached when the norm of the gradient falls below `tolerance` or
+    when the relative change of the cost between two iterations falls below `cost_tolerance`.
+    The run also stops early once the cost reaches `target_cost`, when given. A run whose
+    cost or gradient overflows (e.g. a learning rate too large) stops as diverged, not converged,
+    and a run that reaches max_iterations is reported (see optimizers.warn_not_converged).
+
+    Args:
+        objective: Objective with value_and_gradient(params), value(params) and curvature(direction).
+                   Objectives with a non-zero `l1_penalty` also provide gradient_mapping(params, gradient, step_size).
+        initial_params (np.ndarray): Initial parameters.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient.
+        max_iterations (int, optional): Maximum number of iterations to run.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        cost_tolerance (float, optional): Convergence tolerance on the relative change of the cost.
+        target_cost (float, optional): Cost at which the run is good enough and stops.
+        telemetry (Telemetry, optional): Records the cost and gradient norm of every iteration.
+
+    Returns:
+        OptimizationResult: The optimized parameters and the history of the run.
+
+    Raises:
+        ValueError: If the optimizer cannot take the proximal steps of an L1 penalty.
+    """
+    if telemetry is None:
+        telemetry = NO_TELEMETRY
+    stepper = make_optimizer(optimizer, learning_rate)
+    params: np.ndarray = np.array(initial_params, dtype=np.float64)
+    # Objectives with an L1 penalty take proximal steps
+    l1_penalty: float = getattr(objective, 'l1_penalty', 0.0)
+    if l1_penalty and not stepper.supports_l1_penalty:
+        raise ValueError(f"The {optimizer} optimizer does not take proximal steps, "
+                         "use another optimizer with an L1 penalty.")
+
+    # For plot function
+    costs = []
+    iterations = []
+
+    previous_cost: float = None
+    gradient_norm: float = np.nan
+    converged: bool = False
+    i: int = 0
+    for i in range(max_iterations):
+        # Compute the cost and the gradient of the current parameters in one pass
+        cost, gradient = objective.value_and_gradient(params)
+        if l1_penalty:
+            # Non-smooth L1 penalty: step along the gradient mapping of the proximal step
+            gradient = objective.gradient_mapping(params, gradient, stepper.learning_rate)
+
+        # Keep the cost for the plot
+        if i % 100 == 0:
+            costs.append(cost)
+            iterations.append(i)
+
+        gradient_norm: float = np.sqrt(np.dot(gradient, gradient))
+        telemetry.record(i, cost, gradient_norm)
+
+        # Check for divergence: an infinite cost would pass the relative test below
+        if not (np.isfinite(cost) and np.isfinite(gradient_norm)):
+            warn_diverged(i, cost)
+            break
+
+        # Check for convergence: flat gradient or cost no longer changing (both costs are finite)
+        if gradient_norm < tolerance or \
+           (previous_cost is not None and abs(previous_cost - cost) <= cost_tolerance * cost) or \
+           (target_cost is not None and cost <= target_cost):
+            converged = True
+            print(f"Converged after {i} iterations.")
+            break
+
+        # Update parameters
+        params = stepper.step(params, gradient, objective, cost)
+        previous_cost = cost
+    else:
+        cost = objective.value(params)
+        i = max_iterations
+        warn_not_converged(i, detail=f"cost {cost:g}, gradient norm {gradient_norm:.3g}, tolerance {tolerance:g}")
+
+    telemetry.count('iterations', i)
+    return OptimizationResult(params, i, cost, converged, costs, iterations)
+
+def run_gradient_descent(data_x: np.ndarray, data_y: np.ndarray, initial_w: float, initial_b: float, \
+                         learning_rate: float = None, tolerance: float = 1e-6, max_iterations: int = 5000, \
+                         optimizer: str = "gradient_descent", cost_tolerance: float = 1e-15, \
+                         target_cost: float = None, telemetry: Telemetry = None, loss: str = "squared", \
+                         delta: float = None, quantile: float = 0.5, alpha: float = 0.0, \
+                         l1_ratio: float = 0.0, threads: int = 1) -> GradientDescentResult:
+    """
+    Runs an optimizer on the cost of a single feature until convergence.
+
+    The cost is the mean squared error, or a robust loss of robust.LOSSES. The gradients
+    of the absolute and quantile losses are bounded by 1 whatever the scale of the
+    target values, so they need a large learning rate or an adaptive optimizer such as Adam.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        initial_w (float): Initial value for the slope (w).
+        initial_b (float): Initial value for the intercept (b).
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient.
+        max_iterations (int, optional): Maximum number of iterations to run.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        cost_tolerance (float, optional): Convergence tolerance on the relative change of the cost.
+        target_cost (float, optional): Cost at which the run is good enough and stops.
+        telemetry (Telemetry, optional): Records the cost and gradient norm of every iteration.
+        loss (str, optional): "squared" or one of robust.LOSSES.
+        delta (float, optional): Threshold of the Huber loss. Default is robust.default_huber_delta.
+        quantile (float, optional): Quantile of the quantile loss.
+        alpha (float, optional): Strength of the elastic-net regularization of w, squared loss only.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty, 0 for ridge and 1 for lasso.
+        threads (int, optional): Threads of the chunked reductions of the squared loss (see
+                                 parallel_reduction), None for every CPU. Default 1 keeps numpy's
+                                 single-threaded reductions.
+
+    Returns:
+        GradientDescentResult: The optimized parameters and the history of the run.
+
+    Raises:
+        ValueError: If a robust loss is regularized or reduced across threads.
+    """
+    if loss != "squared" and alpha:
+        raise ValueError("Regularization is only available with the squared loss.")
+    if loss != "squared" and threads != 1:
+        raise ValueError("Multithreaded reductions are only available with the squared loss.")
+
+    reducer: ParallelReducer = ParallelReducer(threads) if threads != 1 else None
+    try:
+        if loss == "squared":
+            objective = SquaredErrorObjective(data_x, data_y, alpha, l1_ratio, reducer)
+        else:
+            objective = RobustObjective(data_x, data_y, loss, delta, quantile)
+        result = minimize(objective, [initial_w, initial_b], learning_rate, tolerance, max_iterations, optimizer, \
+                          cost_tolerance, target_cost, telemetry)
+    finally:
+        if reducer is not None:
+            reducer.close()
+    return GradientDescentResult(result.params[0], result.params[1], *result[1:])
+
 def gradient_descent(data_x: np.ndarray, \
                     data_y: np.ndarray,  \
-                    initial_w: float, initial_b: float, learning_rate: float, tolerance: float = 1e-8, max_iterations: int = 5000):
+                    initial_w: float, initial_b: float, learning_rate: float = None, tolerance: float = 1e-6, max_iterations: int = 5000, \
+                    plot_costs: bool = True, optimizer: str = "gradient_descent", telemetry: Telemetry = None, \
+                    background_plots: bool = True, loss: str = "squared", delta: float = None, quantile: float = 0.5, \
+                    alpha: float = 0.0, l1_ratio: float = 0.0, threads: int = 1):
     """
     Performs gradient descent to optimize w and b for a linear regression model.
     
@@ -83,48 +448,130 @@ def gradient_descent(data_x: np.ndarray, \
         data_y (np.ndarray): Target values.
         initial_w (float): Initial value for the slope (w).
         initial_b (float): Initial value for the intercept (b).
-        learning_rate (float): Learning rate for gradient descent.
-        tolerance (float): Convergence tolerance.
+        learning_rate (float): Learning rate for gradient descent. Default depends on the optimizer.
+        tolerance (float): Convergence tolerance on the norm of the gradient.
         max_iterations (int): Maximum number of iterations to run.
+        plot_costs (bool): Whether to save the scatter plot of the sampled costs.
+        optimizer (str): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        telemetry (Telemetry, optional): Times the optimization and the plot, and records every iteration.
+        background_plots (bool): Whether the plot is rendered by the background worker, without waiting for it.
+        loss (str): "squared" or one of robust.LOSSES.
+        delta (float): Threshold of the Huber loss. Default is robust.default_huber_delta.
+        quantile (float): Quantile of the quantile loss.
+        alpha (float): Strength of the elastic-net regularization of w.
+        l1_ratio (float): Share of the L1 (lasso) penalty, 0 for ridge and 1 for lasso.
+        threads (int): Threads of the reductions of the squared loss, 1 for numpy's own.
 
     Returns:
         Tuple[float, float]: The optimized values for w and b.
     """
-    w = initial_w
-    b = initial_b
+    if telemetry is None:
+        telemetry = NO_TELEMETRY
 
-    # For plot function
-    costs = []
-    iterations = []
-    
-    for i in range(max_iterations):
-        # Compute gradients
-        dj_dw = partial_derivative_cost_function_of_w(data_x, data_y, w, b)
-        dj_db = partial_derivative_cost_function_of_b(data_x, data_y, w, b)
+    with telemetry.phase('optimization'):
+        result = run_gradient_descent(data_x, data_y, initial_w, initial_b, learning_rate, tolerance, max_iterations, optimizer, \
+                                      telemetry=telemetry, loss=loss, delta=delta, quantile=quantile, \
+                                      alpha=alpha, l1_ratio=l1_ratio, threads=threads)
 
+    if plot_costs:
+        with telemetry.phase('plot_costs'):
+            submit_plot(plot_cost_function_scatter, result.cost_iterations, result.costs, background=background_plots)
 
-        # Update parameters
-        new_w = w - learning_rate * dj_dw
-        new_b = b - learning_rate * dj_db
+    return result.w, result.b
 
-        # Compute and print the cost
-        if i % 100 == 0:
-            cost = compute_cost_ft(data_x, data_y, new_w, new_b)
-            costs.append(cost)
-            iterations.append(i)
+def stochastic_gradient_descent(data_x: np.ndarray, data_y: np.ndarray, initial_w: float, initial_b: float, \
+                                learning_rate: float = 0.1, batch_size: int = 32, max_epochs: int = 100, \
+                                schedule: str = "inverse_time", decay: float = 0.01, tolerance: float = 1e-6, \
+                                target_cost: float = None, seed: int = 0, telemetry: Telemetry = None) -> GradientDescentResult:
+    """
+    Performs stochastic (batch_size=1) or mini-batch gradient descent.
 
-        # Check for convergence (if the change is smaller than the tolerance)
-        if abs(new_w - w) < tolerance and abs(new_b - b) < tolerance:
-            print(f"Converged after {i} iterations.")
-            break
+    Every epoch visits the rows in a new random order given by a permutation of the
+    indices. The data itself is never shuffled or copied: each mini-batch is gathered
+    through its indices into buffers allocated once.
 
-        # Update w and b for the next iteration
-        w = new_w
-        b = new_b
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        initial_w (float): Initial value for the slope (w).
+        initial_b (float): Initial value for the intercept (b).
+        learning_rate (float, optional): Learning rate of the first epoch.
+        batch_size (int, optional): Number of rows per update.
+        max_epochs (int, optional): Maximum number of passes over the data.
+        schedule (str, optional): Learning rate decay, one of optimizers.LEARNING_RATE_SCHEDULES.
+        decay (float, optional): Decay rate of the schedule.
+        tolerance (float, optional): Convergence tolerance on the parameter change of an epoch.
+        target_cost (float, optional): Mean cost of an epoch at which the run stops.
+        seed (int, optional): Seed of the shuffling, for reproducible runs.
+        telemetry (Telemetry, optional): Records the mean cost of every epoch and counts the updates.
 
-    plot_cost_function_scatter(iterations, costs)
+    Returns:
+        GradientDescentResult: The optimized parameters; iterations counts epochs and the
+        costs are the mean mini-batch cost of each epoch.
+    """
+    if telemetry is None:
+        telemetry = NO_TELEMETRY
+    m: int = data_x.shape[0]
+    rng = np.random.default_rng(seed)
+    w = initial_w
+    b = initial_b
 
-    return w, b
+    # Mini-batch buffers, filled through the permutation indices
+    batch_x: np.ndarray = np.empty(batch_size, dtype=data_x.dtype)
+    batch_y: np.ndarray = np.empty(batch_size, dtype=data_y.dtype)
+    residual: np.ndarray = np.empty(batch_size, dtype=np.float64)
+
+    costs = []
+    epochs = []
+    converged: bool = False
+    cost: float = None
+    epoch_w = w
+    epoch_b = b
+    epoch: int = 0
+    for epoch in range(max_epochs):
+        epoch_learning_rate: float = scheduled_learning_rate(schedule, learning_rate, epoch, decay)
+        permutation: np.ndarray = rng.permutation(m)
+        epoch_w = w
+        epoch_b = b
+        sum_cost: float = 0.0
+
+        for start in range(0, m, batch_size):
+            indices: np.ndarray = permutation[start:start + batch_size]
+            k: int = indices.shape[0]
+            np.take(data_x, indices, out=batch_x[:k])
+            np.take(data_y, indices, out=batch_y[:k])
+            dj_dw, dj_db, batch_cost = compute_gradients_and_cost(batch_x[:k], batch_y[:k], w, b, residual[:k])
+            w -= epoch_learning_rate * dj_dw
+            b -= epoch_learning_rate * dj_db
+            sum_cost += batch_cost * k
+
+        cost = sum_cost / m
+        costs.append(cost)
+        epochs.append(epoch)
+        # The gradient of the whole data is never computed, its norm is not recorded
+        telemetry.record(epoch, cost, np.nan)
+
+        # Check for divergence: the parameters no longer change once they are infinite
+        if not np.isfinite(cost):
+            warn_diverged(epoch, cost, "epochs")
+            break
+
+        # Check for convergence over the whole epoch
+        if (abs(w - epoch_w) < tolerance and abs(b - epoch_b) < tolerance) or \
+           (target_cost is not None and cost <= target_cost):
+            converged = True
+            print(f"Converged after {epoch} epochs.")
+            break
+    else:
+        epoch = max_epochs
+        warn_not_converged(epoch, "epochs", f"last epoch moved w by {abs(w - epoch_w):.3g} and b by "
+                                            f"{abs(b - epoch_b):.3g}, tolerance {tolerance:g}")
+
+    # Epochs run: the converged epoch was run too
+    epochs_run: int = epoch + 1 if converged else epoch
+    telemetry.count('epochs', epochs_run)
+    telemetry.count('updates', epochs_run * -(-m // batch_size))
+    return GradientDescentResult(w, b, epoch, cost, converged, costs, epochs)
 
 def save_coefficients_to_file(w_final: float, b_final: float, file_path: str) -> None:
     """
@@ -146,41 +593,183 @@ def save_coefficients_to_file(w_final: float, b_final: float, file_path: str) ->
     except IOError as e:
         print(f"An error occurred while trying to write to the file: {e}")
 
-def lauch_gradient_descent(original_data_x: np.ndarray, original_data_y: np.ndarray, initial_w: float = 0, initial_b: float = 0) -> None:
+def save_trained_model(data_x: np.ndarray, data_y: np.ndarray, w_final: float, b_final: float, \
+                       model_path: str = MODEL_PATH) -> None:
+    """
+    Saves a single-feature model with the statistics, cost and fingerprint of its training data.
+
+    Args:
+        data_x (np.ndarray): Feature data the model was trained on.
+        data_y (np.ndarray): Target values the model was trained on.
+        w_final (float): Slope of the regression line.
+        b_final (float): Intercept of the regression line.
+        model_path (str, optional): Path to the model file.
+
+    Returns:
+        None
+    """
+    statistics = RunningStatistics.from_arrays(data_x, data_y)
+    save_linear_model(w_final, b_final, statistics, hash_dataset([(data_x, data_y)]), model_path)
+
+def lauch_gradient_descent(original_data_x: np.ndarray, original_data_y: np.ndarray, initial_w: float = 0, initial_b: float = 0, \
+                           solver: str = "gradient_descent", optimizer: str = "gradient_descent", learning_rate: float = None, \
+                           batch_size: int = 32, schedule: str = "inverse_time", telemetry: Telemetry = None, \
+                           plots: bool = True, background_plots: bool = True, \
+                           coefficients_path: str = '../prediction/coefficients.txt', model_path: str = MODEL_PATH, \
+                           loss: str = "squared", delta: float = None, quantile: float = 0.5, \
+                           alpha: float = 0.0, l1_ratio: float = 0.0, precision: str = "float64", \
+                           threads: int = 1) -> None:
     """
     Launches the gradient descent process for linear regression, including standardization 
     and denormalization steps to determine the optimal coefficients.
 
-    Save the coefficients into a file.
+    Save the coefficients into a file, and the model with its training metadata into a model file.
 
     Args:
         original_data_x (np.ndarray): The original feature data
         original_data_y (np.ndarray): The target values
         initial_w (float, optional): The initial value for the slope (w).
         initial_b (float, optional): The initial value for the intercept (b).
+        solver (str, optional): "gradient_descent" to iterate, "stochastic" for mini-batch updates,
+                                "normal_equation" to fit in closed form with a single pass over the data,
+                                or "irls" to fit a robust loss by iteratively reweighted least squares.
+        optimizer (str, optional): Optimizer of the gradient descent, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size of the optimizer. Default depends on the optimizer.
+        batch_size (int, optional): Rows per update of the stochastic solver (1 for plain SGD).
+        schedule (str, optional): Learning rate decay of the stochastic solver.
+        telemetry (Telemetry, optional): Times every phase of the training and records every iteration.
+        plots (bool, optional): Whether to plot the costs and the regression line.
+        background_plots (bool, optional): Whether the plots are rendered by the background worker, so that
+                                           training returns without waiting for matplotlib.
+        coefficients_path (str, optional): Path to the file where the coefficients are saved.
+        model_path (str, optional): Path to the model file.
+        loss (str, optional): "squared" for least squares, or a robust loss of robust.LOSSES
+                              ("huber", "absolute" or "quantile") that limits the pull of outliers.
+        delta (float, optional): Threshold of the Huber loss. Default is robust.default_huber_delta.
+        quantile (float, optional): Quantile of the quantile loss, e.g. 0.9 for the 90th percentile of prices.
+        alpha (float, optional): Strength of the elastic-net regularization of the standardized slope,
+                                 gradient descent only.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty, 0 for ridge and 1 for lasso.
+        precision (str, optional): "float64", or "float32" to store and iterate on float32 data with
+                                   float64 reductions (gradient descent of the squared loss only). The
+                                   float32 coefficients are checked against the float64 closed-form
+                                   solution, and refined in float64 if they differ by more than
+                                   precision.PRECISION_TOLERANCE.
+        threads (int, optional): Threads of the chunked reductions of every iteration (gradient descent
+                                 of the squared loss only), None for every CPU. The result does not
+                                 depend on the number of threads. Default 1 keeps numpy's reductions.
 
     Returns:
         None 
+
+    Raises:
+        ValueError: If the solver is unknown or cannot minimize the loss.
     """
+    if telemetry is None:
+        telemetry = NO_TELEMETRY
+
+    if loss != "squared" and solver in ("stochastic", "normal_equation"):
+        raise ValueError(f"The {solver} solver only fits the squared loss, use 'gradient_descent' or 'irls'.")
+    if alpha and solver != "gradient_descent":
+        raise ValueError("Regularized models are fitted by the 'gradient_descent' solver only.")
+    dtype = check_precision(precision)
+    if precision != "float64" and (solver != "gradient_descent" or loss != "squared"):
+        raise ValueError(f"The {precision} precision is only available with the 'gradient_descent' solver "
+                         "and the squared loss.")
+    if threads != 1 and (solver != "gradient_descent" or loss != "squared"):
+        raise ValueError("Multithreaded reductions are only available with the 'gradient_descent' solver "
+                         "and the squared loss.")
+
+    if solver in ("normal_equation", "irls"):
+        # Closed-form fits on the original scale, no standardization needed
+        with telemetry.phase('optimization'):
+            if solver == "irls":
+                w_final, b_final, passes = irls(original_data_x, original_data_y, loss, delta, quantile)
+                telemetry.count('iterations', passes)
+            else:
+                # One pass of running sums
+                w_final, b_final = normal_equation(original_data_x, original_data_y)
+
+        print(f"(w,b) found by the {'normal equation' if solver == 'normal_equation' else 'IRLS solver'}: ({w_final},{b_final})")
+
+        if plots:
+            with telemetry.phase('plot_regression_line'):
+                submit_plot(plot_with_regression_line, original_data_x, original_data_y, w_final, b_final, \
+                            background=background_plots)
+
+        with telemetry.phase('save_coefficients'):
+            save_coefficients_to_file(w_final, b_final, coefficients_path)
+            save_trained_model(original_data_x, original_data_y, w_final, b_final, model_path)
+        return
+
+    if solver not in ("gradient_descent", "stochastic"):
+        raise ValueError(f"Unknown solver '{solver}'. Use 'gradient_descent', 'stochastic', 'normal_equation' or 'irls'.")
+
     # Learning rate controls the step size in gradient descent:
     # - Too small: Gradient descent may be slow.
     # - Too large: Gradient descent may overshoot and fail to reach the minimum.
-    learning_rate: float = 0.01
+    # When not given, each optimizer uses its own default (0.01 for plain gradient descent).
     
     # Standardize the feature data (Z-score standardization)
-    standardized_x: np.ndarray = standardization(original_data_x)
+    mean_x: float = None
+    std_x: float = None
+    with telemetry.phase('standardization'):
+        if precision == "float64":
+            standardized_x: np.ndarray = standardization(original_data_x)
+            data_y: np.ndarray = original_data_y
+        else:
+            # Stored in float32, converted chunk by chunk. The statistics come from one chunked
+            # pass of running sums, shared with the accuracy guard and the denormalization
+            statistics = RunningStatistics.from_arrays(original_data_x, original_data_y)
+            mean_x, std_x = statistics.mean_x, statistics.std_x
+            standardized_x = standardization(original_data_x, mean_x, std_x, dtype=dtype)
+            data_y = to_precision(original_data_y, dtype)
     
     # Perform gradient descent to optimize w and b on standardized data
-    w, b = gradient_descent(standardized_x, original_data_y, initial_w, initial_b, learning_rate)
+    if solver == "stochastic":
+        with telemetry.phase('optimization'):
+            result = stochastic_gradient_descent(standardized_x, data_y, initial_w, initial_b,
+                                                 0.1 if learning_rate is None else learning_rate, batch_size,
+                                                 schedule=schedule, telemetry=telemetry)
+        if plots:
+            with telemetry.phase('plot_costs'):
+                submit_plot(plot_cost_function_scatter, result.cost_iterations, result.costs, background=background_plots)
+        w, b = result.w, result.b
+    else:
+        # The gradient of a float32 residual is only resolved to about eps * rms(y)
+        tolerance: float = 1e-6 if precision == "float64" else resolution_tolerance(data_y, dtype)
+        w, b = gradient_descent(standardized_x, data_y, initial_w, initial_b, learning_rate, tolerance, \
+                                plot_costs=plots, optimizer=optimizer, telemetry=telemetry, \
+                                background_plots=background_plots, loss=loss, delta=delta, quantile=quantile, \
+                                alpha=alpha, l1_ratio=l1_ratio, threads=threads)
+
+    if precision != "float64":
+        # Accuracy guard: compare with the float64 solution, from the running sums of the standardization
+        with telemetry.phase('accuracy_check'):
+            difference: float = relative_difference((w, b), reference_coefficients(statistics, alpha, l1_ratio))
+        print(f"{precision} coefficients differ from the float64 solution by {difference:.2e} (relative).")
+        if difference > PRECISION_TOLERANCE:
+            print(f"Above the tolerance of {PRECISION_TOLERANCE:g}: refining the coefficients in float64.")
+            del standardized_x, data_y
+            w, b = gradient_descent(standardization(original_data_x, mean_x, std_x), original_data_y, w, b, learning_rate, \
+                                    plot_costs=plots, optimizer=optimizer, telemetry=telemetry, \
+                                    background_plots=background_plots, alpha=alpha, l1_ratio=l1_ratio, \
+                                    threads=threads)
     
     # Denormalize coefficients to return them to the original scale
-    w_final, b_final = denormalize_coefficients(original_data_x, w, b)
+    with telemetry.phase('denormalization'):
+        w_final, b_final = denormalize_coefficients(original_data_x, w, b, mean_x, std_x)
 
     print(f"(w,b) found by gradient descent: ({w_final:8.4f},{b_final:8.4f})")
 
     print(f"(w,b) found by gradient descent: ({w_final},{b_final})")
 
-    plot_with_regression_line(original_data_x, original_data_y, w_final, b_final)
+    if plots:
+        with telemetry.phase('plot_regression_line'):
+            submit_plot(plot_with_regression_line, original_data_x, original_data_y, w_final, b_final, \
+                        background=background_plots)
 
-    save_coefficients_to_file(w_final, b_final, '../prediction/coefficients.txt')
+    with telemetry.phase('save_coefficients'):
+        save_coefficients_to_file(w_final, b_final, coefficients_path)
+        save_trained_model(original_data_x, original_data_y, w_final, b_final, model_path)
 
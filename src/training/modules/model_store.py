@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sys
+import time
+import zlib
+import numpy as np
+from typing import Iterable, Sequence, Tuple
+
+# Running statistics
+from .sufficient_statistics import RunningStatistics
+
+# The layout of a model file, its Model and BootstrapQuantiles types and its reader live
+# in src/prediction/model_store.py, which the predictor runs without the training code.
+# The training program imports them from there, and only adds the writers.
+PREDICTION_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'prediction')
+if PREDICTION_DIR not in sys.path:
+    sys.path.append(PREDICTION_DIR)
+from model_store import BootstrapQuantiles, Model, is_model_file, load_model, MODEL_HEADER, MODEL_MAGIC, \
+                        MODEL_QUANTILES_HEADER, MODEL_QUANTILES_VERSION, MODEL_TRAILER, MODEL_VERSION
+
+# The model lives next to the legacy coefficients file
+MODEL_PATH: str = '../prediction/model.bin'
+
+
+def hash_dataset(chunks: Iterable[Tuple[np.ndarray, np.ndarray]]) -> bytes:
+    """
+    Fingerprints a dataset, chunk by chunk, whatever the size of the chunks.
+
+    The x and y values are hashed as float64 in two separate SHA-256 streams, whose
+    digests are hashed together, so the result does not depend on the chunking.
+
+    Args:
+        chunks (Iterable[Tuple[np.ndarray, np.ndarray]]): Chunks of feature data and target values.
+
+    Returns:
+        bytes: The 32-byte digest.
+    """
+    hash_x = hashlib.sha256()
+    hash_y = hashlib.sha256()
+    for data_x, data_y in chunks:
+        hash_x.update(np.ascontiguousarray(data_x, dtype='<f8'))
+        hash_y.update(np.ascontiguousarray(data_y, dtype='<f8'))
+    return hashlib.sha256(hash_x.digest() + hash_y.digest()).digest()
+
+
+def save_model(model: Model, file_path: str = MODEL_PATH) -> None:
+    """
+    Writes a model file atomically.
+
+    The file is written and flushed to disk under a temporary name, then renamed over
+    the previous model, so a running predictor reads either the old or the new model,
+    never a partial one.
+
+    Args:
+        model (Model): The model to save.
+        file_path (str, optional): Path to the model file.
+
+    Returns:
+        None
+
+    Raises:
+        OSError: If the model could not be written. The previous model, if any, is left
+                 unchanged and no temporary file is left behind.
+    """
+    names: bytes = '\n'.join(model.feature_names).encode('utf-8')
+    payload: np.ndarray = np.concatenate((model.weights, [model.b], model.means, model.standard_deviations)).astype('<f8')
+    version: int = MODEL_VERSION if model.quantiles is None else MODEL_QUANTILES_VERSION
+    content: bytes = MODEL_HEADER.pack(MODEL_MAGIC, version, len(model.feature_names), model.n_rows,
+                                       model.trained_at, model.cost, model.data_hash, len(names)) \
+                     + names + payload.tobytes()
+    if model.quantiles is not None:
+        quantiles = model.quantiles
+        values: np.ndarray = np.concatenate((quantiles.levels, np.ravel(quantiles.weights), quantiles.mean_prices,
+                                             quantiles.residuals)).astype('<f8')
+        content += MODEL_QUANTILES_HEADER.pack(quantiles.levels.shape[0], quantiles.n_replicates) + values.tobytes()
+    content += MODEL_TRAILER.pack(zlib.crc32(content))
+
+    temporary_path: str = f"{file_path}.tmp"
+    try:
+        with open(temporary_path, 'wb') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, file_path)
+    finally:
+        # Left behind only when the write or the rename failed
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    print(f"Model has been saved to {file_path}.")
+
+
+def save_linear_model(w_final: float, b_final: float, statistics: RunningStatistics, data_hash: bytes = bytes(32), \
+                      file_path: str = MODEL_PATH, quantiles: BootstrapQuantiles = None) -> None:
+    """
+    Saves a single-feature (km) model, with the statistics of its training data.
+
+    Args:
+        w_final (float): Slope of the regression line.
+        b_final (float): Intercept of the regression line.
+        statistics (RunningStatistics): Statistics of the training data.
+        data_hash (bytes, optional): Fingerprint of the training data, zeros if unknown.
+        file_path (str, optional): Path to the model file.
+        quantiles (BootstrapQuantiles, optional): Bootstrap quantiles of the coefficients.
+
+    Returns:
+        None
+    """
+    model = Model(('km',), np.array([w_final]), b_final, np.array([statistics.mean_x]), np.array([statistics.std_x]),
+                  statistics.cost(w_final, b_final), int(round(statistics.n)), data_hash, time.time(), quantiles)
+    save_model(model, file_path)
+
+
+def save_multivariate_model(params: np.ndarray, feature_names: Sequence[str], means: np.ndarray, \
+                            standard_deviations: np.ndarray, cost: float, n_rows: int, \
+                            data_hash: bytes = bytes(32), file_path: str = MODEL_PATH) -> None:
+    """
+    Saves a model with any number of features.
+
+    Args:
+        params (np.ndarray): Parameters [w_1, ..., w_k, b] on the original scale.
+        feature_names (Sequence[str]): Names of the k features, in order.
+        means (np.ndarray): Means of the features.
+        standard_deviations (np.ndarray): Standard deviations of the features.
+        cost (float): Squared error cost on the training data.
+        n_rows (int): Number of training rows.
+        data_hash (bytes, optional): Fingerprint of the training data, zeros if unknown.
+        file_path (str, optional): Path to the model file.
+
+    Returns:
+        None
+    """
+    model = Model(tuple(feature_names), np.asarray(params[:-1], dtype=np.float64), float(params[-1]),
+                  np.asarray(means, dtype=np.float64), np.asarray(standard_deviations, dtype=np.float64),
+                  cost, n_rows, data_hash, time.time())
+    save_model(model, file_path)
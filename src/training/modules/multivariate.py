@@ -0,0 +1,222 @@
+import numpy as np
+from typing import List, Sequence, Tuple
+
+# Optimization loop and coefficient file of the single-feature model
+from .gradient_descent import minimize, save_coefficients_to_file
+# Versioned model file
+from .model_store import save_multivariate_model, hash_dataset, MODEL_PATH
+# Chunk size of the passes over the data
+from .sufficient_statistics import DEFAULT_CHUNK_SIZE
+
+# The multivariate model predicts y = X @ weights + b. Its parameter vector is laid out
+# as [w_1, ..., w_k, b], so that with a single feature it is the [w, b] of the
+# single-feature engine.
+
+
+class LinearObjective:
+    """
+    Squared error cost of a linear regression on a feature matrix, as a function of
+    the parameters [w_1, ..., w_k, b].
+
+    Matrix-vector products go through BLAS, and the residual lives in a buffer reused
+    by every evaluation. A float32 matrix (e.g. a cached design matrix) is not copied:
+    it is converted to float64 one chunk of rows at a time, so the products still
+    accumulate in float64 while memory stays bounded.
+    """
+
+    def __init__(self, data_X: np.ndarray, data_y: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if data_X.dtype == np.float32:
+            self.data_X: np.ndarray = data_X
+            self.chunk_size: int = chunk_size
+        else:
+            self.data_X = np.ascontiguousarray(data_X, dtype=np.float64)
+            # float64 matrices are multiplied in one go
+            self.chunk_size = max(self.data_X.shape[0], 1)
+        self.data_y: np.ndarray = data_y
+        # Residual buffer reused by every evaluation
+        self.residual: np.ndarray = np.empty(self.data_X.shape[0], dtype=np.float64)
+
+    def value_and_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Computes the cost and its gradient at params = [w_1, ..., w_k, b].
+        """
+        m: int = self.data_X.shape[0]
+        gradient: np.ndarray = np.zeros_like(params)
+
+        for start in range(0, m, self.chunk_size):
+            block: np.ndarray = self.data_X[start:start + self.chunk_size]
+            residual: np.ndarray = self.residual[start:start + self.chunk_size]
+
+            # Residual: X @ w + b - y
+            np.dot(block, params[:-1], out=residual)
+            np.add(residual, params[-1], out=residual)
+            np.subtract(residual, self.data_y[start:start + self.chunk_size], out=residual)
+
+            # dJ/dw = X^T r / m
+            gradient[:-1] += np.dot(residual, block)
+
+        gradient[:-1] /= m
+        # dJ/db = sum(r) / m
+        gradient[-1] = np.sum(self.residual) / m
+        cost: float = np.dot(self.residual, self.residual) / (2 * m)
+        return cost, gradient
+
+    def value(self, params: np.ndarray) -> float:
+        """
+        Computes the cost at params = [w_1, ..., w_k, b].
+        """
+        return self.value_and_gradient(params)[0]
+
+    def curvature(self, direction: np.ndarray) -> float:
+        """
+        Computes direction^T H direction: the mean of (X @ d_w + d_b) ** 2.
+        """
+        for start in range(0, self.data_X.shape[0], self.chunk_size):
+            np.dot(self.data_X[start:start + self.chunk_size], direction[:-1],
+                   out=self.residual[start:start + self.chunk_size])
+        np.add(self.residual, direction[-1], out=self.residual)
+        return np.dot(self.residual, self.residual) / self.data_X.shape[0]
+
+
+def standardize_columns(data_X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Applies Z-score standardization to every column of a feature matrix.
+
+    Args:
+        data_X (np.ndarray): Feature matrix of shape (m, k).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The standardized matrix, and the means
+        and standard deviations of the columns.
+    """
+    means: np.ndarray = np.mean(data_X, axis=0)
+    standard_deviations: np.ndarray = np.std(data_X, axis=0)
+    # Constant columns are left centered rather than divided by zero
+    standard_deviations[standard_deviations == 0] = 1.0
+    standardized_X: np.ndarray = (data_X - means) / standard_deviations
+    return standardized_X, means, standard_deviations
+
+
+def destandardize_coefficients(params: np.ndarray, means: np.ndarray, standard_deviations: np.ndarray) -> np.ndarray:
+    """
+    Returns parameters fitted on standardized columns to the original scale.
+
+    Same transformation as denormalize_coefficients, for every column:
+    w_j = w'_j / s_j and b = b' - sum(w'_j * mean_j / s_j).
+
+    Args:
+        params (np.ndarray): Parameters [w'_1, ..., w'_k, b'] fitted on standardized data.
+        means (np.ndarray): Means of the original columns.
+        standard_deviations (np.ndarray): Standard deviations of the original columns.
+
+    Returns:
+        np.ndarray: The parameters [w_1, ..., w_k, b] on the original scale.
+    """
+    original: np.ndarray = np.empty_like(params)
+    original[:-1] = params[:-1] / standard_deviations
+    original[-1] = params[-1] - np.dot(original[:-1], means)
+    return original
+
+
+def load_feature_matrix(file_path: str, target: str = 'price') -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Loads every numeric column of a CSV file but the target as a feature matrix.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        target (str, optional): Name of the target column.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, List[str]]: The feature matrix, the target values and the feature names.
+    """
+    # pandas is only imported by the code paths that parse CSV files
+    import pandas as pd
+
+    df = pd.read_csv(file_path)
+    feature_names: List[str] = [column for column in df.select_dtypes('number').columns if column != target]
+    data_X: np.ndarray = df[feature_names].to_numpy(dtype=np.float64)
+    return data_X, df[target].to_numpy(dtype=np.float64), feature_names
+
+
+def save_coefficient_vector_to_file(params: np.ndarray, feature_names: Sequence[str], file_path: str) -> None:
+    """
+    Saves the coefficients of a multivariate model, one line per feature and one for the intercept.
+
+    With a single feature the file has the two-line format of save_coefficients_to_file,
+    otherwise each slope is saved as `w_final[<feature>]: <value>`.
+
+    Args:
+        params (np.ndarray): Parameters [w_1, ..., w_k, b] on the original scale.
+        feature_names (Sequence[str]): Names of the k features, in order.
+        file_path (str): Path to the file where the coefficients will be saved.
+
+    Returns:
+        None
+    """
+    if len(feature_names) == 1:
+        save_coefficients_to_file(params[0], params[1], file_path)
+        return
+
+    try:
+        with open(file_path, 'w+') as file:
+            for name, w_final in zip(feature_names, params[:-1]):
+                file.write(f"w_final[{name}]: {w_final}\n")
+            file.write(f"b_final: {params[-1]}\n")
+        print(f"Coefficients have been saved to {file_path}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
+
+
+def multivariate_gradient_descent(data_X: np.ndarray, data_y: np.ndarray, learning_rate: float = None, \
+                                  tolerance: float = 1e-6, max_iterations: int = 5000, \
+                                  optimizer: str = "gradient_descent") -> Tuple[np.ndarray, int]:
+    """
+    Fits a multivariate linear regression: standardizes every column, optimizes, and
+    returns the parameters on the original scale.
+
+    Args:
+        data_X (np.ndarray): Feature matrix of shape (m, k).
+        data_y (np.ndarray): Target values.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient.
+        max_iterations (int, optional): Maximum number of iterations to run.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+
+    Returns:
+        Tuple[np.ndarray, int]: The parameters [w_1, ..., w_k, b] and the number of iterations run.
+    """
+    standardized_X, means, standard_deviations = standardize_columns(data_X)
+    objective = LinearObjective(standardized_X, data_y)
+    initial_params: np.ndarray = np.zeros(data_X.shape[1] + 1)
+    result = minimize(objective, initial_params, learning_rate, tolerance, max_iterations, optimizer)
+    return destandardize_coefficients(result.params, means, standard_deviations), result.iterations
+
+
+def lauch_multivariate_gradient_descent(file_path: str, target: str = 'price', optimizer: str = "gradient_descent", \
+                                        learning_rate: float = None) -> np.ndarray:
+    """
+    Trains a multivariate model on every numeric column of a CSV file and saves its coefficients.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        target (str, optional): Name of the target column.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+
+    Returns:
+        np.ndarray: The parameters [w_1, ..., w_k, b] on the original scale.
+    """
+    data_X, data_y, feature_names = load_feature_matrix(file_path, target)
+
+    params, _ = multivariate_gradient_descent(data_X, data_y, learning_rate, optimizer=optimizer)
+
+    for name, w_final in zip(feature_names, params[:-1]):
+        print(f"w_final[{name}] = {w_final}")
+    print(f"b_final = {params[-1]}")
+
+    save_coefficient_vector_to_file(params, feature_names, '../prediction/coefficients.txt')
+    _, means, standard_deviations = standardize_columns(data_X)
+    save_multivariate_model(params, feature_names, means, standard_deviations,
+                            LinearObjective(data_X, data_y).value(params), data_X.shape[0],
+                            hash_dataset([(data_X, data_y)]), MODEL_PATH)
+    return params
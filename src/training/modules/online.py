@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Tuple
+
+# Coefficient file
+from .gradient_descent import save_coefficients_to_file
+# CSV chunk reader
+from .streaming import read_csv_chunks
+# Running statistics
+from .sufficient_statistics import RunningStatistics
+# Versioned model file
+from .model_store import load_model, save_linear_model, MODEL_PATH
+
+# The running state lives next to the coefficients it produces
+MODEL_STATE_PATH: str = '../prediction/model_state.json'
+COEFFICIENTS_PATH: str = '../prediction/coefficients.txt'
+
+# Relative excess of squared error cost over the least-squares fit, beyond which a model
+# was not trained by least squares (ridge, Huber...) or not on the same rows
+LEAST_SQUARES_TOLERANCE: float = 1e-6
+
+# The model file written by an online update carries the fingerprint of the state it was
+# fitted from, in place of the fingerprint of the training data. Any other trainer writes
+# another fingerprint, so a state older than the model file is detected before an update
+# folds new rows into it and silently replaces the retrained model.
+
+
+def state_fingerprint(statistics: RunningStatistics) -> bytes:
+    """
+    Fingerprints running statistics, as stored in the model files of online updates.
+
+    Args:
+        statistics (RunningStatistics): The statistics.
+
+    Returns:
+        bytes: The 32-byte SHA-256 of the statistics as little-endian float64.
+    """
+    values: dict = statistics.to_dict()
+    return hashlib.sha256(np.array([values[name] for name in sorted(values)], dtype='<f8').tobytes()).digest()
+
+
+def model_state_is_current(state_path: str = MODEL_STATE_PATH, model_path: str = MODEL_PATH) -> bool:
+    """
+    Tells whether the model file was written by an online update from the state file.
+
+    Args:
+        state_path (str, optional): Path to the state file.
+        model_path (str, optional): Path to the model file.
+
+    Returns:
+        bool: False if there is no state, or if the model file was written by another
+              trainer since (or is unreadable). True if there is no model file to undo.
+
+    Raises:
+        ValueError: If the state file is not valid.
+    """
+    if not os.path.exists(state_path):
+        return False
+    if not os.path.exists(model_path):
+        return True
+    try:
+        data_hash: bytes = load_model(model_path).data_hash
+    except (IOError, ValueError):
+        return False
+    return data_hash == state_fingerprint(load_model_state(state_path))
+
+
+def is_least_squares_model(model_path: str, statistics: RunningStatistics) -> bool:
+    """
+    Tells whether the model file holds the least-squares fit of the rows of the statistics.
+
+    Online updates only maintain least-squares fits, so a model trained with another loss
+    or a penalty is replaced by a different one when an update starts a new state.
+
+    Args:
+        model_path (str): Path to the model file.
+        statistics (RunningStatistics): Statistics of the rows.
+
+    Returns:
+        bool: False if the model has other features than km, or if its squared error cost
+              exceeds the one of the least-squares fit. True if there is no readable model.
+    """
+    try:
+        model = load_model(model_path)
+    except (IOError, ValueError):
+        return True
+    if model.feature_names != ('km',):
+        return False
+    least_squares_cost: float = statistics.cost(*statistics.fit())
+    return statistics.cost(float(model.weights[0]), model.b) <= least_squares_cost * (1 + LEAST_SQUARES_TOLERANCE)
+
+
+def save_model_state(statistics: RunningStatistics, file_path: str = MODEL_STATE_PATH) -> None:
+    """
+    Saves the running statistics of the model as JSON, atomically.
+
+    The state is written to a temporary file renamed over the previous one, so an
+    interrupted save never leaves a truncated state behind.
+
+    Args:
+        statistics (RunningStatistics): Statistics of every row folded in so far.
+        file_path (str, optional): Path to the state file.
+
+    Returns:
+        None
+    """
+    temporary_path: str = f"{file_path}.tmp"
+    with open(temporary_path, 'w') as file:
+        json.dump(statistics.to_dict(), file, indent=4)
+    os.replace(temporary_path, file_path)
+
+
+def load_model_state(file_path: str = MODEL_STATE_PATH) -> RunningStatistics:
+    """
+    Loads the running statistics of the model, or empty statistics if there is no state yet.
+
+    Args:
+        file_path (str, optional): Path to the state file.
+
+    Returns:
+        RunningStatistics: The statistics of every row folded in so far.
+
+    Raises:
+        ValueError: If the state file is not valid.
+    """
+    if not os.path.exists(file_path):
+        return RunningStatistics()
+    try:
+        with open(file_path, 'r') as file:
+            return RunningStatistics.from_dict(json.load(file))
+    except (json.JSONDecodeError, KeyError) as e:
+        raise ValueError(f"Invalid model state in {file_path}: {e}") from None
+
+
+def update_model(new_data_x: np.ndarray, new_data_y: np.ndarray, forgetting: float = 1.0, \
+                 state_path: str = MODEL_STATE_PATH, coefficients_path: str = COEFFICIENTS_PATH, \
+                 model_path: str = MODEL_PATH, reset: bool = False) -> Tuple[float, float]:
+    """
+    Folds new sales into the model in O(new rows) and saves the refitted coefficients.
+
+    Without forgetting, the coefficients are those of a full retrain on every row folded
+    in so far. With a forgetting factor below 1, the weight of the previous rows is
+    multiplied by it at every update, so that recent prices count more.
+
+    Args:
+        new_data_x (np.ndarray): Kilometers of the new sales.
+        new_data_y (np.ndarray): Prices of the new sales.
+        forgetting (float, optional): Weight kept by the previous rows, between 0 and 1.
+        state_path (str, optional): Path to the state file.
+        coefficients_path (str, optional): Path to the coefficients file.
+        model_path (str, optional): Path to the model file.
+        reset (bool, optional): Whether to start a new state from these rows alone.
+
+    Returns:
+        Tuple[float, float]: The updated coefficients (w_final, b_final).
+    """
+    return update_model_from_chunks([(new_data_x, new_data_y)], forgetting, state_path, coefficients_path, model_path,
+                                    reset)
+
+
+def update_model_from_csv(csv_path: str, forgetting: float = 1.0, \
+                          state_path: str = MODEL_STATE_PATH, coefficients_path: str = COEFFICIENTS_PATH, \
+                          model_path: str = MODEL_PATH, reset: bool = False) -> Tuple[float, float]:
+    """
+    Folds the sales of a CSV file into the model, reading it in chunks.
+
+    Args:
+        csv_path (str): Path to a CSV file with 'km' and 'price' columns.
+        forgetting (float, optional): Weight kept by the previous rows, between 0 and 1.
+        state_path (str, optional): Path to the state file.
+        coefficients_path (str, optional): Path to the coefficients file.
+        model_path (str, optional): Path to the model file.
+        reset (bool, optional): Whether to start a new state from this file alone.
+
+    Returns:
+        Tuple[float, float]: The updated coefficients (w_final, b_final).
+    """
+    return update_model_from_chunks(read_csv_chunks(csv_path), forgetting, state_path, coefficients_path, model_path,
+                                    reset)
+
+
+def update_model_from_chunks(chunks, forgetting: float = 1.0, \
+                             state_path: str = MODEL_STATE_PATH, coefficients_path: str = COEFFICIENTS_PATH, \
+                             model_path: str = MODEL_PATH, reset: bool = False) -> Tuple[float, float]:
+    """
+    Folds chunks of new sales into the model and saves the state and the coefficients.
+
+    The state must be the one the model file was fitted from: if another trainer has
+    written the model file since, folding rows into the old state would replace the
+    retrained model with an update of the previous one. Start a new state (reset) from
+    the training data instead. The new state is fitted by least squares, so a warning is
+    printed if it replaces a model that is not the least-squares fit of these rows.
+
+    Args:
+        chunks (Iterable[Tuple[np.ndarray, np.ndarray]]): Chunks of kilometers and prices.
+        forgetting (float, optional): Weight kept by the previous rows, between 0 and 1.
+        state_path (str, optional): Path to the state file.
+        coefficients_path (str, optional): Path to the coefficients file.
+        model_path (str, optional): Path to the model file.
+        reset (bool, optional): Whether to start a new state from these chunks alone.
+
+    Returns:
+        Tuple[float, float]: The updated coefficients (w_final, b_final).
+
+    Raises:
+        ValueError: If the forgetting factor is not in ]0, 1], or the model file has been
+                    written by another trainer since the state.
+    """
+    if not 0 < forgetting <= 1:
+        raise ValueError("The forgetting factor must be in ]0, 1].")
+
+    if reset:
+        statistics = RunningStatistics()
+    else:
+        if os.path.exists(state_path) and not model_state_is_current(state_path, model_path):
+            raise ValueError(f"{model_path} has been retrained since the last online update of {state_path}. "
+                             "Start a new state from the training data first.")
+        statistics = load_model_state(state_path)
+        statistics.scale(forgetting)
+
+    new_statistics = RunningStatistics()
+    for data_x, data_y in chunks:
+        new_statistics.update(data_x, data_y)
+    statistics.merge(new_statistics)
+
+    w_final, b_final = statistics.fit()
+    if reset and not is_least_squares_model(model_path, statistics):
+        print(f"Warning: {model_path} is not the least-squares fit of these rows (another loss, a penalty, "
+              "or other features or rows). The online update replaces it with the least-squares fit.")
+    save_model_state(statistics, state_path)
+
+    print(f"{new_statistics.n} new rows folded in, model weight {statistics.n:g}.")
+    print(f"(w,b) updated online: ({w_final},{b_final})")
+
+    save_coefficients_to_file(w_final, b_final, coefficients_path)
+    # The rows folded in are not kept: the model is fingerprinted by its state instead
+    save_linear_model(w_final, b_final, statistics, state_fingerprint(statistics), file_path=model_path)
+    return w_final, b_final
@@ -0,0 +1,225 @@
+import numpy as np
+from typing import Callable, Dict, Type
+
+# Optimizers update a vector of parameters (e.g. [w, b]) from the gradient of an
+# objective and the cost at the current parameters. The objective exposes:
+#   - value(params) -> float: the cost at params
+#   - curvature(direction) -> float: direction^T H direction, with H the Hessian of the cost
+# Only the line search and the exact step use it.
+
+
+class Optimizer:
+    """
+    Plain gradient descent: params <- params - learning_rate * gradient.
+
+    Attributes:
+        learning_rate (float): Step size.
+        supports_l1_penalty (bool): Whether the steps are of size learning_rate, as the gradient
+                                    mapping of an L1 penalty (a proximal step) assumes.
+    """
+    default_learning_rate: float = 0.01
+    supports_l1_penalty: bool = True
+
+    def __init__(self, learning_rate: float = None) -> None:
+        self.learning_rate: float = self.default_learning_rate if learning_rate is None else learning_rate
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        """
+        Computes the next parameters.
+
+        Args:
+            params (np.ndarray): Current parameters.
+            gradient (np.ndarray): Gradient of the cost at the current parameters.
+            objective: Objective being minimized.
+            cost (float): Cost at the current parameters.
+
+        Returns:
+            np.ndarray: The updated parameters.
+        """
+        return params - self.learning_rate * gradient
+
+
+class MomentumOptimizer(Optimizer):
+    """
+    Gradient descent with heavy-ball momentum: the step follows a running sum of gradients.
+    """
+
+    def __init__(self, learning_rate: float = None, beta: float = 0.9) -> None:
+        super().__init__(learning_rate)
+        self.beta: float = beta
+        self.velocity: np.ndarray = None
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        if self.velocity is None:
+            self.velocity = np.zeros_like(params)
+        self.velocity = self.beta * self.velocity + gradient
+        return params - self.learning_rate * self.velocity
+
+
+class NesterovOptimizer(MomentumOptimizer):
+    """
+    Nesterov accelerated gradient, in the form that reuses the gradient at the current
+    parameters: the step looks ahead along the updated velocity.
+    """
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        if self.velocity is None:
+            self.velocity = np.zeros_like(params)
+        self.velocity = self.beta * self.velocity + gradient
+        return params - self.learning_rate * (gradient + self.beta * self.velocity)
+
+
+class AdamOptimizer(Optimizer):
+    """
+    Adam: per-parameter steps scaled by running estimates of the first and second
+    moments of the gradient. Steps are roughly `learning_rate` in size, so the default
+    is set for prices, the scale of the intercept.
+    """
+    default_learning_rate: float = 10.0
+
+    def __init__(self, learning_rate: float = None, beta1: float = 0.9, beta2: float = 0.999, epsilon: float = 1e-8) -> None:
+        super().__init__(learning_rate)
+        self.beta1: float = beta1
+        self.beta2: float = beta2
+        self.epsilon: float = epsilon
+        self.first_moment: np.ndarray = None
+        self.second_moment: np.ndarray = None
+        self.t: int = 0
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        if self.first_moment is None:
+            self.first_moment = np.zeros_like(params)
+            self.second_moment = np.zeros_like(params)
+        self.t += 1
+        self.first_moment = self.beta1 * self.first_moment + (1 - self.beta1) * gradient
+        self.second_moment = self.beta2 * self.second_moment + (1 - self.beta2) * gradient * gradient
+        # Bias corrections of the moments, initialized at zero
+        first_moment_hat: np.ndarray = self.first_moment / (1 - self.beta1 ** self.t)
+        second_moment_hat: np.ndarray = self.second_moment / (1 - self.beta2 ** self.t)
+        return params - self.learning_rate * first_moment_hat / (np.sqrt(second_moment_hat) + self.epsilon)
+
+
+class BacktrackingOptimizer(Optimizer):
+    """
+    Steepest descent with a backtracking (Armijo) line search: the step starts at
+    `learning_rate` and is halved until the cost decreases enough.
+
+    The step actually taken is shorter than `learning_rate`, so it cannot follow the
+    gradient mapping of an L1 penalty, which is built for a step of `learning_rate`.
+    """
+    default_learning_rate: float = 1.0
+    supports_l1_penalty: bool = False
+
+    def __init__(self, learning_rate: float = None, shrink: float = 0.5, armijo: float = 1e-4, max_halvings: int = 50) -> None:
+        super().__init__(learning_rate)
+        self.shrink: float = shrink
+        self.armijo: float = armijo
+        self.max_halvings: int = max_halvings
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        squared_norm: float = float(np.dot(gradient, gradient))
+        step_size: float = self.learning_rate
+        for _ in range(self.max_halvings):
+            candidate: np.ndarray = params - step_size * gradient
+            if objective.value(candidate) <= cost - self.armijo * step_size * squared_norm:
+                return candidate
+            step_size *= self.shrink
+        return params - step_size * gradient
+
+
+class ExactStepOptimizer(Optimizer):
+    """
+    Steepest descent with the exact optimal step of a quadratic cost: along -g the
+    minimum is reached at step g.g / g^T H g. The learning rate is not used.
+    """
+
+    def step(self, params: np.ndarray, gradient: np.ndarray, objective, cost: float) -> np.ndarray:
+        curvature: float = objective.curvature(gradient)
+        if curvature <= 0:
+            return params
+        return params - (np.dot(gradient, gradient) / curvature) * gradient
+
+
+OPTIMIZERS: Dict[str, Type[Optimizer]] = {
+    'gradient_descent': Optimizer,
+    'momentum': MomentumOptimizer,
+    'nesterov': NesterovOptimizer,
+    'adam': AdamOptimizer,
+    'backtracking': BacktrackingOptimizer,
+    'exact': ExactStepOptimizer,
+}
+
+
+def warn_not_converged(iterations: int, unit: str = "iterations", detail: str = None) -> None:
+    """
+    Reports a run that reached its iteration cap without meeting its convergence test.
+
+    Every solver reports it the same way, so that a run burning its whole budget is never silent.
+
+    Args:
+        iterations (int): Number of iterations (or epochs, passes) run.
+        unit (str, optional): What an iteration is, e.g. "epochs".
+        detail (str, optional): Where the run stopped, e.g. its cost and tolerance.
+    """
+    print(f"Warning: stopped after {iterations} {unit} without converging" + (f" ({detail})." if detail else "."))
+
+
+def warn_diverged(iterations: int, cost: float, unit: str = "iterations") -> None:
+    """
+    Reports a run stopped because its cost or gradient overflowed.
+
+    Args:
+        iterations (int): Number of iterations (or epochs) run.
+        cost (float): Last cost of the run.
+        unit (str, optional): What an iteration is, e.g. "epochs".
+    """
+    print(f"Warning: diverged after {iterations} {unit} (cost {cost:g}), lower the learning rate.")
+
+
+def make_optimizer(name: str, learning_rate: float = None) -> Optimizer:
+    """
+    Builds an optimizer by name.
+
+    Args:
+        name (str): One of the keys of OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+
+    Returns:
+        Optimizer: A fresh optimizer, with no state from previous runs.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name not in OPTIMIZERS:
+        raise ValueError(f"Unknown optimizer '{name}'. Use one of: {', '.join(OPTIMIZERS)}.")
+    return OPTIMIZERS[name](learning_rate)
+
+
+# Learning rate schedules of the stochastic modes: the learning rate of an epoch
+# as a function of the initial learning rate, the epoch number and a decay rate.
+LEARNING_RATE_SCHEDULES: Dict[str, Callable[[float, int, float], float]] = {
+    'constant': lambda learning_rate, epoch, decay: learning_rate,
+    'inverse_time': lambda learning_rate, epoch, decay: learning_rate / (1 + decay * epoch),
+    'exponential': lambda learning_rate, epoch, decay: learning_rate * (1 - decay) ** epoch,
+}
+
+
+def scheduled_learning_rate(schedule: str, learning_rate: float, epoch: int, decay: float) -> float:
+    """
+    Computes the learning rate of an epoch according to a decay schedule.
+
+    Args:
+        schedule (str): One of the keys of LEARNING_RATE_SCHEDULES.
+        learning_rate (float): Learning rate of the first epoch.
+        epoch (int): Epoch number, starting at 0.
+        decay (float): Decay rate of the schedule.
+
+    Returns:
+        float: The learning rate of the epoch.
+
+    Raises:
+        ValueError: If the schedule is unknown.
+    """
+    if schedule not in LEARNING_RATE_SCHEDULES:
+        raise ValueError(f"Unknown schedule '{schedule}'. Use one of: {', '.join(LEARNING_RATE_SCHEDULES)}.")
+    return LEARNING_RATE_SCHEDULES[schedule](learning_rate, epoch, decay)
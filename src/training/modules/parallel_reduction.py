@@ -0,0 +1,114 @@
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+# The residual of an iteration and its three reductions are computed chunk by chunk by
+# a pool of threads: numpy releases the GIL inside its loops, so the threads run the
+# elementwise operations and the sums of their chunks at the same time.
+#
+# The chunks only depend on the chunk size, never on the number of threads, and every
+# chunk stores its partial sums in its own row: the partials are then summed in chunk
+# order. The result is bit for bit the same from one run to the next and whatever the
+# number of threads (it differs in the last bits from a single np.dot over the array).
+
+# Rows of a chunk: three float64 arrays of 32 Ki values (x, y and the residual, 768 KiB)
+# stay in the L2 cache between the residual and its reductions
+DEFAULT_REDUCTION_CHUNK: int = 1 << 15
+# Chunks of a task: a task of about a million rows keeps the cost of the pool low
+CHUNKS_PER_TASK: int = 32
+# Below this number of rows the chunks are reduced on the calling thread
+PARALLEL_MIN_ROWS: int = 1 << 20
+
+
+def default_threads() -> int:
+    """
+    Returns the number of CPUs the process may run on.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ParallelReducer:
+    """
+    Deterministic chunked reductions of the residual of a linear model across a thread pool.
+
+    Use it as a context manager, or call close, to stop the threads.
+
+    Attributes:
+        n_threads (int): Number of threads of the pool.
+        chunk_size (int): Rows of a chunk.
+    """
+
+    def __init__(self, n_threads: int = None, chunk_size: int = DEFAULT_REDUCTION_CHUNK) -> None:
+        if n_threads is None:
+            n_threads = default_threads()
+        if n_threads < 1 or chunk_size < 1:
+            raise ValueError("The reductions need at least one thread and one row per chunk.")
+        self.n_threads: int = n_threads
+        self.chunk_size: int = chunk_size
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(n_threads, thread_name_prefix='reduction') \
+                                            if n_threads > 1 else None
+
+    def __enter__(self) -> 'ParallelReducer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops the threads of the pool.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def residual_sums(self, data_x: np.ndarray, data_y: np.ndarray, w: float, b: float, \
+                      residual: np.ndarray = None) -> Tuple[float, float, float]:
+        """
+        Computes the sums of the residual r = w * data_x + b - data_y.
+
+        Args:
+            data_x (np.ndarray): Feature data.
+            data_y (np.ndarray): Target values, or None for r = w * data_x + b.
+            w (float): Slope of the line.
+            b (float): Intercept of the line.
+            residual (np.ndarray, optional): Buffer with the shape of data_x, overwritten with the residual.
+                                             Default allocates one temporary per chunk.
+
+        Returns:
+            Tuple[float, float, float]: sum(r * x), sum(r) and sum(r * r), accumulated in float64.
+        """
+        n_rows: int = data_x.shape[0]
+        n_chunks: int = -(-n_rows // self.chunk_size)
+        # One row of partial sums per chunk, written by the thread that reduced it
+        partials: np.ndarray = np.zeros((n_chunks, 3))
+        tasks: List[Tuple[int, int]] = [(first, min(first + CHUNKS_PER_TASK, n_chunks))
+                                        for first in range(0, n_chunks, CHUNKS_PER_TASK)]
+
+        def reduce_chunks(task: Tuple[int, int]) -> None:
+            for chunk in range(*task):
+                rows = slice(chunk * self.chunk_size, (chunk + 1) * self.chunk_size)
+                x: np.ndarray = data_x[rows]
+                r: np.ndarray = np.multiply(x, w, out=None if residual is None else residual[rows])
+                np.add(r, b, out=r)
+                if data_y is not None:
+                    np.subtract(r, data_y[rows], out=r)
+                # einsum accumulates in float64 whatever the dtype, without BLAS threads of its own
+                partials[chunk] = (np.einsum('i,i->', r, x, dtype=np.float64),
+                                   np.sum(r, dtype=np.float64),
+                                   np.einsum('i,i->', r, r, dtype=np.float64))
+
+        if self.executor is None or n_rows < PARALLEL_MIN_ROWS:
+            for task in tasks:
+                reduce_chunks(task)
+        else:
+            # list() waits for every task and raises the first error
+            list(self.executor.map(reduce_chunks, tasks))
+
+        # Fixed combine order: the partials are summed in chunk order
+        sum_rx, sum_r, sum_rr = partials.sum(axis=0)
+        return float(sum_rx), float(sum_r), float(sum_rr)
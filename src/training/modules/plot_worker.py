@@ -0,0 +1,87 @@
+import atexit
+import queue
+import threading
+from typing import Callable
+
+# Plots are rendered off the training path: training submits the plot function and
+# the data it needs, and returns while a background thread renders the figure. The
+# plotting module serializes the figures, so the menu can still plot from the main
+# thread while the worker renders.
+
+
+class PlotWorker:
+    """
+    Background thread rendering the submitted plots one after the other.
+
+    The thread is started on the first submission. Pending plots are rendered
+    before the interpreter exits.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: queue.Queue = queue.Queue()
+        self.thread: threading.Thread = None
+        self.lock: threading.Lock = threading.Lock()
+
+    def submit(self, plot_function: Callable, *args, **kwargs) -> None:
+        """
+        Queues a plot. The arguments must not be modified until the plot is rendered.
+
+        Args:
+            plot_function (Callable): Plotting function, e.g. plotting.plot_with_regression_line.
+            *args, **kwargs: Arguments of the plotting function.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='plot-worker', daemon=True)
+                self.thread.start()
+                atexit.register(self.wait)
+        self.tasks.put((plot_function, args, kwargs))
+
+    def wait(self) -> None:
+        """
+        Blocks until every queued plot has been rendered.
+        """
+        if self.thread is not None:
+            self.tasks.join()
+
+    def _run(self) -> None:
+        while True:
+            plot_function, args, kwargs = self.tasks.get()
+            try:
+                plot_function(*args, **kwargs)
+            except Exception as e:
+                print(f"An error occurred while rendering a plot: {e}")
+            finally:
+                self.tasks.task_done()
+
+
+# Worker shared by every training run
+_PLOT_WORKER: PlotWorker = PlotWorker()
+
+
+def submit_plot(plot_function: Callable, *args, background: bool = True, **kwargs) -> None:
+    """
+    Renders a plot on the shared background worker, or right away.
+
+    Args:
+        plot_function (Callable): Plotting function.
+        *args, **kwargs: Arguments of the plotting function.
+        background (bool, optional): Whether to render on the worker thread.
+
+    Returns:
+        None
+    """
+    if background:
+        _PLOT_WORKER.submit(plot_function, *args, **kwargs)
+    else:
+        plot_function(*args, **kwargs)
+
+
+def wait_for_plots() -> None:
+    """
+    Blocks until every plot submitted to the shared worker has been rendered.
+    """
+    _PLOT_WORKER.wait()
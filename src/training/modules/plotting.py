@@ -1,17 +1,113 @@
+import functools
+import threading
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from typing import Tuple
 
-from .cost_function import compute_cost_ft
+from .cost_function import compute_cost_grid
 
-def plot_data(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../../plots/plot_data.png') -> None:
+# matplotlib is imported on the first plot, so the code paths that do not plot
+# start without it. pyplot keeps a single current figure: the lock makes the plots
+# of the background worker and of the main thread wait for each other.
+plt = None
+_PYPLOT_LOCK: threading.Lock = threading.Lock()
+
+# Above this number of points, scatter plots draw a random sample of the points
+# (or their density) so that rendering time and image size stay bounded.
+MAX_PLOTTED_POINTS: int = 10_000
+# Number of bins along each axis of density plots
+DENSITY_GRID_SIZE: int = 100
+# Number of points binned at once by density plots
+DENSITY_CHUNK_SIZE: int = 1 << 20
+
+
+def _renders(plot_function):
+    """
+    Imports pyplot with the headless Agg backend on first use, and runs the plot under the lock.
+    """
+    @functools.wraps(plot_function)
+    def wrapper(*args, **kwargs):
+        global plt
+        with _PYPLOT_LOCK:
+            if plt is None:
+                import matplotlib
+                # Plots are only saved to files, never shown
+                matplotlib.use('Agg')
+                import matplotlib.pyplot
+                plt = matplotlib.pyplot
+            return plot_function(*args, **kwargs)
+    return wrapper
+
+
+def density_grid(data_km: np.ndarray, data_price: np.ndarray, bins: int = DENSITY_GRID_SIZE) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts the points falling in each cell of a regular 2-D grid covering the data.
+
+    Bin indices are computed arithmetically and counted with np.bincount chunk by
+    chunk, a single linear pass, much cheaper than the searches of np.histogram2d.
+
+    Args:
+        data_km (np.ndarray): Feature data representing kilometers.
+        data_price (np.ndarray): Target values representing prices.
+        bins (int, optional): Number of bins along each axis.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The counts of shape (bins, bins), indexed
+        by [price bin, km bin], and the bin edges of the kilometers and of the prices.
+    """
+    km_edges: np.ndarray = np.linspace(np.min(data_km), np.max(data_km), bins + 1)
+    price_edges: np.ndarray = np.linspace(np.min(data_price), np.max(data_price), bins + 1)
+    # Widths of the bins, 1 for a constant column so that every point falls in the first bin
+    km_width: float = (km_edges[-1] - km_edges[0]) / bins or 1.0
+    price_width: float = (price_edges[-1] - price_edges[0]) / bins or 1.0
+
+    counts: np.ndarray = np.zeros(bins * bins, dtype=np.int64)
+    for start in range(0, data_km.shape[0], DENSITY_CHUNK_SIZE):
+        km_bin = ((data_km[start:start + DENSITY_CHUNK_SIZE] - km_edges[0]) / km_width).astype(np.int64)
+        price_bin = ((data_price[start:start + DENSITY_CHUNK_SIZE] - price_edges[0]) / price_width).astype(np.int64)
+        # The maximum falls on the last edge, it belongs to the last bin
+        np.minimum(km_bin, bins - 1, out=km_bin)
+        np.minimum(price_bin, bins - 1, out=price_bin)
+        counts += np.bincount(price_bin * bins + km_bin, minlength=bins * bins)
+    return counts.reshape(bins, bins), km_edges, price_edges
+
+
+def sample_points(data_km: np.ndarray, data_price: np.ndarray, max_points: int = MAX_PLOTTED_POINTS, \
+                  seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draws a uniform random sample of the points when there are more than `max_points`.
+
+    The sample is the same at every call (fixed seed) and keeps the order of the data.
+
+    Args:
+        data_km (np.ndarray): Feature data representing kilometers.
+        data_price (np.ndarray): Target values representing prices.
+        max_points (int, optional): Maximum number of points kept, None to keep them all.
+        seed (int, optional): Seed of the sampling.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The kilometers and prices of the sample.
+    """
+    if max_points is None or data_km.shape[0] <= max_points:
+        return data_km, data_price
+    indices: np.ndarray = np.sort(np.random.default_rng(seed).choice(data_km.shape[0], max_points, replace=False))
+    return data_km[indices], data_price[indices]
+
+
+@_renders
+def plot_data(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../../plots/plot_data.png', \
+              max_points: int = MAX_PLOTTED_POINTS) -> None:
     """
     Plots the data points as a scatter plot.
 
+    Above `max_points` points, the density of the points is plotted instead, as a
+    2-D histogram counting every point.
+
     Args:
         data_km (np.ndarray): Feature data representing kilometers.
         data_price (np.ndarray): Target values representing prices.
         plot_path (str, optional): Path to save the plot image.
+        max_points (int, optional): Number of points above which the density is plotted, None to always scatter.
 
     Returns:
         None
@@ -19,8 +115,14 @@ def plot_data(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../
     # Clear the current figure to prevent overlaying of plots
     plt.clf()
 
-    # Create a scatter plot of the data
-    plt.scatter(data_km, data_price, color='blue', marker='x')
+    if max_points is not None and data_km.shape[0] > max_points:
+        # Plot the number of points per cell on a logarithmic scale, empty cells left blank
+        counts, km_edges, price_edges = density_grid(data_km, data_price)
+        density = plt.pcolormesh(km_edges, price_edges, np.ma.masked_equal(counts, 0), cmap='Blues', norm='log')
+        plt.colorbar(density, label='Number of cars')
+    else:
+        # Create a scatter plot of the data
+        plt.scatter(data_km, data_price, color='blue', marker='x')
 
     # Set labels and title
     plt.xlabel('Kilometers')
@@ -32,7 +134,9 @@ def plot_data(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../
     print(f'The plot has been saved in {plot_path}!')
 
 
-def plot_with_regression_line(data_km: np.ndarray, data_price: np.ndarray, w: float, b: float, plot_path: str = '../../plots/plot_regression_line.png') -> None:
+@_renders
+def plot_with_regression_line(data_km: np.ndarray, data_price: np.ndarray, w: float, b: float, plot_path: str = '../../plots/plot_regression_line.png', \
+                              max_points: int = MAX_PLOTTED_POINTS) -> None:
     """
     Plots the data points and a regression line based on the given parameters.
 
@@ -42,6 +146,7 @@ def plot_with_regression_line(data_km: np.ndarray, data_price: np.ndarray, w: fl
         w (float): Slope of the regression line.
         b (float): Y-intercept of the regression line.
         plot_path (str, optional): Path to save the plot image.
+        max_points (int, optional): Maximum number of points drawn, a random sample above. None to draw them all.
 
     Returns:
         None
@@ -49,11 +154,13 @@ def plot_with_regression_line(data_km: np.ndarray, data_price: np.ndarray, w: fl
     # Clear the current figure to prevent overlaying of plots
     plt.clf()
 
-    # Create a scatter plot of the data
-    plt.scatter(data_km, data_price, color='blue', marker='x', label='Data')
+    # Create a scatter plot of the data, or of a sample of it
+    sample_km, sample_price = sample_points(data_km, data_price, max_points)
+    label = 'Data' if sample_km.shape[0] == data_km.shape[0] else f'Data (random sample of {sample_km.shape[0]})'
+    plt.scatter(sample_km, sample_price, color='blue', marker='x', label=label)
     
     # Define the range of x values for plotting the regression line
-    x_range = np.linspace(min(data_km), max(data_km), 100)
+    x_range = np.linspace(np.min(data_km), np.max(data_km), 100)
     
     # Compute y values for the regression line
     y_range = w * x_range + b
@@ -72,7 +179,9 @@ def plot_with_regression_line(data_km: np.ndarray, data_price: np.ndarray, w: fl
     print(f'The plot has been saved in {plot_path}!')
 
 
-def plot_deviation(data_km: np.ndarray, data_price: np.ndarray, w: float = 0.03, b: float = 5000, plot_path: str = '../../plots/plot_deviation.png') -> None:
+@_renders
+def plot_deviation(data_km: np.ndarray, data_price: np.ndarray, w: float = 0.03, b: float = 5000, plot_path: str = '../../plots/plot_deviation.png', \
+                   max_points: int = MAX_PLOTTED_POINTS) -> None:
     """
     Displays the deviation of each data point from the regression line.
 
@@ -82,18 +191,23 @@ def plot_deviation(data_km: np.ndarray, data_price: np.ndarray, w: float = 0.03,
         w (float, optional): Slope of the regression line.
         b (float, optional): Y-intercept of the regression line.
         plot_path (str, optional): Path to save the plot image.
+        max_points (int, optional): Maximum number of points drawn, a random sample above. None to draw them all.
 
     Returns:
         None
     """
+    from matplotlib.collections import LineCollection
+
     # Clear the current figure to prevent overlaying of plots
     plt.clf()
     
-    # Create a scatter plot of the data
-    plt.scatter(data_km, data_price, color='blue', marker='x', label='Data')
+    # Create a scatter plot of the data, or of a sample of it
+    sample_km, sample_price = sample_points(data_km, data_price, max_points)
+    label = 'Data' if sample_km.shape[0] == data_km.shape[0] else f'Data (random sample of {sample_km.shape[0]})'
+    plt.scatter(sample_km, sample_price, color='blue', marker='x', label=label)
     
     # Define the range of x values for plotting the regression line
-    x_range = np.linspace(min(data_km), max(data_km), 100)
+    x_range = np.linspace(np.min(data_km), np.max(data_km), 100)
     
     # Compute y values for the regression line
     y_range = w * x_range + b
@@ -102,11 +216,15 @@ def plot_deviation(data_km: np.ndarray, data_price: np.ndarray, w: float = 0.03,
     plt.plot(x_range, y_range, color='red', label=f'Regression: y = {w}x + {b}')
     
     # Calculate predicted prices for each km
-    predicted_prices = w * data_km + b
+    predicted_prices = w * sample_km + b
 
-    # Draw vertical lines from each data point to the regression line
-    for km, observed_price, predicted_price in zip(data_km, data_price, predicted_prices):
-        plt.plot([km, km], [observed_price, predicted_price], color='gray', linestyle='--', linewidth=0.7)
+    # Draw vertical lines from each data point to the regression line, as a single
+    # collection of segments [(km, observed price), (km, predicted price)]
+    segments = np.empty((sample_km.shape[0], 2, 2))
+    segments[:, :, 0] = sample_km[:, np.newaxis]
+    segments[:, 0, 1] = sample_price
+    segments[:, 1, 1] = predicted_prices
+    plt.gca().add_collection(LineCollection(segments, colors='gray', linestyles='--', linewidths=0.7))
     
     # Set labels and title
     plt.xlabel('Kilometers')
@@ -118,6 +236,7 @@ def plot_deviation(data_km: np.ndarray, data_price: np.ndarray, w: float = 0.03,
     plt.savefig(plot_path)
     print(f'The plot has been saved in {plot_path}!')
 
+@_renders
 def plot_cost_function_only_w(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../../plots/plot_cost_function_only_w.png') -> None:
     """
     Plots the cost function J(w) while varying only the slope (w) and keeping the intercept (b) fixed.
@@ -136,8 +255,8 @@ def plot_cost_function_only_w(data_km: np.ndarray, data_price: np.ndarray, plot_
     # Define ranges for w
     w_values = np.linspace(-2.5, 2.5, 100)
 
-    # Compute the cost for each value of w while b is fixed
-    j_w = np.array([compute_cost_ft(data_km, data_price, w) for w in w_values])
+    # Compute the cost for each value of w while b is fixed (default b of compute_cost_ft)
+    j_w = compute_cost_grid(data_km, data_price, w_values, np.array([5000]))[:, 0]
 
     # Plot the cost function J(w)
     plt.plot(w_values, j_w)
@@ -152,6 +271,7 @@ def plot_cost_function_only_w(data_km: np.ndarray, data_price: np.ndarray, plot_
     print(f'The plot has been saved in {plot_path}!')
 
 
+@_renders
 def plot_cost_function_only_b(data_km: np.ndarray, data_price: np.ndarray, plot_path: str = '../../plots/plot_cost_function_only_b.png') -> None:
     """
     Plots the cost function J(b) while varying only the intercept (b) and keeping the slope (w) fixed.
@@ -171,7 +291,7 @@ def plot_cost_function_only_b(data_km: np.ndarray, data_price: np.ndarray, plot_
     b_values = np.linspace(0, 10000, 100)
 
     # Compute the cost for each value of b while w is fixed
-    j_b = np.array([compute_cost_ft(data_km, data_price, 0, b) for b in b_values])
+    j_b = compute_cost_grid(data_km, data_price, np.array([0]), b_values)[0, :]
 
     # Plot the cost function J(b)
     plt.plot(b_values, j_b)
@@ -185,6 +305,55 @@ def plot_cost_function_only_b(data_km: np.ndarray, data_price: np.ndarray, plot_
     plt.savefig(plot_path)
     print(f'The plot has been saved in {plot_path}!')
 
+@_renders
+def plot_cost_function_surface(data_km: np.ndarray, data_price: np.ndarray, \
+                                w_values: np.ndarray = None, b_values: np.ndarray = None, \
+                                plot_path: str = '../../plots/plot_cost_function_surface.png') -> None:
+    """
+    Plots the contour lines of the cost function J(w, b) over a grid of slopes and intercepts.
+
+    Args:
+        data_km (np.ndarray): Feature data.
+        data_price (np.ndarray): Target values.
+        w_values (np.ndarray, optional): Slopes of the grid. Default covers the hypothesis range of w.
+        b_values (np.ndarray, optional): Intercepts of the grid. Default covers the hypothesis range of b.
+        plot_path (str, optional): The path where the plot will be saved.
+
+    Returns:
+        None
+    """
+    # Clear the current figure to prevent overlaying of plots
+    plt.clf()
+
+    # Define ranges for w and b, the same ones accepted by get_regression_params
+    if w_values is None:
+        w_values = np.linspace(-0.03, 0.03, 400)
+    if b_values is None:
+        b_values = np.linspace(0, 10000, 400)
+
+    # Compute the cost over the whole grid in one go
+    j_wb = compute_cost_grid(data_km, data_price, w_values, b_values)
+
+    # Contour lines on a logarithmic scale, the cost grows quadratically away from the minimum
+    levels = np.geomspace(j_wb.min(), j_wb.max(), 30)
+    contour = plt.contourf(b_values, w_values, j_wb, levels=levels, cmap='viridis', norm='log')
+    plt.colorbar(contour, label='J(w, b)')
+
+    # Mark the minimum of the grid
+    w_index, b_index = np.unravel_index(np.argmin(j_wb), j_wb.shape)
+    plt.scatter(b_values[b_index], w_values[w_index], color='red', marker='x', label='Minimum')
+
+    # Setting labels and title
+    plt.xlabel('b')
+    plt.ylabel('w')
+    plt.title('Cost Function J(w, b)')
+    plt.legend()
+
+    # Save the plot
+    plt.savefig(plot_path)
+    print(f'The plot has been saved in {plot_path}!')
+
+@_renders
 def plot_cost_function_scatter(iterations: list, costs: list, plot_path: str = '../../plots/cost_function_scatter.png') -> None:
     """
     Creates a scatter plot of the cost function versus iterations.
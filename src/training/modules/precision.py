@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Tuple
+
+# Chunk size of the passes over the data
+from .sufficient_statistics import DEFAULT_CHUNK_SIZE, RunningStatistics
+
+# In float32 mode the data and the residual are stored and updated in float32, which
+# halves the bytes read and written by every iteration, while every reduction accumulates
+# in float64: numpy casts the float32 values to float64 one buffer at a time, so no float64
+# copy of an array is made. Sums use numpy's pairwise summation with a float64 accumulator.
+# (A float32 BLAS dot product is faster still, but it accumulates in float32: the cost of a
+# small dataset then repeats exactly from one iteration to the next and stops the training.)
+
+# Precisions of the training data
+PRECISIONS: Tuple[str, ...] = ('float64', 'float32')
+# Largest relative difference accepted between float32 and float64 coefficients
+PRECISION_TOLERANCE: float = 1e-4
+
+
+def check_precision(precision: str) -> np.dtype:
+    """
+    Checks the name of a precision.
+
+    Args:
+        precision (str): Name of the precision, one of PRECISIONS.
+
+    Returns:
+        np.dtype: The dtype of the precision.
+
+    Raises:
+        ValueError: If the precision is unknown.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Use one of: {', '.join(PRECISIONS)}.")
+    return np.dtype(precision)
+
+
+def dot_float64(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Computes a dot product with a float64 accumulator, whatever the dtype of the arrays.
+
+    Args:
+        a (np.ndarray): First vector.
+        b (np.ndarray): Second vector, of the same shape.
+
+    Returns:
+        float: The dot product.
+    """
+    if a.dtype == np.float64 and b.dtype == np.float64:
+        return float(np.dot(a, b))
+    return float(np.einsum('i,i->', a, b, dtype=np.float64))
+
+
+def sum_float64(a: np.ndarray) -> float:
+    """
+    Sums an array with a float64 accumulator, pairwise, without a float64 copy of it.
+    """
+    return float(np.sum(a, dtype=np.float64))
+
+
+def to_precision(data: np.ndarray, dtype: np.dtype, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Converts an array to a dtype one chunk at a time, so that no float64 temporary of
+    the whole array is created.
+
+    Args:
+        data (np.ndarray): The array, e.g. int64 prices from pandas.
+        dtype (np.dtype): The dtype of the copy.
+        chunk_size (int, optional): Number of values converted at once.
+
+    Returns:
+        np.ndarray: The array in the dtype (the array itself if it already has it).
+    """
+    if data.dtype == dtype:
+        return data
+    converted: np.ndarray = np.empty(data.shape[0], dtype=dtype)
+    for start in range(0, data.shape[0], chunk_size):
+        converted[start:start + chunk_size] = data[start:start + chunk_size]
+    return converted
+
+
+def resolution_tolerance(data_y: np.ndarray, dtype: np.dtype, tolerance: float = 1e-6) -> float:
+    """
+    Raises a convergence tolerance on the gradient norm to what a precision can resolve.
+
+    A residual stored in `dtype` is only known to about eps * rms(y): past that point the
+    gradient is rounding noise and its norm would never fall below a smaller tolerance.
+    On standardized x the Hessian is the identity, so the coefficients are then within
+    about eps * rms(y) of the optimum.
+
+    Args:
+        data_y (np.ndarray): Target values.
+        dtype (np.dtype): dtype of the residual.
+        tolerance (float, optional): Requested tolerance.
+
+    Returns:
+        float: The tolerance, at least `tolerance`.
+    """
+    rms: float = np.sqrt(dot_float64(data_y, data_y) / max(data_y.shape[0], 1))
+    return max(tolerance, float(np.finfo(dtype).eps) * rms)
+
+
+def reference_coefficients(statistics: RunningStatistics, alpha: float = 0.0, l1_ratio: float = 0.0) -> Tuple[float, float]:
+    """
+    Solves the squared error problem on standardized x in closed form, in float64.
+
+    On standardized x the elastic-net problem of a single feature is separable:
+    w = soft_threshold(cov(x', y), alpha * l1_ratio) / (1 + alpha * (1 - l1_ratio)) and b = mean(y).
+
+    Args:
+        statistics (RunningStatistics): Statistics of the original data.
+        alpha (float, optional): Strength of the regularization of w.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty.
+
+    Returns:
+        Tuple[float, float]: The standardized slope and the intercept.
+    """
+    covariance: float = statistics.c_xy / statistics.n / statistics.std_x
+    w: float = np.sign(covariance) * max(abs(covariance) - alpha * l1_ratio, 0.0) / (1 + alpha * (1 - l1_ratio))
+    return float(w), statistics.mean_y
+
+
+def relative_difference(params: Tuple[float, float], reference: Tuple[float, float]) -> float:
+    """
+    Computes the largest difference between two parameter vectors, each parameter relative to its own
+    reference value.
+
+    Each coefficient is checked on its own scale: relative to the largest one, a slope much smaller
+    than the intercept (e.g. y = 2e6 - 2e-6 * x) could be wrong in every digit and still pass.
+    A parameter whose reference is exactly zero only passes when it is zero too.
+    """
+    params_array: np.ndarray = np.asarray(params, dtype=np.float64)
+    reference_array: np.ndarray = np.asarray(reference, dtype=np.float64)
+    scale: np.ndarray = np.maximum(np.abs(reference_array), 1e-300)
+    return float(np.max(np.abs(params_array - reference_array) / scale))
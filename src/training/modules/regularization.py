@@ -0,0 +1,158 @@
+import csv
+import os
+import time
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+# Feature scaling
+from .feature_scaling import standardization, denormalize_coefficients
+# Training engine
+from .gradient_descent import run_gradient_descent
+# Optimizers
+from .optimizers import Optimizer
+
+# Columns of the regularization path table, in order
+REGULARIZATION_PATH_COLUMNS: Tuple[str, ...] = ('alpha', 'l1_ratio', 'w_final', 'b_final', 'cost',
+                                                'iterations', 'converged', 'seconds')
+
+# Largest strength of a ridge path: no finite alpha sets w to zero, this one shrinks it to 0.1 %
+RIDGE_MAX_ALPHA: float = 1000.0
+
+
+def default_alphas(standardized_x: np.ndarray, data_y: np.ndarray, l1_ratio: float = 1.0, n_alphas: int = 20, \
+                   alpha_ratio: float = 1e-3) -> np.ndarray:
+    """
+    Builds a decreasing geometric grid of regularization strengths.
+
+    The grid starts at the smallest alpha for which the L1 penalty sets w to zero,
+    |mean(x * (y - mean(y)))| / l1_ratio on standardized x, or at RIDGE_MAX_ALPHA for ridge,
+    and ends `alpha_ratio` times lower.
+
+    Args:
+        standardized_x (np.ndarray): Standardized feature data.
+        data_y (np.ndarray): Target values.
+        l1_ratio (float, optional): Share of the L1 penalty.
+        n_alphas (int, optional): Number of strengths.
+        alpha_ratio (float, optional): Ratio of the last strength to the first one.
+
+    Returns:
+        np.ndarray: The strengths, from the largest to the smallest.
+    """
+    if l1_ratio == 0:
+        alpha_max: float = RIDGE_MAX_ALPHA
+    else:
+        # Standardized x has a zero mean, so mean(x * y) is the covariance of x and y
+        alpha_max = abs(np.dot(standardized_x, data_y)) / standardized_x.shape[0] / l1_ratio
+    return np.geomspace(alpha_max, alpha_max * alpha_ratio, n_alphas)
+
+
+def regularization_path(data_x: np.ndarray, data_y: np.ndarray, alphas: Sequence[float], l1_ratio: float = 1.0, \
+                        optimizer: str = "gradient_descent", learning_rate: float = None, tolerance: float = 1e-6, \
+                        max_iterations: int = 5000, warm_start: bool = True) -> List[Dict]:
+    """
+    Fits a sequence of regularization strengths, from the largest to the smallest.
+
+    With warm starts, the path starts from the intercept-only model, w = 0 and b = mean(y),
+    the solution of the strongest L1 penalties, and each fit starts from the solution of the
+    previous, slightly stronger, regularization, which is already close: most fits only need
+    a fraction of the iterations of a fit started from zero.
+
+    On standardized data the Hessian of the smooth part of the cost is diag(1 + alpha * (1 - l1_ratio), 1),
+    so plain gradient descent diverges with steps above 2 / (1 + alpha * (1 - l1_ratio)). Without
+    an explicit learning rate, its default step is capped at the inverse of that curvature.
+
+    Args:
+        data_x (np.ndarray): Feature data, standardized.
+        data_y (np.ndarray): Target values.
+        alphas (Sequence[float]): Strengths of the regularization, fitted in decreasing order.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty, 0 for ridge and 1 for lasso.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient (mapping).
+        max_iterations (int, optional): Maximum number of iterations of each fit.
+        warm_start (bool, optional): Whether each fit starts from the previous solution instead of zero.
+
+    Returns:
+        List[Dict]: One row per strength with the alpha, the standardized w and b, the cost,
+                    the iterations, whether the fit converged and its duration.
+    """
+    rows: List[Dict] = []
+    # On standardized data the intercept is mean(y) whatever the regularization
+    w, b = 0.0, float(np.mean(data_y)) if warm_start else 0.0
+    for alpha in sorted(alphas, reverse=True):
+        step_size: float = learning_rate
+        if learning_rate is None and optimizer == "gradient_descent":
+            step_size = min(Optimizer.default_learning_rate, 1 / (1 + alpha * (1 - l1_ratio)))
+
+        start: float = time.perf_counter()
+        result = run_gradient_descent(data_x, data_y, w, b, step_size, tolerance, max_iterations, optimizer,
+                                      alpha=alpha, l1_ratio=l1_ratio)
+        rows.append({'alpha': alpha, 'l1_ratio': l1_ratio, 'w': result.w, 'b': result.b, 'cost': result.cost,
+                     'iterations': result.iterations, 'converged': result.converged,
+                     'seconds': time.perf_counter() - start})
+        if warm_start:
+            w, b = result.w, result.b
+    return rows
+
+
+def save_regularization_path(rows: List[Dict], file_path: str) -> None:
+    """
+    Writes a regularization path as CSV.
+
+    Args:
+        rows (List[Dict]): Rows returned by lauch_regularization_path.
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        None
+    """
+    try:
+        directory: str = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=REGULARIZATION_PATH_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Regularization path has been saved to {file_path}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
+
+
+def lauch_regularization_path(original_data_x: np.ndarray, original_data_y: np.ndarray, alphas: Sequence[float] = None, \
+                              n_alphas: int = 20, l1_ratio: float = 1.0, optimizer: str = "gradient_descent", \
+                              learning_rate: float = None, warm_start: bool = True, results_path: str = None) -> List[Dict]:
+    """
+    Fits a warm-started regularization path on standardized data and returns it on the original scale.
+
+    Args:
+        original_data_x (np.ndarray): The original feature data.
+        original_data_y (np.ndarray): The target values.
+        alphas (Sequence[float], optional): Strengths to fit. Default is default_alphas.
+        n_alphas (int, optional): Number of default strengths.
+        l1_ratio (float, optional): Share of the L1 (lasso) penalty, 0 for ridge and 1 for lasso.
+        optimizer (str, optional): Name of the optimizer, one of optimizers.OPTIMIZERS.
+        learning_rate (float, optional): Step size. Default depends on the optimizer.
+        warm_start (bool, optional): Whether each fit starts from the previous solution.
+        results_path (str, optional): CSV file where the path is saved.
+
+    Returns:
+        List[Dict]: One row per strength with the columns of REGULARIZATION_PATH_COLUMNS.
+
+    Raises:
+        ValueError: If l1_ratio is not in [0, 1] or a strength is negative.
+    """
+    mean_x: float = np.mean(original_data_x)
+    std_x: float = np.std(original_data_x)
+    standardized_x: np.ndarray = standardization(original_data_x, mean_x, std_x)
+    if alphas is None:
+        alphas = default_alphas(standardized_x, original_data_y, l1_ratio, n_alphas)
+
+    rows: List[Dict] = regularization_path(standardized_x, original_data_y, alphas, l1_ratio, optimizer,
+                                           learning_rate, warm_start=warm_start)
+    for row in rows:
+        row['w_final'], row['b_final'] = denormalize_coefficients(None, row['w'], row['b'], mean_x, std_x)
+
+    if results_path:
+        save_regularization_path(rows, results_path)
+    return rows
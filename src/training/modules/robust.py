@@ -0,0 +1,230 @@
+import numpy as np
+from typing import Callable, Dict, Tuple
+
+# Running statistics
+from .sufficient_statistics import RunningStatistics
+# Report of the runs stopped by their iteration cap
+from .optimizers import warn_not_converged
+
+# Robust losses of the residual r = w * x + b - y. Each kernel takes the residual
+# buffer and a second buffer, writes the derivative psi(r) of the loss into the
+# second one and returns the total loss, so that the gradient of the mean loss is
+#   dJ/dw = mean(psi(r) * x)    dJ/db = mean(psi(r))
+# whatever the loss. Squared error is the loss r ** 2 / 2 of psi(r) = r.
+
+# Tuning constant of the Huber loss: 95 % efficiency on gaussian noise
+HUBER_EFFICIENCY: float = 1.345
+# Scale of the median absolute deviation of gaussian noise, in standard deviations
+MAD_TO_STD: float = 1.4826
+
+
+def squared_loss(residual: np.ndarray, psi: np.ndarray, delta: float, quantile: float) -> float:
+    """
+    Squared error r ** 2 / 2, psi(r) = r.
+    """
+    psi[:] = residual
+    return np.dot(residual, residual) / 2
+
+
+def huber_loss(residual: np.ndarray, psi: np.ndarray, delta: float, quantile: float) -> float:
+    """
+    Huber loss: r ** 2 / 2 up to |r| = delta, linear beyond. psi(r) = clip(r, -delta, delta).
+    """
+    np.clip(residual, -delta, delta, out=psi)
+    # With c = clip(r): r ** 2 / 2 inside, delta * |r| - delta ** 2 / 2 outside, i.e. c * (r - c / 2)
+    return np.dot(psi, residual) - np.dot(psi, psi) / 2
+
+
+def absolute_loss(residual: np.ndarray, psi: np.ndarray, delta: float, quantile: float) -> float:
+    """
+    Absolute error |r|, psi(r) = sign(r).
+    """
+    np.sign(residual, out=psi)
+    return np.dot(psi, residual)
+
+
+def quantile_loss(residual: np.ndarray, psi: np.ndarray, delta: float, quantile: float) -> float:
+    """
+    Pinball loss of the quantile q: q * |r| below the target, (1 - q) * |r| above it.
+    psi(r) = 1 - q if r > 0 else -q.
+    """
+    np.greater(residual, 0, out=psi)
+    np.subtract(psi, quantile, out=psi)
+    return np.dot(psi, residual)
+
+
+LOSSES: Dict[str, Callable[[np.ndarray, np.ndarray, float, float], float]] = {
+    'squared': squared_loss,
+    'huber': huber_loss,
+    'absolute': absolute_loss,
+    'quantile': quantile_loss,
+}
+
+
+def check_loss(loss: str) -> None:
+    """
+    Raises:
+        ValueError: If the loss is unknown.
+    """
+    if loss not in LOSSES:
+        raise ValueError(f"Unknown loss '{loss}'. Use one of: {', '.join(LOSSES)}.")
+
+
+def default_huber_delta(data_x: np.ndarray, data_y: np.ndarray) -> float:
+    """
+    Picks the Huber threshold from the noise of the data: 1.345 robust standard
+    deviations of the least squares residuals, estimated by their median absolute deviation.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+
+    Returns:
+        float: The threshold, in the units of the target values.
+    """
+    w, b = RunningStatistics.from_arrays(data_x, data_y).fit()
+    # Least squares residual, centered on its median
+    residual: np.ndarray = np.multiply(data_x, w, dtype=np.float64)
+    np.add(residual, b, out=residual)
+    np.subtract(residual, data_y, out=residual)
+    np.subtract(residual, np.median(residual), out=residual)
+    mad: float = float(np.median(np.abs(residual, out=residual)))
+    return HUBER_EFFICIENCY * MAD_TO_STD * mad or 1.0
+
+
+class RobustObjective:
+    """
+    Mean robust loss of a linear regression, as a function of the parameters [w, b].
+
+    Same interface as gradient_descent.SquaredErrorObjective, so it runs in the same
+    optimization loop. The residual and psi(r) live in buffers reused by every evaluation.
+    """
+
+    def __init__(self, data_x: np.ndarray, data_y: np.ndarray, loss: str = "huber", delta: float = None, \
+                 quantile: float = 0.5) -> None:
+        check_loss(loss)
+        if not 0 < quantile < 1:
+            raise ValueError("The quantile must be in ]0, 1[.")
+        self.data_x: np.ndarray = data_x
+        self.data_y: np.ndarray = data_y
+        self.loss: str = loss
+        self.kernel = LOSSES[loss]
+        self.delta: float = default_huber_delta(data_x, data_y) if delta is None and loss == "huber" else delta
+        self.quantile: float = quantile
+        # Buffers of the residual and of psi(r), reused by every evaluation
+        self.residual: np.ndarray = np.empty(data_x.shape[0], dtype=np.float64)
+        self.psi: np.ndarray = np.empty(data_x.shape[0], dtype=np.float64)
+
+    def value_and_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Computes the mean loss and its gradient [dJ/dw, dJ/db] at params = [w, b].
+        """
+        m: int = self.data_x.shape[0]
+
+        # Residual in place: w * x + b - y
+        np.multiply(self.data_x, params[0], out=self.residual)
+        np.add(self.residual, params[1], out=self.residual)
+        np.subtract(self.residual, self.data_y, out=self.residual)
+
+        cost: float = self.kernel(self.residual, self.psi, self.delta, self.quantile) / m
+        return cost, np.array([np.dot(self.psi, self.data_x) / m, np.sum(self.psi) / m])
+
+    def value(self, params: np.ndarray) -> float:
+        """
+        Computes the mean loss at params = [w, b].
+        """
+        return self.value_and_gradient(params)[0]
+
+    def curvature(self, direction: np.ndarray) -> float:
+        """
+        Computes direction^T H direction, for the squared loss only.
+
+        Exact steps minimize a quadratic model of the cost: the Huber loss is only
+        piecewise quadratic, the absolute and quantile losses are piecewise linear.
+
+        Raises:
+            ValueError: For the robust losses.
+        """
+        if self.loss != "squared":
+            raise ValueError(f"The {self.loss} loss is not quadratic, use an optimizer without exact steps.")
+        np.multiply(self.data_x, direction[0], out=self.residual)
+        np.add(self.residual, direction[1], out=self.residual)
+        return np.dot(self.residual, self.residual) / self.data_x.shape[0]
+
+
+def weighted_least_squares(data_x: np.ndarray, data_y: np.ndarray, weights: np.ndarray, \
+                           buffer: np.ndarray) -> Tuple[float, float]:
+    """
+    Fits a line by weighted least squares in closed form, centered on the weighted means.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        weights (np.ndarray): Non-negative weight of each row.
+        buffer (np.ndarray): Float buffer with the shape of data_x, overwritten.
+
+    Returns:
+        Tuple[float, float]: The slope (w) and intercept (b).
+    """
+    total_weight: float = np.sum(weights)
+    mean_x: float = np.dot(weights, data_x) / total_weight
+    mean_y: float = np.dot(weights, data_y) / total_weight
+
+    # Weighted centered sums: sum(weights * dx * dy) / sum(weights * dx * dx)
+    np.subtract(data_x, mean_x, out=buffer)
+    np.multiply(buffer, weights, out=buffer)
+    w: float = (np.dot(buffer, data_y) - mean_y * np.sum(buffer)) / (np.dot(buffer, data_x) - mean_x * np.sum(buffer))
+    return w, mean_y - w * mean_x
+
+
+def irls(data_x: np.ndarray, data_y: np.ndarray, loss: str = "huber", delta: float = None, quantile: float = 0.5, \
+         tolerance: float = 1e-10, max_iterations: int = 100, epsilon: float = 1e-6) -> Tuple[float, float, int]:
+    """
+    Fits a robust regression by iteratively reweighted least squares.
+
+    Starting from the least squares line, each pass weights every row by psi(r) / r
+    (1 within delta and delta / |r| beyond for Huber) and refits the line by weighted
+    least squares in closed form. For Huber it converges in a few passes over the data.
+
+    Args:
+        data_x (np.ndarray): Feature data, on any scale.
+        data_y (np.ndarray): Target values.
+        loss (str, optional): One of LOSSES.
+        delta (float, optional): Huber threshold. Default is default_huber_delta.
+        quantile (float, optional): Quantile of the quantile loss.
+        tolerance (float, optional): Convergence tolerance on the relative change of w and b.
+        max_iterations (int, optional): Maximum number of passes.
+        epsilon (float, optional): Smallest |r| of the weights, so that exact fits do not divide by zero.
+
+    Returns:
+        Tuple[float, float, int]: The slope (w), the intercept (b) and the number of passes.
+    """
+    objective = RobustObjective(data_x, data_y, loss, delta, quantile)
+    weights: np.ndarray = np.empty(data_x.shape[0], dtype=np.float64)
+    w, b = RunningStatistics.from_arrays(data_x, data_y).fit()
+
+    i: int = 0
+    for i in range(1, max_iterations + 1):
+        # Residual of the current line: w * x + b - y
+        np.multiply(data_x, w, out=objective.residual)
+        np.add(objective.residual, b, out=objective.residual)
+        np.subtract(objective.residual, data_y, out=objective.residual)
+
+        # weights = psi(r) / r, both taken at r moved away from zero to |r| >= epsilon with
+        # its sign (r = 0 moves to +epsilon): psi has the sign of r, so no weight is negative,
+        # even where psi(0) is not 0 as for the quantile loss
+        np.abs(objective.residual, out=weights)
+        np.maximum(weights, epsilon, out=weights)
+        np.copysign(weights, objective.residual, out=objective.residual)
+        objective.kernel(objective.residual, objective.psi, objective.delta, objective.quantile)
+        np.divide(objective.psi, objective.residual, out=weights)
+
+        new_w, new_b = weighted_least_squares(data_x, data_y, weights, objective.residual)
+        converged: bool = abs(new_w - w) <= tolerance * abs(new_w) and abs(new_b - b) <= tolerance * abs(new_b)
+        w, b = new_w, new_b
+        if converged:
+            print(f"Converged after {i} passes.")
+            break
+    else:
+        warn_not_converged(max_iterations, "passes", f"tolerance {tolerance:g} on the relative change of w and b")
+    return w, b, i
@@ -0,0 +1,227 @@
+import csv
+import os
+import numpy as np
+from typing import Sequence, Tuple
+
+# Chunk size of the passes over the data
+from .sufficient_statistics import DEFAULT_CHUNK_SIZE
+
+# Coefficient table of a segmented model, read by src/prediction/segments.py
+SEGMENTS_PATH: str = '../prediction/segments.csv'
+# Columns of the coefficient table, in order
+SEGMENT_COLUMNS: Tuple[str, ...] = ('segment', 'w_final', 'b_final', 'n_rows', 'cost')
+
+
+class GroupedStatistics:
+    """
+    Running sufficient statistics of one simple linear regression per segment.
+
+    The same statistics as RunningStatistics, held in one array per statistic with one
+    lane per segment. A chunk of rows is folded in with a handful of np.bincount calls
+    over the segment codes, whatever the number of segments, then merged into every
+    lane at once with the pairwise (Chan / Welford) update.
+
+    Attributes:
+        n (np.ndarray): Number of rows of each segment.
+        mean_x (np.ndarray): Mean of the feature data of each segment.
+        mean_y (np.ndarray): Mean of the target values of each segment.
+        m2_x (np.ndarray): Sum of squared deviations of x from its mean, per segment.
+        m2_y (np.ndarray): Sum of squared deviations of y from its mean, per segment.
+        c_xy (np.ndarray): Sum of the products of the deviations of x and y, per segment.
+    """
+
+    def __init__(self, n_segments: int) -> None:
+        self.n: np.ndarray = np.zeros(n_segments)
+        self.mean_x: np.ndarray = np.zeros(n_segments)
+        self.mean_y: np.ndarray = np.zeros(n_segments)
+        self.m2_x: np.ndarray = np.zeros(n_segments)
+        self.m2_y: np.ndarray = np.zeros(n_segments)
+        self.c_xy: np.ndarray = np.zeros(n_segments)
+
+    @classmethod
+    def from_arrays(cls, codes: np.ndarray, data_x: np.ndarray, data_y: np.ndarray, n_segments: int, \
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> "GroupedStatistics":
+        """
+        Builds the statistics of every segment in a single pass, chunk by chunk.
+
+        Args:
+            codes (np.ndarray): Segment of each row, integers in [0, n_segments).
+            data_x (np.ndarray): Feature data.
+            data_y (np.ndarray): Target values.
+            n_segments (int): Number of segments.
+            chunk_size (int, optional): Number of rows folded in at once.
+
+        Returns:
+            GroupedStatistics: The statistics of every segment.
+        """
+        statistics = cls(n_segments)
+        for start in range(0, codes.shape[0], chunk_size):
+            statistics.update(codes[start:start + chunk_size], data_x[start:start + chunk_size],
+                              data_y[start:start + chunk_size])
+        return statistics
+
+    def update(self, codes: np.ndarray, data_x: np.ndarray, data_y: np.ndarray) -> "GroupedStatistics":
+        """
+        Folds a chunk of rows into the statistics of their segments.
+
+        Args:
+            codes (np.ndarray): Segment of each row of the chunk.
+            data_x (np.ndarray): Feature data of the chunk.
+            data_y (np.ndarray): Target values of the chunk.
+
+        Returns:
+            GroupedStatistics: The updated statistics (self), for chaining.
+        """
+        n_segments: int = self.n.shape[0]
+        chunk_n: np.ndarray = np.bincount(codes, minlength=n_segments).astype(np.float64)
+        # Segments absent from the chunk keep a zero mean and zero sums
+        present: np.ndarray = chunk_n > 0
+        chunk_mean_x: np.ndarray = np.divide(np.bincount(codes, data_x, n_segments), chunk_n,
+                                             out=np.zeros(n_segments), where=present)
+        chunk_mean_y: np.ndarray = np.divide(np.bincount(codes, data_y, n_segments), chunk_n,
+                                             out=np.zeros(n_segments), where=present)
+
+        # Deviations from the means of the segments of the chunk
+        deviation_x: np.ndarray = data_x - chunk_mean_x[codes]
+        deviation_y: np.ndarray = data_y - chunk_mean_y[codes]
+        chunk_m2_x: np.ndarray = np.bincount(codes, deviation_x * deviation_x, n_segments)
+        chunk_m2_y: np.ndarray = np.bincount(codes, deviation_y * deviation_y, n_segments)
+        chunk_c_xy: np.ndarray = np.bincount(codes, deviation_x * deviation_y, n_segments)
+
+        # Pairwise update of every segment at once
+        n: np.ndarray = self.n + chunk_n
+        delta_x: np.ndarray = chunk_mean_x - self.mean_x
+        delta_y: np.ndarray = chunk_mean_y - self.mean_y
+        weight: np.ndarray = np.divide(self.n * chunk_n, n, out=np.zeros(n_segments), where=present)
+        share: np.ndarray = np.divide(chunk_n, n, out=np.zeros(n_segments), where=present)
+
+        self.m2_x += chunk_m2_x + delta_x * delta_x * weight
+        self.m2_y += chunk_m2_y + delta_y * delta_y * weight
+        self.c_xy += chunk_c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * share
+        self.mean_y += delta_y * share
+        self.n = n
+        return self
+
+    def fit(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Solves the normal equation of every segment.
+
+        Segments with a single row or a constant x have no slope: they get w = 0 and
+        b = mean(y), the best constant prediction.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The slopes (w) and intercepts (b) of the segments.
+        """
+        w: np.ndarray = np.divide(self.c_xy, self.m2_x, out=np.zeros_like(self.c_xy), where=self.m2_x > 0)
+        return w, self.mean_y - w * self.mean_x
+
+    def cost(self, w: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Computes the squared error cost of the line of every segment, as RunningStatistics.cost.
+        """
+        n: np.ndarray = np.maximum(self.n, 1)
+        variance_residual: np.ndarray = (w * w * self.m2_x - 2 * w * self.c_xy + self.m2_y) / n
+        mean_residual: np.ndarray = w * self.mean_x + b - self.mean_y
+        return (variance_residual + mean_residual * mean_residual) / 2
+
+
+def read_segment_csv(file_path: str, key: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads the segment key, km and price columns of a CSV file and encodes the keys.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        key (str): Name of the segment column, e.g. 'model' or 'region'.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The segment code of each row,
+        the sorted distinct keys, the kilometers and the prices.
+
+    Raises:
+        ValueError: If a column is missing.
+    """
+    # pandas is only imported by the code paths that parse CSV files
+    import pandas as pd
+
+    df = pd.read_csv(file_path, usecols=[key, 'km', 'price'])
+    # Sorted keys, so that the predictor finds them by binary search
+    codes, keys = pd.factorize(df[key].astype(str), sort=True)
+    return codes, np.asarray(keys, dtype=str), df['km'].to_numpy(dtype=np.float64), df['price'].to_numpy(dtype=np.float64)
+
+
+def save_segment_table(keys: Sequence[str], w: np.ndarray, b: np.ndarray, n_rows: np.ndarray, cost: np.ndarray, \
+                       file_path: str = SEGMENTS_PATH) -> None:
+    """
+    Writes the coefficient table of a segmented model as CSV, one row per segment in key order.
+
+    Args:
+        keys (Sequence[str]): Key of each segment, sorted.
+        w (np.ndarray): Slope of each segment.
+        b (np.ndarray): Intercept of each segment.
+        n_rows (np.ndarray): Number of training rows of each segment.
+        cost (np.ndarray): Squared error cost of each segment.
+        file_path (str, optional): Path to the CSV file.
+
+    Returns:
+        None
+    """
+    try:
+        directory: str = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(SEGMENT_COLUMNS)
+            # Floats are written with repr, so they read back exactly
+            writer.writerows(zip(keys, w.tolist(), b.tolist(), n_rows.astype(np.int64).tolist(), cost.tolist()))
+        print(f"Coefficients of {len(keys)} segments have been saved to {file_path}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
+
+
+def fit_segments(codes: np.ndarray, data_x: np.ndarray, data_y: np.ndarray, \
+                 n_segments: int) -> Tuple[np.ndarray, np.ndarray, GroupedStatistics]:
+    """
+    Fits one regression line per segment in a single vectorized pass over the data.
+
+    Args:
+        codes (np.ndarray): Segment of each row, integers in [0, n_segments).
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        n_segments (int): Number of segments.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, GroupedStatistics]: The slopes and intercepts of the
+        segments, and their statistics.
+    """
+    statistics = GroupedStatistics.from_arrays(codes, data_x, data_y, n_segments)
+    w, b = statistics.fit()
+    return w, b, statistics
+
+
+def lauch_segmented_training(file_path: str, key: str = 'model', table_path: str = SEGMENTS_PATH) -> int:
+    """
+    Trains one price line per segment of a CSV file and saves the coefficient table.
+
+    Args:
+        file_path (str): Path to the CSV file with the key, 'km' and 'price' columns.
+        key (str, optional): Name of the segment column.
+        table_path (str, optional): Path to the coefficient table.
+
+    Returns:
+        int: The number of segments.
+
+    Raises:
+        ValueError: If a column is missing.
+    """
+    codes, keys, data_km, data_price = read_segment_csv(file_path, key)
+    w, b, statistics = fit_segments(codes, data_km, data_price, keys.shape[0])
+
+    without_slope: int = int(np.count_nonzero(statistics.m2_x == 0))
+    print(f"{keys.shape[0]} segments fitted on {codes.shape[0]} rows.")
+    if without_slope:
+        print(f"{without_slope} segments have a single kilometer value and predict their mean price.")
+
+    save_segment_table(keys, w, b, statistics.n, statistics.cost(w, b), table_path)
+    return keys.shape[0]
@@ -0,0 +1,287 @@
+import numpy as np
+from typing import Iterator, List, Sequence, Tuple
+
+# Feature scaling
+from .feature_scaling import denormalize_coefficients
+# Fused gradient kernel and coefficient file
+from .gradient_descent import compute_gradients_and_cost, save_coefficients_to_file
+# Decaying learning rate of the mini-batch mode
+from .optimizers import scheduled_learning_rate, warn_not_converged
+# Running statistics
+from .sufficient_statistics import RunningStatistics
+# Versioned model file
+from .model_store import save_linear_model, hash_dataset, MODEL_PATH
+
+# Default number of CSV rows parsed at once
+DEFAULT_CSV_CHUNK_SIZE: int = 100_000
+# Bytes scanned at once when locating the chunks of a CSV file
+SCAN_BLOCK_SIZE: int = 1 << 24
+# Bytes of the blank lines that pandas skips
+BLANK_BYTES: bytes = b' \t\r\n'
+BLANK_BYTE_VALUES: np.ndarray = np.frombuffer(BLANK_BYTES, dtype=np.uint8)
+
+
+def read_csv_chunks(file_path: str, chunk_size: int = DEFAULT_CSV_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Reads the km and price columns of a CSV file in chunks of fixed size.
+
+    Only one chunk is held in memory at a time, whatever the size of the file.
+
+    Args:
+        file_path (str): Path to the CSV file with 'km' and 'price' columns.
+        chunk_size (int, optional): Number of rows per chunk.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: The kilometers and prices of a chunk (float64 arrays).
+    """
+    # pandas is only imported by the code paths that parse CSV files
+    import pandas as pd
+
+    reader = pd.read_csv(file_path, usecols=['km', 'price'], dtype=np.float64, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            yield chunk['km'].to_numpy(), chunk['price'].to_numpy()
+
+
+def chunk_offsets(file_path: str, chunk_size: int = DEFAULT_CSV_CHUNK_SIZE) -> Tuple[List[str], List[int]]:
+    """
+    Locates the chunks of a CSV file, so that they can be read in any order.
+
+    The file is scanned in blocks for line ends, without parsing it. Rows are assumed
+    to be one line each (no quoted line breaks). Blank lines (empty or only spaces, tabs
+    and carriage returns) are not rows, as pandas skips them: the chunks hold as many
+    rows as read_csv_chunks_at reads from their offsets.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_size (int, optional): Number of rows per chunk.
+
+    Returns:
+        Tuple[List[str], List[int]]: The column names of the header, and the byte offset of the first row of every chunk.
+    """
+    with open(file_path, 'rb') as file:
+        # The header is the first line that is not blank
+        header: bytes = file.readline()
+        while header and not header.strip(BLANK_BYTES):
+            header = file.readline()
+        columns: List[str] = [name.strip() for name in header.decode().split(',')]
+        offsets: List[int] = []
+        # Number and byte offset of the row the scan is in, and whether that line has a value so far
+        row: int = 0
+        row_start: int = file.tell()
+        position: int = row_start
+        pending_content: bool = False
+        while True:
+            block: bytes = file.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            data: np.ndarray = np.frombuffer(block, dtype=np.uint8)
+            line_ends: np.ndarray = np.flatnonzero(data == 10)
+            if line_ends.shape[0]:
+                line_starts: np.ndarray = np.concatenate(([0], line_ends[:-1] + 1))
+                # A line starting with a value is a row; the few starting with a blank byte are checked whole
+                content: np.ndarray = ~np.isin(data[line_starts], BLANK_BYTE_VALUES)
+                for i in np.flatnonzero(~content):
+                    content[i] = bool(block[line_starts[i]:line_ends[i]].strip(BLANK_BYTES))
+                if row_start < position:
+                    # The first line started in a previous block
+                    content[0] = pending_content or bool(block[:line_ends[0]].strip(BLANK_BYTES))
+                starts: np.ndarray = np.concatenate(([row_start], line_starts[1:] + position))[content]
+                offsets.extend(starts[(row + np.arange(starts.shape[0])) % chunk_size == 0].tolist())
+                row += starts.shape[0]
+                row_start = position + int(line_ends[-1]) + 1
+                pending_content = bool(block[line_ends[-1] + 1:].strip(BLANK_BYTES))
+            else:
+                pending_content = pending_content or bool(block.strip(BLANK_BYTES))
+            position += len(block)
+        # Last row without a line end
+        if pending_content and row % chunk_size == 0:
+            offsets.append(row_start)
+    return columns, offsets
+
+
+def read_csv_chunks_at(file_path: str, columns: List[str], offsets: Sequence[int], \
+                       chunk_size: int = DEFAULT_CSV_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Reads the km and price columns of the chunks starting at some byte offsets, in their order.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (List[str]): Column names of the header, see chunk_offsets.
+        offsets (Sequence[int]): Byte offset of the first row of each chunk to read.
+        chunk_size (int, optional): Number of rows per chunk.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: The kilometers and prices of a chunk (float64 arrays).
+    """
+    import pandas as pd
+
+    with open(file_path, 'rb') as file:
+        for offset in offsets:
+            file.seek(offset)
+            chunk = pd.read_csv(file, header=None, names=columns, usecols=['km', 'price'], dtype=np.float64,
+                                nrows=chunk_size)
+            yield chunk['km'].to_numpy(), chunk['price'].to_numpy()
+
+
+def standardized_chunks(chunks: Iterator[Tuple[np.ndarray, np.ndarray]], mean_x: float, std_x: float, \
+                        buffer: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Applies Z-score standardization to the feature data of each chunk.
+
+    The standardized values are written into a buffer reused by every chunk, so a
+    yielded chunk is only valid until the next one is requested.
+
+    Args:
+        chunks (Iterator[Tuple[np.ndarray, np.ndarray]]): Chunks of feature data and target values.
+        mean_x (float): Mean of the whole feature data.
+        std_x (float): Standard deviation of the whole feature data.
+        buffer (np.ndarray): Float buffer at least as long as the largest chunk.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: The standardized feature data and the target values of a chunk.
+    """
+    for data_x, data_y in chunks:
+        standardized_x: np.ndarray = buffer[:data_x.shape[0]]
+        np.subtract(data_x, mean_x, out=standardized_x)
+        np.divide(standardized_x, std_x, out=standardized_x)
+        yield standardized_x, data_y
+
+
+def streaming_statistics(file_path: str, chunk_size: int = DEFAULT_CSV_CHUNK_SIZE) -> RunningStatistics:
+    """
+    Computes the statistics needed for standardization in a single streaming pass.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_size (int, optional): Number of rows per chunk.
+
+    Returns:
+        RunningStatistics: Count, means and centered moments of the whole file.
+    """
+    statistics = RunningStatistics()
+    for data_x, data_y in read_csv_chunks(file_path, chunk_size):
+        statistics.update(data_x, data_y)
+    return statistics
+
+
+def streaming_gradient_descent(file_path: str, statistics: RunningStatistics, initial_w: float, initial_b: float, \
+                               learning_rate: float, mode: str = "full_batch", chunk_size: int = DEFAULT_CSV_CHUNK_SIZE, \
+                               tolerance: float = 1e-6, max_epochs: int = 100, decay: float = 1.0, \
+                               seed: int = 0) -> Tuple[float, float]:
+    """
+    Performs gradient descent on standardized data streamed from a CSV file.
+
+    In "full_batch" mode the gradient is accumulated over every chunk before each update,
+    which gives the same steps as `gradient_descent` at the cost of one file pass per step.
+    In "mini_batch" mode the parameters are updated after every chunk. The chunks are then
+    read in a new random order every epoch and the learning rate decays as
+    learning_rate / (1 + decay * epoch): with a fixed order and a fixed step, the last
+    chunks of the file would always pull the parameters away from the optimum.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        statistics (RunningStatistics): Statistics of the whole file, used for standardization.
+        initial_w (float): Initial value for the slope (w).
+        initial_b (float): Initial value for the intercept (b).
+        learning_rate (float): Learning rate for gradient descent (of the first epoch in "mini_batch" mode).
+        mode (str, optional): "full_batch" or "mini_batch".
+        chunk_size (int, optional): Number of rows per chunk (and per mini-batch).
+        tolerance (float, optional): Convergence tolerance on the norm of the gradient of an epoch.
+        max_epochs (int, optional): Maximum number of passes over the file.
+        decay (float, optional): Decay rate of the learning rate in "mini_batch" mode.
+        seed (int, optional): Seed of the order of the chunks in "mini_batch" mode.
+
+    Returns:
+        Tuple[float, float]: The optimized values for w and b, on the standardized scale.
+    """
+    if mode not in ("full_batch", "mini_batch"):
+        raise ValueError(f"Unknown streaming mode '{mode}'. Use 'full_batch' or 'mini_batch'.")
+
+    w = initial_w
+    b = initial_b
+
+    # Standardization and residual buffers shared by every chunk
+    standardized_buffer: np.ndarray = np.empty(chunk_size, dtype=np.float64)
+    residual_buffer: np.ndarray = np.empty(chunk_size, dtype=np.float64)
+
+    if mode == "mini_batch":
+        # Chunks are located once, then read in a shuffled order
+        columns, offsets = chunk_offsets(file_path, chunk_size)
+        rng = np.random.default_rng(seed)
+
+    gradient_norm: float = np.inf
+    for epoch in range(max_epochs):
+        # Sums of the gradient over the epoch
+        sum_dj_dw = sum_dj_db = 0.0
+
+        if mode == "mini_batch":
+            step: float = scheduled_learning_rate('inverse_time', learning_rate, epoch, decay)
+            chunks = read_csv_chunks_at(file_path, columns, [offsets[i] for i in rng.permutation(len(offsets))],
+                                        chunk_size)
+        else:
+            chunks = read_csv_chunks(file_path, chunk_size)
+        for data_x, data_y in standardized_chunks(chunks, statistics.mean_x, statistics.std_x, standardized_buffer):
+            m: int = data_x.shape[0]
+            dj_dw, dj_db, _ = compute_gradients_and_cost(data_x, data_y, w, b, residual_buffer[:m])
+            if mode == "mini_batch":
+                # Steps weighted by the rows of the chunk, so that a short last chunk does not count as a full one
+                w -= step * dj_dw * m / chunk_size
+                b -= step * dj_db * m / chunk_size
+            sum_dj_dw += dj_dw * m
+            sum_dj_db += dj_db * m
+
+        # Check for convergence on the gradient of the whole epoch (at fixed parameters in full batch mode)
+        gradient_norm = np.hypot(sum_dj_dw, sum_dj_db) / statistics.n
+        if gradient_norm < tolerance:
+            print(f"Converged after {epoch} epochs.")
+            break
+
+        if mode == "full_batch":
+            w -= learning_rate * sum_dj_dw / statistics.n
+            b -= learning_rate * sum_dj_db / statistics.n
+    else:
+        warn_not_converged(max_epochs, "epochs", f"gradient norm {gradient_norm:.3g}, tolerance {tolerance:g}")
+
+    return w, b
+
+
+def lauch_streaming_gradient_descent(file_path: str, mode: str = "full_batch", chunk_size: int = DEFAULT_CSV_CHUNK_SIZE, \
+                                     learning_rate: float = 0.5, max_epochs: int = 200, \
+                                     initial_w: float = 0, initial_b: float = 0, \
+                                     coefficients_path: str = '../prediction/coefficients.txt', \
+                                     model_path: str = MODEL_PATH) -> Tuple[float, float]:
+    """
+    Trains the regression from a CSV file without ever loading it whole into memory.
+
+    A first streaming pass computes the standardization statistics, then gradient
+    descent runs chunk by chunk and the coefficients are denormalized and saved.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        mode (str, optional): "full_batch" or "mini_batch".
+        chunk_size (int, optional): Number of rows per chunk.
+        learning_rate (float, optional): Learning rate for gradient descent. On standardized data the
+                                         full batch steps converge for any rate below 2.
+        max_epochs (int, optional): Maximum number of passes over the file.
+        initial_w (float, optional): The initial value for the slope (w).
+        initial_b (float, optional): The initial value for the intercept (b).
+        coefficients_path (str, optional): Path to the file where the coefficients are saved.
+        model_path (str, optional): Path to the model file.
+
+    Returns:
+        Tuple[float, float]: The denormalized coefficients (w_final, b_final).
+    """
+    statistics = streaming_statistics(file_path, chunk_size)
+
+    w, b = streaming_gradient_descent(file_path, statistics, initial_w, initial_b, learning_rate, \
+                                      mode, chunk_size, max_epochs=max_epochs)
+
+    w_final, b_final = denormalize_coefficients(None, w, b, statistics.mean_x, statistics.std_x)
+
+    print(f"(w,b) found by streaming gradient descent: ({w_final},{b_final})")
+
+    save_coefficients_to_file(w_final, b_final, coefficients_path)
+    save_linear_model(w_final, b_final, statistics, hash_dataset(read_csv_chunks(file_path, chunk_size)), model_path)
+
+    return w_final, b_final
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import Tuple
+
+# Default number of rows folded in at once. Large enough to amortize the
+# Python overhead, small enough to keep the temporaries of a chunk in cache.
+DEFAULT_CHUNK_SIZE: int = 1 << 20
+
+
+class RunningStatistics:
+    """
+    Running sufficient statistics of a simple linear regression problem.
+
+    Keeps the number of samples, the means of x and y, the centered sums of squares
+    of x and y and the centered cross-product of x and y. Chunks are folded in with
+    the pairwise (Chan / Welford) update, so the statistics stay numerically stable
+    even for millions of rows with large offsets such as kilometers.
+
+    Attributes:
+        n (float): Number of samples seen so far, or their total weight once `scale` was used.
+        mean_x (float): Mean of the feature data.
+        mean_y (float): Mean of the target values.
+        m2_x (float): Sum of squared deviations of x from its mean.
+        m2_y (float): Sum of squared deviations of y from its mean.
+        c_xy (float): Sum of the products of the deviations of x and y.
+    """
+
+    def __init__(self) -> None:
+        self.n: float = 0
+        self.mean_x: float = 0.0
+        self.mean_y: float = 0.0
+        self.m2_x: float = 0.0
+        self.m2_y: float = 0.0
+        self.c_xy: float = 0.0
+
+    @classmethod
+    def from_arrays(cls, data_x: np.ndarray, data_y: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "RunningStatistics":
+        """
+        Builds the statistics of two arrays in a single pass, chunk by chunk.
+
+        Args:
+            data_x (np.ndarray): Feature data.
+            data_y (np.ndarray): Target values.
+            chunk_size (int, optional): Number of rows folded in at once.
+
+        Returns:
+            RunningStatistics: The statistics of the whole arrays.
+        """
+        statistics = cls()
+        for start in range(0, data_x.shape[0], chunk_size):
+            statistics.update(data_x[start:start + chunk_size], data_y[start:start + chunk_size])
+        return statistics
+
+    def update(self, data_x: np.ndarray, data_y: np.ndarray) -> "RunningStatistics":
+        """
+        Folds a chunk of samples into the running statistics.
+
+        Args:
+            data_x (np.ndarray): Feature data of the chunk.
+            data_y (np.ndarray): Target values of the chunk.
+
+        Returns:
+            RunningStatistics: The updated statistics (self), for chaining.
+        """
+        if data_x.shape[0] == 0:
+            return self
+
+        # Statistics of the chunk alone, centered on the chunk means
+        chunk = RunningStatistics()
+        chunk.n = data_x.shape[0]
+        chunk.mean_x = float(np.mean(data_x, dtype=np.float64))
+        chunk.mean_y = float(np.mean(data_y, dtype=np.float64))
+        deviation_x: np.ndarray = data_x - chunk.mean_x
+        deviation_y: np.ndarray = data_y - chunk.mean_y
+        chunk.m2_x = float(np.dot(deviation_x, deviation_x))
+        chunk.m2_y = float(np.dot(deviation_y, deviation_y))
+        chunk.c_xy = float(np.dot(deviation_x, deviation_y))
+
+        return self.merge(chunk)
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        """
+        Merges the statistics of another, disjoint set of samples into these ones.
+
+        Args:
+            other (RunningStatistics): Statistics of the other samples.
+
+        Returns:
+            RunningStatistics: The merged statistics (self), for chaining.
+        """
+        if other.n == 0:
+            return self
+
+        n: float = self.n + other.n
+        delta_x: float = other.mean_x - self.mean_x
+        delta_y: float = other.mean_y - self.mean_y
+        # Weight of the correction term of the pairwise update
+        weight: float = self.n * other.n / n
+
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.n = n
+        return self
+
+    def scale(self, factor: float) -> "RunningStatistics":
+        """
+        Multiplies the weight of every sample seen so far by a factor.
+
+        Means are unchanged while the count and the centered sums shrink, so samples
+        merged afterwards weigh relatively more: exponential forgetting when applied
+        before every update.
+
+        Args:
+            factor (float): Weight factor, between 0 and 1.
+
+        Returns:
+            RunningStatistics: The scaled statistics (self), for chaining.
+        """
+        self.n *= factor
+        self.m2_x *= factor
+        self.m2_y *= factor
+        self.c_xy *= factor
+        return self
+
+    def to_dict(self) -> dict:
+        """Returns the statistics as a dictionary of plain numbers, e.g. for JSON."""
+        return {'n': self.n, 'mean_x': self.mean_x, 'mean_y': self.mean_y,
+                'm2_x': self.m2_x, 'm2_y': self.m2_y, 'c_xy': self.c_xy}
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "RunningStatistics":
+        """Builds statistics from a dictionary created by `to_dict`."""
+        statistics = cls()
+        for name in ('n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy'):
+            setattr(statistics, name, values[name])
+        return statistics
+
+    @property
+    def std_x(self) -> float:
+        """Population standard deviation of x, the one `np.std` returns."""
+        return float(np.sqrt(self.m2_x / self.n))
+
+    @property
+    def std_y(self) -> float:
+        """Population standard deviation of y."""
+        return float(np.sqrt(self.m2_y / self.n))
+
+    def cost(self, w: float, b: float) -> float:
+        """
+        Computes the squared error cost of the line y = w * x + b from the statistics.
+
+        With the residual r = w * x + b - y: J = (var(r) + mean(r) ** 2) / 2.
+        """
+        variance_residual: float = (w * w * self.m2_x - 2 * w * self.c_xy + self.m2_y) / self.n
+        mean_residual: float = w * self.mean_x + b - self.mean_y
+        return (variance_residual + mean_residual * mean_residual) / 2
+
+    def fit(self) -> Tuple[float, float]:
+        """
+        Solves the normal equation of the least squares problem from the statistics.
+
+        Returns:
+            Tuple[float, float]: The slope (w) and intercept (b) of the regression line.
+
+        Raises:
+            ValueError: If there are no samples or the feature data is constant.
+        """
+        if self.n == 0 or self.m2_x == 0:
+            raise ValueError("The normal equation needs at least two distinct values of x.")
+
+        w: float = self.c_xy / self.m2_x
+        b: float = self.mean_y - w * self.mean_x
+        return w, b
+
+
+def normal_equation(data_x: np.ndarray, data_y: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[float, float]:
+    """
+    Fits a linear regression in closed form with a single pass over the data.
+
+    Args:
+        data_x (np.ndarray): Feature data.
+        data_y (np.ndarray): Target values.
+        chunk_size (int, optional): Number of rows folded in at once.
+
+    Returns:
+        Tuple[float, float]: The slope (w) and intercept (b) of the regression line.
+    """
+    return RunningStatistics.from_arrays(data_x, data_y, chunk_size).fit()
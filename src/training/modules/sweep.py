@@ -0,0 +1,201 @@
+import csv
+import itertools
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Tuple
+
+# Feature scaling
+from .feature_scaling import standardization, denormalize_coefficients
+# Training engine
+from .gradient_descent import run_gradient_descent
+# Chunk size of the passes over the data
+from .sufficient_statistics import DEFAULT_CHUNK_SIZE
+
+# Columns of the results table, in order
+SWEEP_COLUMNS: Tuple[str, ...] = ('optimizer', 'learning_rate', 'tolerance', 'initial_w', 'initial_b',
+                                  'final_cost', 'iterations', 'converged', 'seconds', 'w_final', 'b_final')
+
+# Views on the shared dataset, set in each worker by attach_worker_dataset
+_shared_block: shared_memory.SharedMemory = None
+_shared_x: np.ndarray = None
+_shared_y: np.ndarray = None
+
+
+class SharedDataset:
+    """
+    Copies a dataset once into a shared memory block that worker processes map
+    by name, instead of receiving a pickled copy with every task.
+
+    Use as a context manager: the block is released and unlinked on exit.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        n_rows (int): Number of rows of the dataset.
+    """
+
+    def __init__(self, data_x: np.ndarray, data_y: np.ndarray, order: np.ndarray = None) -> None:
+        """
+        Args:
+            data_x (np.ndarray): Feature data.
+            data_y (np.ndarray): Target values.
+            order (np.ndarray, optional): Row indices, e.g. a permutation: the rows are
+                                          gathered in this order straight into the block.
+        """
+        self.n_rows: int = data_x.shape[0] if order is None else order.shape[0]
+        self.block = shared_memory.SharedMemory(create=True, size=max(2 * self.n_rows * 8, 1))
+        self.name: str = self.block.name
+        columns: np.ndarray = np.ndarray((2, self.n_rows), dtype=np.float64, buffer=self.block.buf)
+        if order is None:
+            columns[0] = data_x
+            columns[1] = data_y
+        else:
+            # Gathered chunk by chunk, the data may be of another dtype than the block
+            for start in range(0, self.n_rows, DEFAULT_CHUNK_SIZE):
+                indices: np.ndarray = order[start:start + DEFAULT_CHUNK_SIZE]
+                columns[0, start:start + indices.shape[0]] = data_x[indices]
+                columns[1, start:start + indices.shape[0]] = data_y[indices]
+        del columns
+
+    def __enter__(self) -> "SharedDataset":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.block.close()
+        self.block.unlink()
+
+
+def attach_shared_dataset(name: str, n_rows: int) -> Tuple[shared_memory.SharedMemory, np.ndarray, np.ndarray]:
+    """
+    Maps a dataset created by SharedDataset, without copying it.
+
+    Args:
+        name (str): Name of the shared memory block.
+        n_rows (int): Number of rows of the dataset.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, np.ndarray, np.ndarray]: The block, which must be kept
+        alive while the arrays are used, and the views on the feature data and the target values.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    columns: np.ndarray = np.ndarray((2, n_rows), dtype=np.float64, buffer=block.buf)
+    return block, columns[0], columns[1]
+
+
+def attach_worker_dataset(name: str, n_rows: int) -> None:
+    """
+    Worker initializer: maps the shared dataset once per process and silences training logs.
+
+    The tasks of the pool read the dataset with worker_dataset.
+    """
+    global _shared_block, _shared_x, _shared_y
+    _shared_block, _shared_x, _shared_y = attach_shared_dataset(name, n_rows)
+    sys.stdout = open(os.devnull, 'w')
+
+
+def worker_dataset() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the views on the feature data and the target values mapped by attach_worker_dataset.
+    """
+    return _shared_x, _shared_y
+
+
+def _run_configuration(configuration: Dict) -> Dict:
+    """
+    Worker task: runs gradient descent with one configuration on the shared dataset.
+    """
+    shared_x, shared_y = worker_dataset()
+    start: float = time.perf_counter()
+    result = run_gradient_descent(shared_x, shared_y, configuration['initial_w'], configuration['initial_b'],
+                                  configuration['learning_rate'], configuration['tolerance'],
+                                  configuration['max_iterations'], configuration['optimizer'])
+    seconds: float = time.perf_counter() - start
+    return dict(configuration, final_cost=result.cost, iterations=result.iterations,
+                converged=result.converged, seconds=seconds, w=result.w, b=result.b)
+
+
+def make_sweep_grid(learning_rates: Iterable[float], tolerances: Iterable[float] = (1e-6,), \
+                    initial_ws: Iterable[float] = (0,), initial_bs: Iterable[float] = (0,), \
+                    optimizers: Iterable[str] = ("gradient_descent",), max_iterations: int = 5000) -> List[Dict]:
+    """
+    Builds every combination of the given hyperparameter values.
+
+    Args:
+        learning_rates (Iterable[float]): Learning rates to try.
+        tolerances (Iterable[float], optional): Convergence tolerances to try.
+        initial_ws (Iterable[float], optional): Initial slopes to try, on the standardized scale.
+        initial_bs (Iterable[float], optional): Initial intercepts to try.
+        optimizers (Iterable[str], optional): Optimizers to try.
+        max_iterations (int, optional): Iteration cap of every run.
+
+    Returns:
+        List[Dict]: One configuration per combination.
+    """
+    return [dict(optimizer=optimizer, learning_rate=learning_rate, tolerance=tolerance,
+                 initial_w=initial_w, initial_b=initial_b, max_iterations=max_iterations)
+            for optimizer, learning_rate, tolerance, initial_w, initial_b
+            in itertools.product(optimizers, learning_rates, tolerances, initial_ws, initial_bs)]
+
+
+def run_sweep(original_data_x: np.ndarray, original_data_y: np.ndarray, configurations: List[Dict], \
+              max_workers: int = None, results_path: str = None) -> List[Dict]:
+    """
+    Runs gradient descent for many configurations across a pool of processes.
+
+    The data is standardized once and shared with the workers through shared memory.
+
+    Args:
+        original_data_x (np.ndarray): The original feature data.
+        original_data_y (np.ndarray): The target values.
+        configurations (List[Dict]): Configurations, e.g. from make_sweep_grid.
+        max_workers (int, optional): Number of worker processes. Default is the number of CPUs.
+        results_path (str, optional): CSV file where the results table is written.
+
+    Returns:
+        List[Dict]: One row per configuration with the columns of SWEEP_COLUMNS, in the order of the configurations.
+    """
+    standardized_x: np.ndarray = standardization(original_data_x)
+    mean_x: float = np.mean(original_data_x)
+    std_x: float = np.std(original_data_x)
+
+    with SharedDataset(standardized_x, original_data_y) as dataset:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=attach_worker_dataset,
+                                 initargs=(dataset.name, dataset.n_rows)) as executor:
+            outcomes: List[Dict] = list(executor.map(_run_configuration, configurations))
+
+    rows: List[Dict] = []
+    for outcome in outcomes:
+        w_final, b_final = denormalize_coefficients(None, outcome['w'], outcome['b'], mean_x, std_x)
+        rows.append({**{column: outcome.get(column) for column in SWEEP_COLUMNS},
+                     'w_final': w_final, 'b_final': b_final})
+
+    if results_path:
+        save_sweep_results(rows, results_path)
+    return rows
+
+
+def save_sweep_results(rows: List[Dict], file_path: str) -> None:
+    """
+    Writes the results table of a sweep as CSV.
+
+    Args:
+        rows (List[Dict]): Rows returned by run_sweep.
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        None
+    """
+    try:
+        directory: str = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=SWEEP_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Sweep results have been saved to {file_path}.")
+    except IOError as e:
+        print(f"An error occurred while trying to write to the file: {e}")
@@ -0,0 +1,204 @@
+import contextlib
+import csv
+import json
+import os
+import time
+import tracemalloc
+import numpy as np
+from typing import Dict, Sequence
+
+# Number of iterations kept in the history: the most recent ones win
+DEFAULT_HISTORY_CAPACITY: int = 1 << 16
+# Columns of the per-iteration history
+HISTORY_COLUMNS: Sequence[str] = ('iteration', 'cost', 'gradient_norm')
+
+
+class RingBuffer:
+    """
+    Fixed-size float64 table keeping the most recent rows appended to it.
+
+    Rows are written in place into an array allocated once, so recording a row
+    neither allocates nor grows a Python list.
+
+    Attributes:
+        columns (Sequence[str]): Names of the columns.
+        capacity (int): Maximum number of rows kept.
+        size (int): Number of rows appended so far, including the overwritten ones.
+    """
+
+    def __init__(self, capacity: int, columns: Sequence[str]) -> None:
+        self.columns: Sequence[str] = columns
+        self.capacity: int = capacity
+        self.size: int = 0
+        self.data: np.ndarray = np.empty((capacity, len(columns)), dtype=np.float64)
+
+    def append(self, *values: float) -> None:
+        """
+        Appends a row, overwriting the oldest one when the buffer is full.
+        """
+        self.data[self.size % self.capacity] = values
+        self.size += 1
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns the rows kept, oldest first.
+        """
+        if self.size <= self.capacity:
+            return self.data[:self.size].copy()
+        start: int = self.size % self.capacity
+        return np.concatenate((self.data[start:], self.data[:start]))
+
+
+class Telemetry:
+    """
+    Instrumentation of a training run: time and memory of each phase, counters, and
+    the per-iteration cost and gradient norm.
+
+    Phases are timed with `with telemetry.phase(name):`. When allocations are traced,
+    tracemalloc also reports the memory each phase kept and its peak, which slows the
+    run down; timings are then only indicative.
+
+    Attributes:
+        phases (Dict[str, Dict[str, float]]): Calls, seconds and, when traced, bytes of each phase.
+        counters (Dict[str, int]): Named counters, e.g. iterations.
+        history (RingBuffer): Iteration, cost and gradient norm of the recent iterations.
+    """
+    enabled: bool = True
+
+    def __init__(self, history_capacity: int = DEFAULT_HISTORY_CAPACITY, trace_allocations: bool = False) -> None:
+        self.trace_allocations: bool = trace_allocations
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.history: RingBuffer = RingBuffer(history_capacity, HISTORY_COLUMNS)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Times the enclosed block and adds it to the phase `name`.
+        """
+        # Tracing is only switched on for the phase, unless it was already on
+        started_tracing: bool = self.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            start_memory, _ = tracemalloc.get_traced_memory()
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            phase = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            phase['calls'] += 1
+            phase['seconds'] += elapsed
+            if self.trace_allocations:
+                memory, peak = tracemalloc.get_traced_memory()
+                phase['allocated_bytes'] = phase.get('allocated_bytes', 0) + memory - start_memory
+                phase['peak_bytes'] = max(phase.get('peak_bytes', 0), peak - start_memory)
+            if started_tracing:
+                tracemalloc.stop()
+
+    def count(self, name: str, increment: int = 1) -> None:
+        """
+        Adds `increment` to the counter `name`.
+        """
+        self.counters[name] = self.counters.get(name, 0) + increment
+
+    def record(self, iteration: int, cost: float, gradient_norm: float) -> None:
+        """
+        Records the cost and the norm of the gradient of an iteration.
+        """
+        self.history.append(iteration, cost, gradient_norm)
+
+    def report(self) -> dict:
+        """
+        Summarizes the run: phases, counters and the last recorded iteration.
+
+        Returns:
+            dict: A JSON-serializable report.
+        """
+        history: np.ndarray = self.history.to_array()
+        return {
+            'phases': self.phases,
+            'total_seconds': sum(phase['seconds'] for phase in self.phases.values()),
+            'counters': self.counters,
+            'recorded_iterations': self.history.size,
+            'kept_iterations': int(history.shape[0]),
+            'last': dict(zip(HISTORY_COLUMNS, history[-1].tolist())) if history.shape[0] else None,
+        }
+
+    def save_report(self, file_path: str) -> None:
+        """
+        Saves the report as JSON and the per-iteration history as CSV next to it.
+
+        Args:
+            file_path (str): Path to the JSON report. The history goes to the same path
+                             with a `_history.csv` suffix instead of `.json`.
+
+        Returns:
+            None
+        """
+        history_path: str = f"{os.path.splitext(file_path)[0]}_history.csv"
+        try:
+            directory: str = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'w') as file:
+                json.dump(self.report(), file, indent=4)
+            with open(history_path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(HISTORY_COLUMNS)
+                writer.writerows(self.history.to_array().tolist())
+            print(f"Telemetry report has been saved to {file_path} and {history_path}.")
+        except IOError as e:
+            print(f"An error occurred while trying to write to the file: {e}")
+
+    def print_summary(self) -> None:
+        """
+        Prints the time spent in each phase, slowest first, and the counters.
+        """
+        total: float = sum(phase['seconds'] for phase in self.phases.values()) or 1.0
+        for name, phase in sorted(self.phases.items(), key=lambda item: -item[1]['seconds']):
+            line: str = f"{name:>22} {phase['seconds']:10.4f} s {100 * phase['seconds'] / total:6.1f} %  x{phase['calls']}"
+            if 'peak_bytes' in phase:
+                line += f"  peak {phase['peak_bytes'] / 2 ** 20:.1f} MiB"
+            print(line)
+        for name, value in self.counters.items():
+            print(f"{name:>22} {value}")
+
+
+class DisabledTelemetry(Telemetry):
+    """
+    Telemetry that records nothing, the default of the training functions.
+
+    Every method returns at once and no buffer is allocated, so instrumented code
+    runs at the same speed as uninstrumented code.
+    """
+    enabled: bool = False
+
+    def __init__(self) -> None:
+        self.phases = {}
+        self.counters = {}
+        self._null_phase = contextlib.nullcontext()
+
+    def phase(self, name: str):
+        return self._null_phase
+
+    def count(self, name: str, increment: int = 1) -> None:
+        pass
+
+    def record(self, iteration: int, cost: float, gradient_norm: float) -> None:
+        pass
+
+    def report(self) -> dict:
+        return {}
+
+    def save_report(self, file_path: str) -> None:
+        pass
+
+    def print_summary(self) -> None:
+        pass
+
+
+# Shared instance used when no telemetry is given
+NO_TELEMETRY: Telemetry = DisabledTelemetry()